@@ -0,0 +1,119 @@
+import importlib
+import os
+import sys
+import threading
+import time
+
+# Imported on first use rather than at startup. NeuroKit alone pulls in
+# pandas, scikit-learn, matplotlib and most of SciPy; the SciPy
+# subpackages are loaded lazily by `scipy` itself and are listed here so
+# warm-up and the stats cover them too.
+HEAVY_BACKENDS = ("scipy.signal", "scipy.ndimage", "scipy.interpolate", "pandas", "neurokit2")
+
+
+def warm_up_enabled() -> bool:
+    return os.getenv("WARM_UP") == "true"
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported the first time one of its
+    attributes is used.
+    """
+
+    def __init__(self, name: str, registry: "BackendRegistry"):
+        self._name = name
+        self._registry = registry
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            self._module = self._registry.load(self._name)
+        return getattr(self._module, attribute)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+class BackendRegistry:
+    """
+    Import heavy algorithm backends on demand and record how long each took.
+    """
+
+    def __init__(self, names=HEAVY_BACKENDS):
+        self.names = tuple(names)
+        self._lock = threading.Lock()
+        self._load_seconds = {}
+        self.warm_up_seconds = None
+
+    def lazy(self, name: str) -> LazyModule:
+        return LazyModule(name, self)
+
+    def load(self, name: str):
+        already_loaded = name in sys.modules
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        if not already_loaded:
+            with self._lock:
+                self._load_seconds.setdefault(name, time.perf_counter() - started)
+        return module
+
+    def load_all(self):
+        for name in self.names:
+            self.load(name)
+
+    def stats(self) -> dict:
+        return {
+            "backends": {
+                name: {
+                    "loaded": name in sys.modules,
+                    "load_seconds": self._load_seconds.get(name),
+                }
+                for name in self.names
+            },
+            "warm_up_seconds": self.warm_up_seconds,
+        }
+
+
+backends = BackendRegistry()
+
+
+def warm_up():
+    """
+    Import every backend and run the common processing paths once on a
+    short synthetic PPG, so first requests skip imports, filter design and
+    NeuroKit's own lazy initialisation.
+    """
+    import numpy as np
+
+    from app.hr import compute_emotibit_heart_rate
+    from app.processing import (
+        apply_builtin_filter,
+        apply_normalization,
+        detect_peak_indices,
+        quality_metrics,
+        remove_outliers,
+        resample_signal,
+    )
+
+    started = time.perf_counter()
+    backends.load_all()
+
+    sampling_rate = 64.0
+    timestamps = np.arange(30 * int(sampling_rate)) / sampling_rate
+    values = np.sin(2 * np.pi * 1.2 * timestamps) + 0.05 * np.cos(2 * np.pi * 7 * timestamps)
+    data = np.column_stack((timestamps, values))
+
+    apply_builtin_filter(values, sampling_rate, {"method": "butterworth", "order": 2, "lowcut": 0.5, "highcut": 5})
+    apply_normalization(values, "zscore")
+    remove_outliers(values, "hampel", sampling_rate)
+    resample_signal(data, "cubic", 2 * sampling_rate)
+    detect_peak_indices(values, sampling_rate, "scipy")
+    detect_peak_indices(values, sampling_rate, "neurokit", "PPG")
+    compute_emotibit_heart_rate(data, sampling_rate)
+    quality_metrics(values, "PPG", sampling_rate)
+    quality_metrics(values + 2, "EDA", sampling_rate)
+
+    backends.warm_up_seconds = time.perf_counter() - started
+    return backends.warm_up_seconds
@@ -0,0 +1,373 @@
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.backends import backends
+from app.pipeline import PipelineError, run_pipeline
+
+pd = backends.lazy("pandas")
+
+BATCH_JOB_TTL_SECONDS = 3600  # Finished jobs are purged after this long
+BATCH_PURGE_INTERVAL_SECONDS = 60  # How often idle servers look for expired jobs
+UPLOAD_COPY_BYTES = 1024 * 1024  # Buffer size when copying uploads and ZIP members to disk
+CALCULATED_TIMESTAMP_HEADER = "Timestamp (calc)"
+
+_executor = None
+_slots = None
+
+
+def batch_worker_count() -> int:
+    configured = os.getenv("BATCH_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def get_batch_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=batch_worker_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def get_batch_slots() -> asyncio.Semaphore:
+    """
+    One slot per batch worker, shared by every job, so a file is only
+    handed to the pool, and reported as running, once a worker is free.
+    """
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(batch_worker_count())
+    return _slots
+
+
+def shutdown_batch_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _resolve_column(columns, column):
+    if column in columns:
+        return column
+    if str(column).isdigit() and int(column) < len(columns):
+        return columns[int(column)]
+    raise ValueError(f"Column '{column}' not found in file")
+
+
+def read_signal_csv(path, signal_column, timestamp_column=None, sampling_rate=None):
+    """
+    Read a `[timestamp, value]` array from a CSV file, loading only the mapped
+    columns. Columns can be given by header name or zero-based index. When no
+    timestamp column is mapped, timestamps are synthesized from the sampling
+    rate like the frontend does.
+    """
+    columns = list(pd.read_csv(path, nrows=0).columns)
+    signal_name = _resolve_column(columns, signal_column)
+
+    if timestamp_column in (None, "", CALCULATED_TIMESTAMP_HEADER):
+        values = pd.read_csv(path, usecols=[signal_name])[signal_name].to_numpy(dtype=np.float64)
+        timestamps = np.arange(len(values), dtype=np.float64) / sampling_rate
+        headers = [CALCULATED_TIMESTAMP_HEADER, signal_name]
+    else:
+        timestamp_name = _resolve_column(columns, timestamp_column)
+        frame = pd.read_csv(path, usecols=[timestamp_name, signal_name])
+        timestamps = frame[timestamp_name].to_numpy(dtype=np.float64)
+        values = frame[signal_name].to_numpy(dtype=np.float64)
+        headers = [timestamp_name, signal_name]
+
+    return np.column_stack((timestamps, values)), headers
+
+
+def process_batch_file(input_path: str, output_path: str, options: dict) -> dict:
+    """
+    Run the batch pipeline over one CSV file and write the processed CSV.
+
+    Executed inside the batch process pool, so it only takes and returns
+    picklable values and reports failures in the returned summary.
+    """
+    started = time.perf_counter()
+    try:
+        data, headers = read_signal_csv(
+            input_path,
+            options["signal_column"],
+            options.get("timestamp_column"),
+            options["sampling_rate"],
+        )
+        result = run_pipeline(
+            options["pipeline"],
+            data,
+            sampling_rate=options["sampling_rate"],
+            signal_type=options["signal_type"],
+        )
+        if result["beat_count"] is not None:
+            headers = ["Timestamp", "Heart Rate"]
+
+        pd.DataFrame(result["data"], columns=headers).to_csv(output_path, index=False)
+
+        return {
+            "status": "success",
+            "output_rows": int(len(result["data"])),
+            "step_count": len(result["steps"]),
+            "peak_count": len(result["peaks"]) if result["peaks"] is not None else None,
+            "beat_count": result["beat_count"],
+            "elapsed_seconds": time.perf_counter() - started,
+        }
+    except Exception as e:
+        summary = {
+            "status": "failed",
+            "error": str(e),
+            "elapsed_seconds": time.perf_counter() - started,
+        }
+        if isinstance(e, PipelineError) and e.node_id is not None:
+            summary["node_id"] = e.node_id
+        return summary
+
+
+def output_entry_name(filename: str, fallback_index: int) -> str:
+    """
+    Build the ZIP entry name for a processed file, mirroring the frontend.
+    """
+    base_name = re.sub(r"\.csv$", "", os.path.basename(filename), flags=re.IGNORECASE)
+    base_name = re.sub(r'[<>:"/\\|?*]', "_", base_name)
+    base_name = "".join(character for character in base_name if ord(character) >= 32).strip()
+    return f"{base_name or f'processed_{fallback_index}'}_processed.csv"
+
+
+class BatchJob:
+    def __init__(self, options: dict):
+        self.id = uuid.uuid4().hex
+        self.options = options
+        self.directory = tempfile.mkdtemp(prefix=f"signalchemist-batch-{self.id}-")
+        self.created_at = time.time()
+        self.finished_at = None
+        self.files = []
+        self.tasks = []
+        self.changed = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        return all(entry["status"] in ("success", "failed") for entry in self.files)
+
+    def add_upload(self, filename: str, source):
+        """
+        Copy an uploaded file object into the job directory. The CSV members
+        of a ZIP archive are extracted one by one from the copy on disk, so
+        neither the upload nor the archive is held in memory.
+        """
+        upload_path = os.path.join(self.directory, "upload.tmp")
+        with open(upload_path, "wb") as fh:
+            shutil.copyfileobj(source, fh, UPLOAD_COPY_BYTES)
+
+        if not filename.lower().endswith(".zip") and not zipfile.is_zipfile(upload_path):
+            os.replace(upload_path, self._add_entry(filename))
+            return
+
+        with zipfile.ZipFile(upload_path) as archive:
+            for member in archive.infolist():
+                if member.is_dir() or not member.filename.lower().endswith(".csv"):
+                    continue
+                if os.path.basename(member.filename).startswith("."):
+                    continue
+                with archive.open(member) as member_file, open(self._add_entry(member.filename), "wb") as fh:
+                    shutil.copyfileobj(member_file, fh, UPLOAD_COPY_BYTES)
+        os.remove(upload_path)
+
+    def _add_entry(self, filename: str) -> str:
+        index = len(self.files)
+        input_path = os.path.join(self.directory, f"input_{index}.csv")
+        self.files.append({
+            "index": index,
+            "name": filename,
+            "entry_name": output_entry_name(filename, index + 1),
+            "status": "queued",
+            "input_path": input_path,
+            "output_path": os.path.join(self.directory, f"output_{index}.csv"),
+        })
+        return input_path
+
+    def start(self):
+        for entry in self.files:
+            self.tasks.append(asyncio.ensure_future(self._process(entry)))
+
+    async def _process(self, entry: dict):
+        try:
+            async with get_batch_slots():
+                entry["status"] = "running"
+                summary = await asyncio.get_running_loop().run_in_executor(
+                    get_batch_executor(),
+                    process_batch_file,
+                    entry["input_path"],
+                    entry["output_path"],
+                    self.options,
+                )
+        except Exception as e:
+            summary = {"status": "failed", "error": str(e)}
+
+        entry.update(summary)
+        if os.path.exists(entry["input_path"]):
+            os.remove(entry["input_path"])
+        if self.done:
+            self.finished_at = time.time()
+
+        async with self.changed:
+            self.changed.notify_all()
+
+    def status_payload(self) -> dict:
+        files = [
+            {
+                key: value
+                for key, value in entry.items()
+                if key not in ("input_path", "output_path")
+            }
+            for entry in self.files
+        ]
+        counts = {
+            status: sum(1 for entry in self.files if entry["status"] == status)
+            for status in ("queued", "running", "success", "failed")
+        }
+        return {
+            "job_id": self.id,
+            "status": "completed" if self.done else "running",
+            "total": len(self.files),
+            **counts,
+            "files": files,
+        }
+
+    async def stream_results(self):
+        """
+        Yield a ZIP archive incrementally, adding each processed file as soon
+        as it finishes, followed by a `batch_summary.json` manifest.
+        """
+        buffer = _ZipStreamBuffer()
+        archive = zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED)
+        emitted = set()
+
+        while True:
+            async with self.changed:
+                ready = [
+                    entry for entry in self.files
+                    if entry["status"] == "success" and entry["index"] not in emitted
+                ]
+                if not ready and not self.done:
+                    await self.changed.wait()
+                    continue
+
+            for entry in ready:
+                emitted.add(entry["index"])
+                # Reading and deflating a file runs in a thread, off the event loop.
+                await asyncio.to_thread(archive.write, entry["output_path"], arcname=entry["entry_name"])
+                yield buffer.drain()
+
+            if self.done and all(
+                entry["index"] in emitted
+                for entry in self.files
+                if entry["status"] == "success"
+            ):
+                break
+
+        summary = json.dumps(self.status_payload(), indent=2)
+        await asyncio.to_thread(archive.writestr, "batch_summary.json", summary)
+        await asyncio.to_thread(archive.close)
+        yield buffer.drain()
+
+    def cleanup(self):
+        for task in self.tasks:
+            task.cancel()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """
+    Write-only, non-seekable sink so `zipfile` emits a streamable archive.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        chunk = b"".join(self._chunks)
+        self._chunks.clear()
+        return chunk
+
+
+_jobs: dict[str, BatchJob] = {}
+
+
+async def create_batch_job(uploads, options: dict) -> BatchJob:
+    """
+    Create and start a job from `(filename, file object)` uploads, copied
+    to the job directory off the event loop.
+    """
+    purge_expired_jobs()
+
+    job = BatchJob(options)
+    try:
+        for filename, source in uploads:
+            await asyncio.to_thread(job.add_upload, filename, source)
+    except BaseException:
+        job.cleanup()
+        raise
+
+    _jobs[job.id] = job
+    job.start()
+    return job
+
+
+def get_batch_job(job_id: str) -> BatchJob | None:
+    purge_expired_jobs()
+    return _jobs.get(job_id)
+
+
+def delete_batch_job(job_id: str) -> bool:
+    job = _jobs.pop(job_id, None)
+    if job is None:
+        return False
+    job.cleanup()
+    return True
+
+
+def purge_expired_jobs():
+    now = time.time()
+    for job_id, job in list(_jobs.items()):
+        if job.finished_at is not None and now - job.finished_at > BATCH_JOB_TTL_SECONDS:
+            delete_batch_job(job_id)
+
+
+async def purge_expired_jobs_periodically(interval: float = BATCH_PURGE_INTERVAL_SECONDS):
+    """
+    Purge expired jobs even when no request arrives to trigger it.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        purge_expired_jobs()
+
+
+def delete_all_batch_jobs():
+    for job_id in list(_jobs):
+        delete_batch_job(job_id)
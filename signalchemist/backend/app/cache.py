@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.execution import run_compute
+from app.telemetry import request_phase
+
+DEFAULT_RESULT_CACHE_BYTES = 256 * 1024 * 1024
+FINGERPRINT_INLINE_BYTES = 1024 * 1024  # Signals hashed on the event loop; larger ones in a thread
+
+
+def fingerprint_array(data) -> str:
+    """
+    Hash the dtype, shape and raw bytes of an array.
+    """
+    data = np.ascontiguousarray(data)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{data.dtype.str}{data.shape}".encode())
+    digest.update(memoryview(data).cast("B"))
+    return digest.hexdigest()
+
+
+def estimate_size(value) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(key) + estimate_size(item) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _freeze(value):
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _freeze(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _freeze(item)
+    return value
+
+
+class ResultCache:
+    """
+    LRU cache of computation results bounded by an approximate byte budget.
+
+    Keys hash the input signal bytes together with the operation name and its
+    normalized parameters, so identical requests share one entry.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_RESULT_CACHE_BYTES):
+        self.max_bytes = max(0, max_bytes)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(operation: str, data, params: dict) -> str:
+        normalized = json.dumps(params, sort_keys=True, default=str)
+        return f"{operation}:{fingerprint_array(data)}:{normalized}"
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: str, value):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        _freeze(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+
+result_cache = ResultCache(
+    int(os.getenv("RESULT_CACHE_MAX_BYTES") or DEFAULT_RESULT_CACHE_BYTES))
+
+
+async def _cache_key(operation: str, data, params: dict) -> str:
+    """
+    Result cache key of a request. Large signals are hashed in a worker
+    thread (`hashlib` releases the GIL), so the lookup does not block the
+    event loop either.
+    """
+    if np.asarray(data).nbytes > FINGERPRINT_INLINE_BYTES:
+        return await asyncio.to_thread(result_cache.key, operation, data, params)
+    return result_cache.key(operation, data, params)
+
+
+async def cached_compute(use_cache: bool, operation: str, data, params: dict, func, *args, **kwargs):
+    """
+    Run `func` on the compute executor, reusing the cached result of an
+    identical earlier request when `use_cache` is set.
+    """
+    with request_phase("compute"):
+        if not use_cache or not result_cache.enabled:
+            return await run_compute(func, *args, **kwargs)
+
+        key = await _cache_key(operation, data, params)
+        cached = result_cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = await run_compute(func, *args, **kwargs)
+        result_cache.put(key, result)
+        return result
+
+
+async def cached_compute_with_details(use_cache: bool, operation: str, data, params: dict, func, *args, **kwargs):
+    """
+    `cached_compute` for a `func` returning `(result, details)`, where the
+    details describe one computation. Only `result` is cached; a cache hit
+    returns `(result, None)`.
+    """
+    with request_phase("compute"):
+        if not use_cache or not result_cache.enabled:
+            return await run_compute(func, *args, **kwargs)
+
+        key = await _cache_key(operation, data, params)
+        cached = result_cache.get(key)
+        if cached is not None:
+            return cached, None
+
+        result, details = await run_compute(func, *args, **kwargs)
+        result_cache.put(key, result)
+        return result, details
@@ -0,0 +1,119 @@
+import os
+
+import numpy as np
+
+DEFAULT_CHUNK_SAMPLES = 1 << 20
+
+CHUNK_SAMPLES = int(os.getenv("CHUNK_SAMPLES") or DEFAULT_CHUNK_SAMPLES)
+
+
+def block_ranges(length: int, block_size: int, overlap: int):
+    """
+    Yield `(start, stop, padded_start, padded_stop)` for consecutive blocks
+    of `block_size` samples extended by `overlap` samples on both sides.
+    """
+    for start in range(0, length, block_size):
+        stop = min(length, start + block_size)
+        yield start, stop, max(0, start - overlap), min(length, stop + overlap)
+
+
+def covers_overlap(overlap: int, block_size: int | None = None) -> bool:
+    """
+    Whether blocks of `block_size` samples can carry `overlap` samples of
+    context. Longer reaches make `process_blockwise` and
+    `find_peaks_blockwise` run on the whole signal, so callers checking
+    memory limits must treat them as unchunked.
+    """
+    return overlap <= (block_size or CHUNK_SAMPLES)
+
+
+def process_blockwise(func, values, overlap: int, block_size: int | None = None):
+    """
+    Overlap-save evaluation of a sample-wise operation over a long signal.
+
+    `func` receives each block together with `overlap` neighbouring samples
+    on both sides and returns one array, or a tuple of arrays, of the same
+    length along the first axis; only the block's own samples are kept.
+    When `overlap` covers the operation's reach the result equals `func(values)`, while temporary
+    memory stays bounded by the block size. Signals no longer than one
+    block, or operations whose reach exceeds a block, run in one piece.
+    """
+    block_size = block_size or CHUNK_SAMPLES
+    length = len(values)
+    if length <= block_size or not covers_overlap(overlap, block_size):
+        return func(values)
+
+    outputs = None
+    is_tuple = False
+    for start, stop, padded_start, padded_stop in block_ranges(length, block_size, overlap):
+        result = func(values[padded_start:padded_stop])
+        if outputs is None:
+            is_tuple = isinstance(result, tuple)
+            outputs = [np.empty((length,) + np.shape(item)[1:], dtype=np.asarray(item).dtype)
+                       for item in (result if is_tuple else (result,))]
+        for output, item in zip(outputs, result if is_tuple else (result,)):
+            output[start:stop] = item[start - padded_start:stop - padded_start]
+
+    return tuple(outputs) if is_tuple else outputs[0]
+
+
+def find_peaks_blockwise(find, values, overlap: int, block_size: int | None = None):
+    """
+    Run the peak finder `find(values) -> indices` over overlapping blocks and
+    keep the peaks that fall inside each block's own samples.
+    """
+    block_size = block_size or CHUNK_SAMPLES
+    length = len(values)
+    if length <= block_size or not covers_overlap(overlap, block_size):
+        return find(values)
+
+    peaks = []
+    for start, stop, padded_start, padded_stop in block_ranges(length, block_size, overlap):
+        block_peaks = np.asarray(find(values[padded_start:padded_stop])) + padded_start
+        peaks.append(block_peaks[(block_peaks >= start) & (block_peaks < stop)])
+
+    return np.concatenate(peaks)
+
+
+def blockwise_mean_std(values, block_size: int | None = None):
+    """
+    Mean and population standard deviation along the first axis, accumulated
+    block by block so no temporary spans the whole signal.
+    """
+    block_size = block_size or CHUNK_SAMPLES
+    length = len(values)
+    if length <= block_size:
+        return np.mean(values, axis=0), np.std(values, axis=0)
+
+    mean = 0.0
+    squares = 0.0
+    count = 0
+    for start in range(0, length, block_size):
+        block = np.asarray(values[start:start + block_size], dtype=np.float64)
+        block_count = len(block)
+        block_mean = block.mean(axis=0)
+        block_squares = np.square(block - block_mean).sum(axis=0)
+        delta = block_mean - mean
+        total = count + block_count
+        mean = mean + delta * block_count / total
+        squares = squares + block_squares + delta * delta * count * block_count / total
+        count = total
+
+    return mean, np.sqrt(squares / count)
+
+
+def blockwise_min_max(values, block_size: int | None = None):
+    """
+    Minimum and maximum along the first axis, scanned block by block.
+    """
+    block_size = block_size or CHUNK_SAMPLES
+    if len(values) <= block_size:
+        return np.min(values, axis=0), np.max(values, axis=0)
+
+    minimum = np.inf
+    maximum = -np.inf
+    for start in range(0, len(values), block_size):
+        block = values[start:start + block_size]
+        minimum = np.minimum(minimum, np.min(block, axis=0))
+        maximum = np.maximum(maximum, np.max(block, axis=0))
+    return minimum, maximum
@@ -0,0 +1,301 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from app.chunked import CHUNK_SAMPLES
+
+DECIMATION_METHODS = ("minmax", "lttb")
+DEFAULT_DECIMATION_POINTS = 2000
+MAX_DECIMATION_POINTS = 100_000
+PYRAMID_BASE = 16  # Samples per bucket at the finest pyramid level
+LTTB_CANDIDATES_PER_POINT = 4  # Min/max candidates handed to LTTB per output point
+DEFAULT_PYRAMID_CACHE_BYTES = 128 * 1024 * 1024
+
+
+def _first_extreme(candidates, values, starts, reduce):
+    """
+    Index of the smallest (`np.minimum`) or largest (`np.maximum`) value
+    among `candidates` in each group beginning at `starts`.
+    """
+    picked = values[candidates]
+    extreme = reduce.reduceat(picked, starts)
+    counts = np.diff(np.append(starts, len(candidates)))
+    hits = np.flatnonzero(picked == np.repeat(extreme, counts))
+    if len(hits) == 0:
+        return candidates[starts]
+    first = np.searchsorted(hits, starts)
+    found = hits[np.minimum(first, len(hits) - 1)]
+    # Groups whose extreme is NaN have no hit; keep their first sample.
+    return candidates[np.where(found < starts + counts, found, starts)]
+
+
+def _pairwise_extreme(indices, values, pick):
+    if len(indices) % 2:
+        indices = np.append(indices, indices[-1])
+    pairs = indices.reshape(-1, 2)
+    chosen = pick(values[pairs], axis=1)
+    return pairs[np.arange(len(pairs)), chosen]
+
+
+class MinMaxPyramid:
+    """
+    Positions of the minimum and maximum of one channel at every power-of-two
+    bucket size from `PYRAMID_BASE` samples up.
+
+    Built once in O(n) with about two bytes per sample, after which the
+    extremes of any sample range, grouped into any number of buckets, are
+    found in time proportional to the number of buckets rather than to the
+    length of the range. Only indices are kept; values are read from the
+    signal at query time.
+    """
+
+    def __init__(self, values, base: int = PYRAMID_BASE):
+        self.base = base
+        self.length = len(values)
+        self.minima = []
+        self.maxima = []
+
+        full = self.length // base
+        if full == 0:
+            return
+
+        minima = np.empty(full, dtype=np.int64)
+        maxima = np.empty(full, dtype=np.int64)
+        step = max(1, CHUNK_SAMPLES // base)
+        for first in range(0, full, step):
+            last = min(full, first + step)
+            block = np.asarray(values[first * base:last * base]).reshape(-1, base)
+            offsets = np.arange(first, last, dtype=np.int64) * base
+            minima[first:last] = offsets + np.argmin(block, axis=1)
+            maxima[first:last] = offsets + np.argmax(block, axis=1)
+
+        while True:
+            self.minima.append(minima)
+            self.maxima.append(maxima)
+            if len(minima) <= 1:
+                break
+            minima = _pairwise_extreme(minima, values, np.argmin)
+            maxima = _pairwise_extreme(maxima, values, np.argmax)
+
+    @property
+    def levels(self) -> int:
+        return len(self.minima)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(level.nbytes for level in self.minima + self.maxima)
+
+    def bucket_size(self, level: int) -> int:
+        return self.base << level
+
+    def _range_candidates(self, start: int, stop: int):
+        """
+        Indices containing the extremes of `[start, stop)`: the pyramid
+        buckets that tile the range, plus raw samples at unaligned edges.
+        """
+        candidates = []
+        while start < stop:
+            if start % self.base or stop - start < self.base:
+                edge = min(stop, start + self.base - start % self.base)
+                candidates.append(np.arange(start, edge, dtype=np.int64))
+                start = edge
+                continue
+            level = 0
+            while (level + 1 < self.levels
+                   and start % self.bucket_size(level + 1) == 0
+                   and start + self.bucket_size(level + 1) <= stop):
+                level += 1
+            bucket = start // self.bucket_size(level)
+            candidates.append(np.array([self.minima[level][bucket], self.maxima[level][bucket]]))
+            start += self.bucket_size(level)
+        return np.concatenate(candidates) if candidates else np.empty(0, dtype=np.int64)
+
+    def _range_extremes(self, values, start: int, stop: int):
+        candidates = self._range_candidates(start, stop)
+        if len(candidates) == 0:
+            return candidates
+        picked = values[candidates]
+        return candidates[[np.argmin(picked), np.argmax(picked)]]
+
+    def minmax(self, values, start: int, stop: int, buckets: int):
+        """
+        Sorted indices of the minimum and maximum of `[start, stop)` split
+        into about `buckets` buckets, and the pyramid level that served them
+        (`None` when the range was small enough to scan sample by sample).
+        """
+        span = stop - start
+        if span <= 2 * buckets:
+            return np.arange(start, stop, dtype=np.int64), None
+
+        level = -1
+        while level + 1 < self.levels and self.bucket_size(level + 1) * buckets <= span:
+            level += 1
+
+        if level < 0:
+            # Buckets finer than the pyramid: scan the range, at most
+            # `PYRAMID_BASE` samples per output bucket.
+            candidates = np.arange(start, stop, dtype=np.int64)
+            starts = np.unique(np.linspace(0, span, buckets + 1).astype(np.int64)[:-1])
+            selected = np.concatenate((
+                _first_extreme(candidates, values, starts, np.minimum),
+                _first_extreme(candidates, values, starts, np.maximum),
+            ))
+            return np.unique(selected), None
+
+        size = self.bucket_size(level)
+        first = -(-start // size)
+        last = stop // size
+        if last <= first:
+            return np.unique(self._range_extremes(values, start, stop)), level
+        starts = np.unique(np.linspace(0, last - first, buckets + 1).astype(np.int64)[:-1])
+        minima = _first_extreme(self.minima[level][first:last], values, starts, np.minimum)
+        maxima = _first_extreme(self.maxima[level][first:last], values, starts, np.maximum)
+        # Unaligned samples at either end join the first and last bucket.
+        for edge, (edge_start, edge_stop) in ((0, (start, first * size)), (-1, (last * size, stop))):
+            extremes = self._range_extremes(values, edge_start, edge_stop)
+            if len(extremes):
+                if values[extremes[0]] < values[minima[edge]]:
+                    minima[edge] = extremes[0]
+                if values[extremes[1]] > values[maxima[edge]]:
+                    maxima[edge] = extremes[1]
+        return np.unique(np.concatenate((minima, maxima))), level
+
+
+def lttb(x, y, points: int):
+    """
+    Largest-Triangle-Three-Buckets: positions of `points` samples of `(x, y)`
+    that keep the visual shape of the line, always including both ends.
+    """
+    length = len(x)
+    if points >= length or points < 3:
+        return np.arange(length, dtype=np.int64)
+
+    edges = np.linspace(1, length - 1, points - 1).astype(np.int64)
+    next_edges = np.append(edges[2:], length)
+    next_starts = edges[1:]
+    counts = next_edges - next_starts
+    average_x = np.add.reduceat(x, next_starts) / counts
+    average_y = np.add.reduceat(y, next_starts) / counts
+    average_x[-1], average_y[-1] = x[-1], y[-1]
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = length - 1
+    anchor = 0
+    for bucket in range(points - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        anchor_x, anchor_y = x[anchor], y[anchor]
+        area = np.abs(
+            (anchor_x - average_x[bucket]) * (y[start:stop] - anchor_y)
+            - (anchor_x - x[start:stop]) * (average_y[bucket] - anchor_y)
+        )
+        anchor = start + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+    return selected
+
+
+def decimate(timestamps, values, points: int, method: str = "minmax",
+             start: float | None = None, end: float | None = None,
+             peaks=None, pyramid: MinMaxPyramid | None = None):
+    """
+    Reduce one channel to at most `points` samples between the timestamps
+    `start` and `end` for plotting.
+
+    `minmax` keeps the minimum and maximum of every bucket, so no excursion
+    disappears. `lttb` runs Largest-Triangle-Three-Buckets on min/max
+    candidates taken from the pyramid, so long ranges also cost O(points).
+    Sample indices listed in `peaks` that fall in the range are always kept,
+    on top of the point budget. Returns the selected indices and details of
+    the query.
+    """
+    if method not in DECIMATION_METHODS:
+        raise ValueError("Invalid decimation method")
+    if pyramid is None:
+        pyramid = MinMaxPyramid(values)
+
+    first = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+    last = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side="right"))
+    last = max(first, last)
+
+    if method == "minmax":
+        selected, level = pyramid.minmax(values, first, last, points // 2)
+    else:
+        candidates, level = pyramid.minmax(values, first, last, max(1, points * LTTB_CANDIDATES_PER_POINT // 2))
+        selected = candidates[lttb(timestamps[candidates], values[candidates], points)]
+
+    peak_count = 0
+    if peaks is not None and len(peaks):
+        peaks = np.asarray(peaks, dtype=np.int64)
+        peaks = peaks[(peaks >= first) & (peaks < last)]
+        peak_count = len(peaks)
+        selected = np.union1d(selected, peaks)
+
+    return selected, {
+        "method": method,
+        "points": int(len(selected)),
+        "peaks_kept": peak_count,
+        "range_samples": last - first,
+        "total_samples": len(timestamps),
+        "pyramid_level": level,
+        "bucket_samples": None if level is None else pyramid.bucket_size(level),
+    }
+
+
+class PyramidCache:
+    """
+    LRU cache of min/max pyramids of stored signals, keyed by signal id and
+    channel and bounded by the bytes of their indices.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_PYRAMID_CACHE_BYTES):
+        self.max_bytes = max(0, max_bytes)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(int(os.getenv("DECIMATION_CACHE_MAX_BYTES") or DEFAULT_PYRAMID_CACHE_BYTES))
+
+    def get(self, key):
+        with self._lock:
+            pyramid = self._entries.get(key)
+            if pyramid is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return pyramid
+
+    def put(self, key, pyramid: MinMaxPyramid):
+        if pyramid.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = pyramid
+            self._bytes += pyramid.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
+
+
+pyramid_cache = PyramidCache.from_env()
@@ -0,0 +1,183 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi.responses import JSONResponse
+
+from app.backends import warm_up, warm_up_enabled
+from app.telemetry import request_phase
+
+
+def _available_cores() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+class ExecutorUnavailable(Exception):
+    """
+    Raised when a call cannot run now but may succeed if retried.
+    """
+
+    message = "Server is unavailable, please retry later."
+
+    def __init__(self, retry_after: int):
+        super().__init__(self.message)
+        self.retry_after = retry_after
+
+
+class ExecutorSaturated(ExecutorUnavailable):
+    """
+    Raised when every worker is busy and the wait queue is full.
+    """
+
+    message = "Server is busy, please retry later."
+
+
+class WorkerCrashed(ExecutorUnavailable):
+    """
+    Raised when a process worker died while running the call. The pool is
+    replaced, so a retry runs on fresh workers.
+    """
+
+    message = "A compute worker stopped unexpectedly, please retry."
+
+
+class ComputeExecutor:
+    """
+    Run CPU-bound work off the event loop on a bounded thread or process pool.
+
+    At most `workers` calls run at once and at most `queue_size` more wait
+    for a slot; anything beyond that is rejected with `ExecutorSaturated`
+    so latency cannot grow without bound. When a process worker dies (an
+    OOM kill or a native crash) the pool is broken for good, so it is shut
+    down and rebuilt on the next call, and the affected calls raise
+    `WorkerCrashed`.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 1, queue_size: int = 0, retry_after: int = 1):
+        if kind not in ("thread", "process"):
+            raise ValueError("Executor kind must be 'thread' or 'process'")
+
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.retry_after = max(1, retry_after)
+        self._pool = None
+        self._slots = asyncio.Semaphore(self.workers)
+        self._waiting = 0
+        self._running = 0
+        self._counters = {
+            "submitted": 0,
+            "rejected": 0,
+            "completed": 0,
+            "failed": 0,
+            "worker_crashes": 0,
+            "max_queue_depth": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "run_seconds_total": 0.0,
+        }
+
+    @classmethod
+    def from_env(cls):
+        workers = int(os.getenv("COMPUTE_WORKERS") or _available_cores())
+        return cls(
+            kind=os.getenv("COMPUTE_EXECUTOR", "thread"),
+            workers=workers,
+            queue_size=int(os.getenv("COMPUTE_QUEUE_SIZE") or 4 * workers),
+            retry_after=int(os.getenv("COMPUTE_RETRY_AFTER") or 1),
+        )
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=warm_up if warm_up_enabled() else None,
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="signalchemist-compute",
+                )
+        return self._pool
+
+    async def run(self, func, *args, **kwargs):
+        if self._slots.locked() and self._waiting >= self.queue_size:
+            self._counters["rejected"] += 1
+            raise ExecutorSaturated(self.retry_after)
+
+        self._counters["submitted"] += 1
+        enqueued_at = time.perf_counter()
+        self._waiting += 1
+        if self._slots.locked():
+            self._counters["max_queue_depth"] = max(self._counters["max_queue_depth"], self._waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        started_at = time.perf_counter()
+        wait_seconds = started_at - enqueued_at
+        self._counters["wait_seconds_total"] += wait_seconds
+        self._counters["wait_seconds_max"] = max(self._counters["wait_seconds_max"], wait_seconds)
+        self._running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            pool = self._get_pool()
+            result = await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+            self._counters["completed"] += 1
+            return result
+        except BrokenProcessPool as e:
+            self._counters["failed"] += 1
+            self._counters["worker_crashes"] += 1
+            if self._pool is pool:
+                self.shutdown()
+            raise WorkerCrashed(self.retry_after) from e
+        except Exception:
+            self._counters["failed"] += 1
+            raise
+        finally:
+            self._running -= 1
+            self._counters["run_seconds_total"] += time.perf_counter() - started_at
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "running": self._running,
+            "queue_depth": self._waiting,
+            **self._counters,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+compute_executor = ComputeExecutor.from_env()
+
+
+async def run_compute(func, *args, **kwargs):
+    """
+    Run `func(*args, **kwargs)` on the shared compute executor.
+    """
+    with request_phase("compute"):
+        return await compute_executor.run(func, *args, **kwargs)
+
+
+def unavailable_response(error: ExecutorUnavailable):
+    return JSONResponse(
+        content={"error": str(error)},
+        status_code=503,
+        headers={"Retry-After": str(error.retry_after)},
+    )
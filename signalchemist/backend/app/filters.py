@@ -0,0 +1,185 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import scipy
+
+from app.chunked import process_blockwise
+
+DEFAULT_FILTER_DESIGN_CACHE_SIZE = 256
+SETTLING_TOLERANCE = 1e-15  # Relative impulse response left beyond the block overlap
+
+# Methods designed as second-order sections and applied forward-backward,
+# keyed by every name `neurokit2.signal_filter` accepts for them.
+SOS_METHODS = {
+    "butter": "butterworth",
+    "butterworth": "butterworth",
+    "bessel": "bessel",
+    "chebyshevii": "chebyshevii",
+}
+
+DEFAULT_FILTER_ORDER = 2  # Same default as neurokit2.signal_filter
+
+
+def _frequency(value):
+    if value is None:
+        return None
+    value = float(value)
+    return None if value == 0 else value
+
+
+def normalize_sos_config(config: dict, sampling_rate: float):
+    """
+    Reduce a filter config to the tuple that determines its coefficients, or
+    return None when the method is not handled by the SOS engine.
+    """
+    method = SOS_METHODS.get(str(config.get("method", "")).lower())
+    if method is None:
+        return None
+
+    lowcut = _frequency(config.get("lowcut"))
+    highcut = _frequency(config.get("highcut"))
+    if lowcut is None and highcut is None:
+        return None
+
+    return (
+        method,
+        int(config.get("order", DEFAULT_FILTER_ORDER)),
+        lowcut,
+        highcut,
+        float(sampling_rate),
+    )
+
+
+def design_sos(method: str, order: int, lowcut, highcut, sampling_rate: float):
+    """
+    Design the second-order sections the same way `neurokit2.signal_filter`
+    does for the given method and cutoffs.
+    """
+    if lowcut is not None and highcut is not None:
+        btype = "bandstop" if lowcut > highcut else "bandpass"
+        freqs = sorted((lowcut, highcut))
+    elif lowcut is not None:
+        btype = "highpass"
+        freqs = lowcut
+    else:
+        btype = "lowpass"
+        freqs = highcut
+
+    if method == "butterworth":
+        return scipy.signal.butter(order, freqs, btype=btype, output="sos", fs=sampling_rate)
+    if method == "bessel":
+        return scipy.signal.bessel(order, freqs, btype=btype, output="sos", fs=sampling_rate)
+    if method == "chebyshevii":
+        return scipy.signal.cheby2(order, 20, freqs, btype=btype, output="sos", fs=sampling_rate)
+
+    raise ValueError("Invalid filter method")
+
+
+class FilterDesignCache:
+    """
+    LRU cache of designed second-order sections keyed on the normalized
+    filter config.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_FILTER_DESIGN_CACHE_SIZE):
+        self.max_entries = max(0, max_entries)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: tuple):
+        with self._lock:
+            sos = self._entries.get(key)
+            if sos is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return sos
+            self._misses += 1
+
+        sos = design_sos(*key)
+        if self.max_entries:
+            with self._lock:
+                self._entries[key] = sos
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return sos
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+
+filter_design_cache = FilterDesignCache(
+    int(os.getenv("FILTER_DESIGN_CACHE_SIZE") or DEFAULT_FILTER_DESIGN_CACHE_SIZE))
+
+
+def sos_settling_samples(sos) -> int | None:
+    """
+    Samples after which the impulse response of `sos` has decayed below
+    `SETTLING_TOLERANCE`, or None when a pole lies on the unit circle.
+    """
+    radius = max(np.max(np.abs(np.roots(section[3:]))) for section in sos)
+    if radius >= 1:
+        return None
+    if radius == 0:
+        return len(sos) * 2
+    # The repeated poles of a cascade add a polynomial factor, covered by the
+    # extra sections' worth of decay.
+    return int(np.ceil(np.log(SETTLING_TOLERANCE) / np.log(radius))) * len(sos)
+
+
+def sos_block_overlap(config: dict, sampling_rate: float) -> int | None:
+    """
+    Overlap `sos_filter` keeps between blocks for the config, or None when
+    it filters in one piece or does not handle the config.
+    """
+    key = normalize_sos_config(config, sampling_rate)
+    if key is None:
+        return None
+    try:
+        return sos_settling_samples(filter_design_cache.get(key))
+    except ValueError:
+        return None
+
+
+def sos_filter(values, sampling_rate: float, config: dict):
+    """
+    Zero-phase filter `values` with cached second-order sections.
+
+    A 2-D `values` array holds one channel per column, all filtered along
+    the sample axis in the same `sosfiltfilt` call. Long signals are
+    filtered block by block with an overlap covering the filter's settling
+    time, matching the whole-signal result to rounding.
+
+    Returns None when the config is not handled by the SOS engine, or when
+    the signal has missing values, so the caller can fall back to NeuroKit.
+    """
+    key = normalize_sos_config(config, sampling_rate)
+    if key is None:
+        return None
+
+    values = np.asarray(values, dtype=np.float64)
+    if np.isnan(values).any():
+        return None
+
+    sos = filter_design_cache.get(key)
+    settling = sos_settling_samples(sos)
+    if settling is None:
+        return scipy.signal.sosfiltfilt(sos, values, axis=0)
+
+    return process_blockwise(
+        lambda block: scipy.signal.sosfiltfilt(sos, block, axis=0), values, overlap=settling)
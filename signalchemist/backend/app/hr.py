@@ -1,5 +1,10 @@
 import numpy as np
-import neurokit2
+import scipy
+
+from app.backends import backends
+from app.intermediates import Intermediates
+
+neurokit2 = backends.lazy("neurokit2")
 
 
 class DigitalFilter:
@@ -42,64 +47,152 @@ def _empty_heart_rate_result():
     return np.empty((0, 2), dtype=np.float64)
 
 
-def detect_ppg_peaks(values, sampling_rate: float):
-    cleaned = neurokit2.ppg_clean(values, sampling_rate=sampling_rate)
-    info = neurokit2.ppg_findpeaks(
-        cleaned,
-        sampling_rate=sampling_rate,
-        method="elgendi",
-    )
-    return np.asarray(info["PPG_Peaks"], dtype=int)
+def detect_ppg_peaks(values, sampling_rate: float, intermediates: Intermediates | None = None):
+    if intermediates is None:
+        intermediates = Intermediates(values, sampling_rate)
+    return intermediates.ppg_peaks()
 
 
-def compute_emotibit_heart_rate(data, sampling_rate: float):
-    if len(data) == 0:
-        return _empty_heart_rate_result()
+def _sorted_beats(peaks):
+    peaks = np.asarray(peaks, dtype=int)
+    if len(peaks) > 1 and not np.all(peaks[1:] > peaks[:-1]):
+        return np.unique(peaks)
+    return peaks
 
-    timestamps = data[:, 0]
-    signal = data[:, 1]
-    peaks = detect_ppg_peaks(signal, sampling_rate)
 
-    heart_rate_filter = DigitalFilter("IIR_LOWPASS", sampling_rate, 1)
+def _emotibit_raw_heart_rates(peaks, sampling_rate: float):
+    """
+    Unfiltered EmotiBit heart rate at each beat of a sorted, unique peak array.
+
+    The first interval counts the samples from the start of the recording up
+    to and including the first beat, like the EmotiBit sample counter does.
+    """
     time_period_ms = (1.0 / sampling_rate) * 1000.0
+    inter_beat_sample_count = np.diff(peaks, prepend=-1)
+    inter_beat_interval = inter_beat_sample_count * time_period_ms
+    return (60.0 / inter_beat_interval) * 1000.0
 
-    beats = np.zeros(len(signal), dtype=int)
-    beats[peaks] = 1
 
-    heart_rates = []
-    beat_timestamps = []
-    inter_beat_sample_count = 0
+def _emotibit_filter_coefficients(sampling_rate: float):
+    alpha = DigitalFilter("IIR_LOWPASS", sampling_rate, 1)._alpha
+    return np.array([1.0 - alpha, 0.0]), np.array([1.0, -alpha]), alpha
 
-    for index, has_beat in enumerate(beats):
-        inter_beat_sample_count += 1
 
-        if has_beat:
-            inter_beat_interval = inter_beat_sample_count * time_period_ms
-            heart_rate = (60.0 / inter_beat_interval) * 1000.0
-            heart_rate = heart_rate_filter.filter(heart_rate)
+def emotibit_heart_rate_from_peaks(peaks, sampling_rate: float):
+    """
+    Vectorized EmotiBit heart rate for the given peak indices.
 
-            heart_rates.append(heart_rate)
-            beat_timestamps.append(timestamps[index])
-            inter_beat_sample_count = 0
+    Inter-beat intervals come from `np.diff` of the peaks and the one-pole
+    `DigitalFilter` low-pass is applied with a single `lfilter` call whose
+    initial state reproduces the filter's first-sample initialization, so the
+    output matches the per-sample loop bit for bit.
 
-    if not heart_rates:
-        return _empty_heart_rate_result()
+    Returns the sorted unique beat indices and their filtered heart rates.
+    """
+    peaks = _sorted_beats(peaks)
+    if len(peaks) == 0:
+        return peaks, np.empty(0, dtype=np.float64)
+
+    raw_heart_rates = _emotibit_raw_heart_rates(peaks, sampling_rate)
+    b, a, alpha = _emotibit_filter_coefficients(sampling_rate)
+    heart_rates, _ = scipy.signal.lfilter(b, a, raw_heart_rates, zi=[raw_heart_rates[0] * alpha])
+    return peaks, heart_rates
+
+
+def emotibit_heart_rate_from_peak_sets(peak_sets, sampling_rate: float):
+    """
+    EmotiBit heart rate for many recordings sharing a sampling rate.
 
-    return np.column_stack((beat_timestamps, heart_rates))
+    The raw heart rates of every recording are packed into one padded 2-D
+    array and filtered with a single `lfilter` call along the beat axis.
+    Padding only follows the last beat of each row, so it never reaches the
+    causal filter output that is kept. Returns a list of
+    `(beat indices, heart rates)` pairs, one per recording.
+    """
+    beat_sets = [_sorted_beats(peaks) for peaks in peak_sets]
+    max_beats = max((len(beats) for beats in beat_sets), default=0)
+    if max_beats == 0:
+        return [(beats, np.empty(0, dtype=np.float64)) for beats in beat_sets]
 
+    raw_heart_rates = np.zeros((len(beat_sets), max_beats), dtype=np.float64)
+    for row, beats in enumerate(beat_sets):
+        if len(beats):
+            raw_heart_rates[row, : len(beats)] = _emotibit_raw_heart_rates(beats, sampling_rate)
 
-def compute_neurokit_heart_rate(data, sampling_rate: float):
+    b, a, alpha = _emotibit_filter_coefficients(sampling_rate)
+    initial_state = raw_heart_rates[:, :1] * alpha
+    heart_rates, _ = scipy.signal.lfilter(b, a, raw_heart_rates, axis=1, zi=initial_state)
+
+    return [
+        (beats, heart_rates[row, : len(beats)])
+        for row, beats in enumerate(beat_sets)
+    ]
+
+
+def compute_emotibit_heart_rate(data, sampling_rate: float, intermediates: Intermediates | None = None):
     if len(data) == 0:
         return _empty_heart_rate_result()
 
     timestamps = data[:, 0]
     signal = data[:, 1]
+    peaks = detect_ppg_peaks(signal, sampling_rate, intermediates)
+    beats, heart_rates = emotibit_heart_rate_from_peaks(peaks, sampling_rate)
 
-    signals, _ = neurokit2.ppg_process(signal, sampling_rate=sampling_rate)
-    peak_mask = np.asarray(signals["PPG_Peaks"].values, dtype=bool)
-    rate_values = np.asarray(signals["PPG_Rate"].values, dtype=np.float64)
+    if len(beats) == 0:
+        return _empty_heart_rate_result()
 
-    if not peak_mask.any():
+    return np.column_stack((timestamps[beats], heart_rates))
+
+
+def compute_emotibit_heart_rate_batch(timestamps, signals, sampling_rate: float):
+    """
+    EmotiBit heart rate for a 2-D array of recordings, one per row.
+
+    `timestamps` is either shared by every row (1-D) or given per row (2-D).
+    Peak detection runs per recording; the heart rate engine runs once for
+    the whole batch. Returns one `[timestamp, heart rate]` array per row.
+    """
+    signals = np.atleast_2d(np.asarray(signals, dtype=np.float64))
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    if timestamps.ndim == 1:
+        timestamps = np.broadcast_to(timestamps, signals.shape)
+
+    peak_sets = [
+        detect_ppg_peaks(signal, sampling_rate) if len(signal) else np.empty(0, dtype=int)
+        for signal in signals
+    ]
+    results = []
+    for row, (beats, heart_rates) in enumerate(
+        emotibit_heart_rate_from_peak_sets(peak_sets, sampling_rate)
+    ):
+        if len(beats) == 0:
+            results.append(_empty_heart_rate_result())
+        else:
+            results.append(np.column_stack((timestamps[row, beats], heart_rates)))
+    return results
+
+
+def compute_neurokit_heart_rate(data, sampling_rate: float, intermediates: Intermediates | None = None):
+    """
+    NeuroKit heart rate at each beat, as `neurokit2.ppg_process` reports it.
+
+    Only the steps whose output is used are run: the cleaned signal and its
+    peaks, shared with the other PPG analyses, and `signal_rate`. The
+    quality index `ppg_process` also computes is skipped.
+    """
+    if len(data) == 0:
         return _empty_heart_rate_result()
 
-    return np.column_stack((timestamps[peak_mask], rate_values[peak_mask]))
+    timestamps = data[:, 0]
+    signal = data[:, 1]
+
+    peaks = detect_ppg_peaks(signal, sampling_rate, intermediates)
+    if len(peaks) == 0:
+        return _empty_heart_rate_result()
+
+    rate_values = np.asarray(
+        neurokit2.signal_rate(peaks, sampling_rate=sampling_rate, desired_length=len(signal)),
+        dtype=np.float64,
+    )
+    beats = np.unique(peaks)
+    return np.column_stack((timestamps[beats], rate_values[beats]))
@@ -0,0 +1,244 @@
+import csv
+import gzip
+
+import numpy as np
+
+from app.backends import backends
+from app.transport import SIGNAL_DTYPE, TransportError
+
+pd = backends.lazy("pandas")
+
+INGEST_FORMATS = ("csv", "parquet")
+CANDIDATE_DELIMITERS = ",;\t|"
+TIMESTAMP_NAMES = ("timestamp", "timestamps", "time", "t", "localtimestamp", "epoch")
+HEADER_BYTES = 64 * 1024
+CSV_BLOCK_BYTES = 16 * 1024 * 1024  # Bytes handed to each Arrow CSV parsing task
+
+GZIP_MAGIC = b"\x1f\x8b"
+PARQUET_MAGIC = b"PAR1"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.csv
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def detect_format(file, filename: str | None) -> tuple[str, bool]:
+    """
+    File format and gzip compression, from the first bytes of the file and
+    then its name.
+    """
+    head = file.read(4)
+    file.seek(0)
+    if head.startswith(GZIP_MAGIC):
+        return "csv", True
+    if head == PARQUET_MAGIC or (filename or "").lower().endswith(".parquet"):
+        return "parquet", False
+    return "csv", False
+
+
+def _csv_header(file, compressed: bool, delimiter: str | None) -> tuple[str, list[str]]:
+    """
+    Delimiter and column names from the first line, sniffing the delimiter
+    when it is not given.
+    """
+    stream = gzip.GzipFile(fileobj=file, mode="rb") if compressed else file
+    line = stream.readline(HEADER_BYTES).decode("utf-8-sig", errors="replace").rstrip("\r\n")
+    file.seek(0)
+    if delimiter is None:
+        try:
+            delimiter = csv.Sniffer().sniff(line, delimiters=CANDIDATE_DELIMITERS).delimiter
+        except csv.Error:
+            delimiter = ","
+    return delimiter, next(csv.reader([line], delimiter=delimiter), [])
+
+
+def _column_list(columns) -> list[str]:
+    if not columns:
+        return []
+    if isinstance(columns, str):
+        return [name.strip() for name in columns.split(",") if name.strip()]
+    return [str(name) for name in columns]
+
+
+def _guess_timestamp_column(names: list[str]) -> str | None:
+    for name in names:
+        if name.strip().lower() in TIMESTAMP_NAMES:
+            return name
+    return None
+
+
+class _ArrowColumns:
+    def __init__(self, pyarrow, table):
+        self.pyarrow = pyarrow
+        self.table = table
+        self.names = table.column_names
+        self.time_origin = None
+
+    def is_numeric(self, name: str) -> bool:
+        kind = self.table.column(name).type
+        return self.pyarrow.types.is_integer(kind) or self.pyarrow.types.is_floating(kind)
+
+    def read(self, name: str) -> np.ndarray:
+        types = self.pyarrow.types
+        column = self.table.column(name)
+        if types.is_timestamp(column.type) or types.is_date(column.type):
+            # Seconds from the earliest row keep sub-microsecond precision
+            # in float64; its epoch time is reported separately.
+            nanoseconds = column.cast(self.pyarrow.timestamp("ns")).cast(self.pyarrow.int64())
+            origin = self.pyarrow.compute.min(nanoseconds).as_py()
+            if origin is None:
+                raise TransportError(f"Column '{name}' has no timestamps")
+            self.time_origin = origin / 1e9
+            offsets = self.pyarrow.compute.subtract(nanoseconds, origin)
+            return offsets.to_numpy().astype(SIGNAL_DTYPE) / 1e9
+        if not (types.is_integer(column.type) or types.is_floating(column.type)):
+            raise TransportError(f"Column '{name}' is not numeric")
+        return column.to_numpy().astype(SIGNAL_DTYPE, copy=False)
+
+
+class _PandasColumns:
+    def __init__(self, frame):
+        self.frame = frame
+        self.names = [str(name) for name in frame.columns]
+        self.time_origin = None
+
+    def is_numeric(self, name: str) -> bool:
+        return pd.api.types.is_numeric_dtype(self.frame[name])
+
+    def read(self, name: str) -> np.ndarray:
+        try:
+            return self.frame[name].to_numpy(dtype=SIGNAL_DTYPE)
+        except (TypeError, ValueError) as e:
+            raise TransportError(f"Column '{name}' is not numeric") from e
+
+
+def _read_table(file, file_format: str, compressed: bool, delimiter: str | None, columns: list[str] | None):
+    pyarrow = _import_pyarrow()
+    if file_format == "parquet":
+        if pyarrow is None:
+            raise TransportError("Parquet ingestion requires pyarrow to be installed", status_code=415)
+        try:
+            return _ArrowColumns(pyarrow, pyarrow.parquet.read_table(file, columns=columns))
+        except (pyarrow.ArrowInvalid, KeyError) as e:
+            raise TransportError(f"Invalid Parquet file: {e}") from e
+
+    if pyarrow is not None:
+        source = pyarrow.PythonFile(file, mode="r")
+        if compressed:
+            source = pyarrow.CompressedInputStream(source, "gzip")
+        try:
+            return _ArrowColumns(pyarrow, pyarrow.csv.read_csv(
+                source,
+                read_options=pyarrow.csv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+                parse_options=pyarrow.csv.ParseOptions(delimiter=delimiter),
+                convert_options=pyarrow.csv.ConvertOptions(include_columns=columns),
+            ))
+        except (pyarrow.ArrowInvalid, KeyError) as e:
+            raise TransportError(f"Invalid CSV file: {e}") from e
+
+    try:
+        return _PandasColumns(pd.read_csv(
+            file, sep=delimiter, usecols=columns, engine="c",
+            compression="gzip" if compressed else None))
+    except (ValueError, pd.errors.ParserError) as e:
+        raise TransportError(f"Invalid CSV file: {e}") from e
+
+
+def _column_names(file, file_format: str, compressed: bool, delimiter: str | None):
+    if file_format == "parquet":
+        pyarrow = _import_pyarrow()
+        if pyarrow is None:
+            raise TransportError("Parquet ingestion requires pyarrow to be installed", status_code=415)
+        try:
+            names = pyarrow.parquet.read_schema(file).names
+        except pyarrow.ArrowInvalid as e:
+            raise TransportError(f"Invalid Parquet file: {e}") from e
+        file.seek(0)
+        return delimiter, names
+    return _csv_header(file, compressed, delimiter)
+
+
+def ingest_signal(
+    file,
+    filename: str | None = None,
+    file_format: str | None = None,
+    value_columns=None,
+    timestamp_column: str | None = None,
+    sampling_rate: float | None = None,
+    delimiter: str | None = None,
+):
+    """
+    Parse a CSV (optionally gzip-compressed) or Parquet recording into an
+    `(n, 1 + channels)` `[timestamp, value, ...]` array.
+
+    Arrow's multithreaded readers are used when pyarrow is installed; CSV
+    falls back to the pandas C parser otherwise. The header is read first so
+    that only the needed columns are parsed, and Parquet only reads those
+    columns from the file. Without `value_columns`, every numeric column
+    other than the timestamp is a channel.
+
+    Timestamps come from `timestamp_column`; without one they are
+    synthesized from `sampling_rate` starting at 0, or else taken from a
+    column named like a timestamp. Datetime columns become seconds from
+    the earliest row, whose epoch time is returned as `time_origin`. Rows
+    with a missing value are dropped.
+    """
+    detected, compressed = detect_format(file, filename)
+    file_format = (file_format or detected).lower()
+    if file_format not in INGEST_FORMATS:
+        raise TransportError("Unsupported file format, expected 'csv' or 'parquet'", status_code=415)
+
+    delimiter, names = _column_names(file, file_format, compressed, delimiter)
+    if timestamp_column and timestamp_column not in names:
+        raise TransportError(f"Timestamp column '{timestamp_column}' not found")
+
+    guessed = timestamp_column or _guess_timestamp_column(names)
+    if timestamp_column is None and sampling_rate is None:
+        timestamp_column = guessed
+    if timestamp_column is None and sampling_rate is None:
+        raise TransportError("A timestamp column or a sampling rate is required")
+
+    value_columns = _column_list(value_columns)
+    missing = [name for name in value_columns if name not in names]
+    if missing:
+        raise TransportError(f"Columns not found: {', '.join(missing)}")
+
+    wanted = None
+    if value_columns:
+        wanted = value_columns + ([timestamp_column] if timestamp_column not in (None, *value_columns) else [])
+    table = _read_table(file, file_format, compressed, delimiter, wanted)
+
+    if not value_columns:
+        value_columns = [name for name in table.names if name != guessed and table.is_numeric(name)]
+        if not value_columns:
+            raise TransportError("No numeric value columns found")
+
+    data = None
+    for index, name in enumerate(value_columns, start=1):
+        values = table.read(name)
+        if data is None:
+            data = np.empty((len(values), 1 + len(value_columns)), dtype=SIGNAL_DTYPE)
+        data[:, index] = values
+    length = len(data)
+    data[:, 0] = table.read(timestamp_column) if timestamp_column else np.arange(length) / sampling_rate
+
+    valid = ~np.isnan(data).any(axis=1)
+    dropped = length - int(np.count_nonzero(valid))
+    if dropped:
+        data = data[valid]
+
+    return data, {
+        "format": file_format,
+        "compressed": compressed,
+        "timestamp_column": timestamp_column,
+        "value_columns": value_columns,
+        "dropped_rows": dropped,
+        "time_origin": table.time_origin,
+    }
@@ -0,0 +1,104 @@
+import json
+import os
+
+import numpy as np
+
+from app.backends import backends
+from app.cache import ResultCache, fingerprint_array
+
+neurokit2 = backends.lazy("neurokit2")
+
+DEFAULT_INTERMEDIATE_CACHE_BYTES = 128 * 1024 * 1024
+
+intermediate_cache = ResultCache(
+    int(os.getenv("INTERMEDIATE_CACHE_MAX_BYTES") or DEFAULT_INTERMEDIATE_CACHE_BYTES))
+
+
+class Intermediates:
+    """
+    Intermediate products of one recording: cleaned signals, peak indices
+    and the phasic and tonic EDA components, each computed at most once.
+
+    Products are kept on the instance, so every analysis of one request
+    shares them. With `memoize`, they are also shared through
+    `intermediate_cache`, keyed by the fingerprint of the recording, the
+    sampling rate and the stage parameters, so `/peaks`, `/hr` and
+    `/analyze` reuse what an earlier request on the same recording
+    computed.
+    """
+
+    def __init__(self, values, sampling_rate: float, memoize: bool = False):
+        self.values = values
+        self.sampling_rate = sampling_rate
+        self.memoize = memoize and intermediate_cache.enabled
+        self.computed = []
+        self.reused = []
+        self._fingerprint = None
+        self._products = {}
+
+    @property
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            self._fingerprint = fingerprint_array(self.values)
+        return self._fingerprint
+
+    def _stage(self, stage: str, params: dict, func):
+        local_key = (stage, json.dumps(params, sort_keys=True))
+        if local_key in self._products:
+            return self._products[local_key]
+
+        key = None
+        if self.memoize:
+            key = f"{stage}:{self.fingerprint}:{json.dumps({'sampling_rate': self.sampling_rate, **params}, sort_keys=True)}"
+            product = intermediate_cache.get(key)
+            if product is not None:
+                self.reused.append(stage)
+                self._products[local_key] = product
+                return product
+
+        product = func()
+        self.computed.append(stage)
+        if key is not None:
+            intermediate_cache.put(key, product)
+        self._products[local_key] = product
+        return product
+
+    def ppg_clean(self) -> np.ndarray:
+        return self._stage("ppg_clean", {}, lambda: np.asarray(
+            neurokit2.ppg_clean(self.values, sampling_rate=self.sampling_rate), dtype=np.float64))
+
+    def ppg_peaks(self, method: str = "elgendi") -> np.ndarray:
+        """
+        Systolic peaks of the cleaned PPG, as found by `neurokit2.ppg_process`.
+        """
+        return self._stage("ppg_peaks", {"method": method}, lambda: np.asarray(
+            neurokit2.ppg_findpeaks(
+                self.ppg_clean(), sampling_rate=self.sampling_rate, method=method)["PPG_Peaks"],
+            dtype=int))
+
+    def eda_clean(self) -> np.ndarray:
+        return self._stage("eda_clean", {}, lambda: np.asarray(
+            neurokit2.eda_clean(self.values, sampling_rate=self.sampling_rate), dtype=np.float64))
+
+    def eda_components(self) -> dict:
+        """
+        `phasic` and `tonic` components of the cleaned EDA.
+        """
+        def decompose():
+            components = neurokit2.eda_phasic(self.eda_clean(), sampling_rate=self.sampling_rate)
+            return {
+                "phasic": np.asarray(components["EDA_Phasic"].values, dtype=np.float64),
+                "tonic": np.asarray(components["EDA_Tonic"].values, dtype=np.float64),
+            }
+
+        return self._stage("eda_components", {}, decompose)
+
+    def eda_peaks(self) -> np.ndarray:
+        return self._stage("eda_peaks", {}, lambda: np.asarray(
+            neurokit2.eda_findpeaks(
+                self.eda_components()["phasic"], sampling_rate=self.sampling_rate,
+                method="neurokit")["SCR_Peaks"],
+            dtype=int))
+
+    def report(self) -> dict:
+        return {"computed": list(self.computed), "reused": list(self.reused)}
@@ -1,23 +1,117 @@
-from fastapi import FastAPI, Form
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, File, Form, Request, UploadFile, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
-import pandas as pd
-import neurokit2
 import numpy as np
-import scipy
-
-from app.hr import compute_emotibit_heart_rate, compute_neurokit_heart_rate
-from app.metrics import (
-    bottcher_quality,
-    kleckner_quality,
-    kleckner_quality_filter,
-    maki_quality,
+
+from app.backends import backends, warm_up, warm_up_enabled
+from app.batch import (
+    create_batch_job,
+    delete_all_batch_jobs,
+    delete_batch_job,
+    get_batch_job,
+    purge_expired_jobs_periodically,
+    shutdown_batch_executor,
+)
+from app.cache import cached_compute, cached_compute_with_details, result_cache
+from app.chunked import covers_overlap
+from app.decimation import (
+    DECIMATION_METHODS,
+    DEFAULT_DECIMATION_POINTS,
+    MAX_DECIMATION_POINTS,
+    MinMaxPyramid,
+    decimate,
+    pyramid_cache,
+)
+from app.execution import (
+    ExecutorUnavailable,
+    compute_executor,
+    run_compute,
+    unavailable_response,
+)
+from app.filters import filter_design_cache
+from app.ingest import ingest_signal
+from app.intermediates import Intermediates, intermediate_cache
+from app.outliers import (
+    OUTLIER_THRESHOLDS,
+    OUTLIER_WINDOW_SECONDS,
+    WINDOWED_TECHNIQUES,
+    window_size,
+)
+from app.pipeline import PipelineError, pipeline_uses_python, run_pipeline
+from app.processing import (
+    ANALYSES,
+    HEART_RATE_METHODS,
+    analyze_signal,
+    apply_builtin_filter,
+    apply_normalization,
+    apply_python_filter,
+    build_peak_payload,
+    channel_values,
+    quality_metrics,
+    detect_peak_indices,
+    estimate_sampling_rate,
+    exceeds_max_samples,
+    filter_runs_chunked,
+    peak_overlap,
+    python_enabled,
+    remove_outliers,
+    resample_signal,
+    resampled_length,
+    sanitize_filter_config,
+    with_timestamps,
+)
+from app.resampling import RESAMPLING_TECHNIQUES
+from app.sandbox import python_filter_pool
+from app.signals import resolve_signal, signal_store
+from app.spectrum import (
+    DEFAULT_SEGMENT_SECONDS,
+    DEFAULT_SPECTROGRAM_FRAMES,
+    DEFAULT_SPECTRUM_BINS,
+    MAX_SPECTROGRAM_FRAMES,
+    MAX_SPECTRUM_BINS,
+    MIN_SEGMENT_SAMPLES,
+    SPECTRUM_METHODS,
+    compute_spectrum,
+)
+from app.streaming import MAX_STREAMS, StreamError, StreamProcessor
+from app.telemetry import (
+    CONTENT_TYPE,
+    TelemetryMiddleware,
+    label_request,
+    record_samples,
+    request_metrics,
+    request_phase,
+)
+from app.transport import (
+    TransportError,
+    decode_raw,
+    decode_signal,
+    signal_response,
+    transport_error_response,
 )
-from app.outliers import *
 
 import json
-import os
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if warm_up_enabled():
+        await asyncio.to_thread(warm_up)
+    if python_enabled():
+        await asyncio.to_thread(python_filter_pool.start)
+    batch_purge = asyncio.create_task(purge_expired_jobs_periodically())
+    yield
+    batch_purge.cancel()
+    compute_executor.shutdown()
+    python_filter_pool.shutdown()
+    signal_store.close()
+    shutdown_batch_executor()
+    delete_all_batch_jobs()
+
 
 app = FastAPI(
     title="SignAlchemist",
@@ -29,7 +123,8 @@ The SignAlchemist API provides tools for **preprocessing** and **quality assessm
 ---
 """,
     version="1.0.0",
-    root_path="/api"
+    root_path="/api",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -38,14 +133,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(TelemetryMiddleware)
 
-MAX_SAMPLES_ALLOWED = 150_000  # Maximum samples allowed for processing in production
-
-
-def check_max_samples(length: int, operation: str):
-    python_enabled = os.getenv("PYTHON_ENABLED") == "true"
-    if not python_enabled and length > MAX_SAMPLES_ALLOWED:
+def check_max_samples(length: int, operation: str, chunked: bool = False):
+    if exceeds_max_samples(length, chunked):
         return JSONResponse(
             content={
                 "error": f"{operation} request too large for production server."},
@@ -54,6 +147,28 @@ def check_max_samples(length: int, operation: str):
     return None
 
 
+def channel_samples(data) -> int:
+    """
+    Number of values across every channel of a `[timestamp, value, ...]` array.
+    """
+    return len(data) * (data.shape[1] - 1)
+
+
+def check_single_channel(data, operation: str):
+    if data.shape[1] != 2:
+        return JSONResponse(
+            content={"error": f"{operation} supports a single channel only."},
+            status_code=400
+        )
+    return None
+
+
+def stored_output(store_result: bool, data) -> dict:
+    if not store_result:
+        return {}
+    return {"signal_id": signal_store.put(data)}
+
+
 def validate_sampling_rate(sampling_rate: float, operation: str):
     if not np.isfinite(sampling_rate) or sampling_rate <= 0:
         return JSONResponse(
@@ -65,66 +180,287 @@ def validate_sampling_rate(sampling_rate: float, operation: str):
     return None
 
 
-def sanitize_filter_config(config: dict) -> dict:
+@app.get("/", tags=["System"])
+def read_root():
+    return {"message": "Welcome to the SignAlchemist API"}
+
+
+@app.get("/executor/stats", summary="Compute executor statistics", tags=["System"])
+def executor_stats():
+    """
+    Report worker pool size, queue depth, rejections and wait/run times.
+    """
+    return compute_executor.stats()
+
+
+@app.get("/cache/stats", summary="Result cache statistics", tags=["System"])
+def cache_stats():
+    """
+    Report result cache size, budget, hits, misses and evictions.
+    """
+    return result_cache.stats()
+
+
+@app.delete("/cache", summary="Clear the result cache", tags=["System"])
+def cache_clear():
+    result_cache.clear()
+    intermediate_cache.clear()
+    return {"message": "Result cache cleared"}
+
+
+@app.get("/intermediates/stats", summary="Intermediate product cache statistics", tags=["System"])
+def intermediates_stats():
+    """
+    Report the cache of cleaned signals, peaks and EDA components shared by
+    the analysis endpoints.
+    """
+    return intermediate_cache.stats()
+
+
+@app.get("/filters/stats", summary="Filter design cache statistics", tags=["System"])
+def filter_stats():
+    """
+    Report how often built-in filter coefficients were reused instead of redesigned.
+    """
+    return filter_design_cache.stats()
+
+
+@app.get("/backends/stats", summary="Algorithm backend loading statistics", tags=["System"])
+def backend_stats():
+    """
+    Report which heavy backends (NeuroKit, pandas, SciPy subpackages) are
+    loaded, how long each import took and the duration of the startup warm-up.
+    """
+    return backends.stats()
+
+
+@app.get("/python-filters/stats", summary="Custom Python filter worker statistics", tags=["System"])
+def python_filter_stats():
+    """
+    Report the custom filter worker pool, its limits, reuse of compiled
+    filters, errors, timeouts and worker restarts.
+    """
+    return python_filter_pool.stats()
+
+
+@app.get("/telemetry", summary="Request telemetry in Prometheus format", tags=["System"])
+def telemetry():
+    """
+    Expose request latency, per-phase (decode, validate, compute, encode)
+    durations, signal sizes, payload bytes and in-flight requests in the
+    Prometheus text format, labelled by endpoint and algorithm.
+    """
+    return Response(content=request_metrics.render(), media_type=CONTENT_TYPE)
+
+
+@app.options("/signals", include_in_schema=False)
+async def options_signals():
+    return {"message": "Preflight OPTIONS request handled"}
+
+
+@app.post("/signals", summary="Store a signal for follow-up requests", tags=["Signals"])
+async def upload_signal(
+    signal: str | UploadFile = Form(...,
+                                    description="JSON-encoded list of `[timestamp, value]` pairs or, when uniformly sampled, `{\"t0\": ..., \"fs\": ..., \"values\": [...]}`, or a binary file part (packed float64, `.npy` or Arrow IPC)."),
+):
+    """
+    Store a signal server-side and return its `signal_id`.
+
+    Every operation accepts the id instead of the full signal, so a recording
+    is only uploaded once per session. Ids expire after a period without use.
+    """
+    try:
+        data = await decode_signal(signal)
+        if data.ndim != 2 or data.shape[1] != 2:
+            return JSONResponse(content={"error": "Signal must be a list of [timestamp, value] pairs"}, status_code=400)
+
+        signal_id = signal_store.put(data)
+    except TransportError as e:
+        return transport_error_response(e)
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+
+    return {
+        "signal_id": signal_id,
+        "length": int(len(data)),
+        "ttl_seconds": signal_store.ttl_seconds,
+    }
+
+
+@app.options("/ingest", include_in_schema=False)
+async def options_ingest():
+    return {"message": "Preflight OPTIONS request handled"}
+
+
+@app.post("/ingest", summary="Load a signal from a CSV or Parquet file", tags=["Signals"])
+async def ingest(
+    request: Request,
+    file: UploadFile = File(...,
+                            description="CSV file, optionally gzip-compressed, or Parquet file."),
+    file_format: str | None = Form(
+        None, description="`'csv'` or `'parquet'`. Detected from the file contents and name when omitted."),
+    value_columns: str | None = Form(
+        None, description="Comma-separated names of the value columns, one channel each. Defaults to every numeric column other than the timestamp."),
+    timestamp_column: str | None = Form(
+        None, description="Name of the timestamp column, in seconds or as dates."),
+    sampling_rate: float | None = Form(
+        None, description="Sampling rate in Hz, used to synthesize timestamps from 0 when no `timestamp_column` is given."),
+    delimiter: str | None = Form(
+        None, description="CSV delimiter. Detected from the header line when omitted."),
+    store_result: bool = Form(
+        True, description="Store the signal and return its `signal_id` with a preview. When false, the signal itself is returned, in the media type negotiated with `Accept`."),
+    preview_rows: int = Form(
+        10, description="Number of leading `[timestamp, value, ...]` rows included in the preview."),
+):
+    """
+    Parse a recording server-side instead of in the browser.
+
+    Only the selected columns are parsed, by Arrow's multithreaded CSV and
+    Parquet readers (or the pandas C parser when pyarrow is not installed).
+    Timestamps come from the timestamp column, from a column named like
+    one, or from `sampling_rate`.
+    """
+    if sampling_rate is not None:
+        error = validate_sampling_rate(sampling_rate, "Ingestion")
+        if error:
+            return error
+
+    try:
+        with request_phase("decode"):
+            data, info = await asyncio.to_thread(
+                ingest_signal, file.file, file.filename, file_format, value_columns,
+                timestamp_column, sampling_rate, delimiter)
+        record_samples(len(data))
+        label_request(format=info["format"])
+        if len(data) == 0:
+            return JSONResponse(content={"error": "File contains no complete rows"}, status_code=400)
+
+        try:
+            info["sampling_rate"] = sampling_rate or estimate_sampling_rate(data[:, 0])
+        except ValueError:
+            info["sampling_rate"] = None
+        info["length"] = int(len(data))
+        info["duration"] = float(data[-1, 0] - data[0, 0])
+
+        if not store_result:
+            return signal_response(request, data, info)
+
+        signal_id = signal_store.put(data)
+    except TransportError as e:
+        return transport_error_response(e)
+
     return {
-        key: value
-        for key, value in config.items()
-        if key != "python" and value is not None
+        "signal_id": signal_id,
+        "ttl_seconds": signal_store.ttl_seconds,
+        **info,
+        "preview": data[:max(0, preview_rows)].tolist(),
     }
 
 
-def apply_builtin_filter(values, sampling_rate: float, config: dict):
-    method = config.get("method")
+@app.get("/signals/stats", summary="Signal store statistics", tags=["System"])
+def signals_stats():
+    return signal_store.stats()
 
-    if method == "gaussian":
-        sigma = config.get("sigma", 100)
-        return scipy.ndimage.gaussian_filter1d(values, sigma=sigma)
 
-    return neurokit2.signal_filter(
-        values,
-        sampling_rate=sampling_rate,
-        **config
-    )
+@app.get("/signals/{signal_id}", summary="Download a stored signal", tags=["Signals"])
+async def download_signal(request: Request, signal_id: str):
+    data = signal_store.get(signal_id)
+    if data is None:
+        return JSONResponse(content={"error": "Signal not found or expired"}, status_code=404)
 
+    return signal_response(request, data)
 
-def apply_normalization(values, method: str):
-    if method == "zscore":
-        mean = np.mean(values)
-        std = np.std(values)
-        if std == 0:
-            return np.zeros_like(values, dtype=np.float64)
-        return (values - mean) / std
 
-    if method == "minmax":
-        min_value = np.min(values)
-        max_value = np.max(values)
-        value_range = max_value - min_value
-        if value_range == 0:
-            return np.zeros_like(values, dtype=np.float64)
-        return (values - min_value) / value_range
+@app.delete("/signals/{signal_id}", summary="Delete a stored signal", tags=["Signals"])
+async def delete_signal(signal_id: str):
+    if not signal_store.delete(signal_id):
+        return JSONResponse(content={"error": "Signal not found or expired"}, status_code=404)
 
-    raise ValueError("Invalid normalization method")
+    return {"message": "Signal deleted"}
 
 
-def build_peak_payload(data, peak_indices):
-    return [
-        {
-            "index": int(index),
-            "timestamp": float(data[index, 0]),
-            "value": float(data[index, 1]),
-            "height": float(data[index, 1]),
-        }
-        for index in peak_indices
-    ]
+@app.get("/decimation/stats", summary="Decimation pyramid cache statistics", tags=["System"])
+def decimation_stats():
+    return pyramid_cache.stats()
 
 
-def build_series_payload(data):
-    return [[float(row[0]), float(row[1])] for row in data]
+@app.options("/decimation", include_in_schema=False)
+async def options_decimation():
+    return {"message": "Preflight OPTIONS request handled"}
 
 
-@app.get("/", tags=["System"])
-def read_root():
-    return {"message": "Welcome to the SignAlchemist API"}
+@app.post("/decimation", summary="Decimate a signal for plotting", tags=["Signals"])
+async def decimation(
+    request: Request,
+    signal: str | UploadFile | None = Form(
+        None, description="JSON-encoded list of `[timestamp, value, ...]` rows (one value per channel) or `{\"timestamps\": [...], \"values\": [[...], ...]}` or, when uniformly sampled, `{\"t0\": ..., \"fs\": ..., \"values\": [...]}`, or a binary file part (packed float64, `.npy` or Arrow IPC)."),
+    signal_id: str | None = Form(
+        None, description="Id of a signal stored with `/signals`, used instead of `signal`. Its min/max pyramid is built once and reused by later zoom and pan requests."),
+    points: int = Form(
+        DEFAULT_DECIMATION_POINTS, description=f"Point budget of the output, usually the chart width in pixels (3 to {MAX_DECIMATION_POINTS})."),
+    method: str = Form(
+        "minmax", description="`'minmax'` (minimum and maximum of every bucket) or `'lttb'` (Largest-Triangle-Three-Buckets)."),
+    start: float | None = Form(
+        None, description="First timestamp of the visible range. Defaults to the start of the signal."),
+    end: float | None = Form(
+        None, description="Last timestamp of the visible range. Defaults to the end of the signal."),
+    channel: int = Form(
+        0, description="Channel to decimate, counted from 0, for multi-channel signals."),
+    peaks: str | None = Form(
+        None, description="JSON list of sample indices, such as the `index` of each peak returned by `/peaks`, always kept in the output."),
+):
+    """
+    Reduce a signal to a fixed number of points over a time range, for charts.
+
+    The response holds `[timestamp, value]` rows of original samples, at most
+    `points` of them plus the listed `peaks` in range. For stored signals the
+    cost depends on the number of points returned rather than on the length
+    of the signal.
+    """
+    try:
+        data = await resolve_signal(signal, signal_id)
+    except TransportError as e:
+        return transport_error_response(e)
+
+    method = method.lower()
+    if method not in DECIMATION_METHODS:
+        return JSONResponse(content={"error": "Invalid decimation method"}, status_code=400)
+    if not 3 <= points <= MAX_DECIMATION_POINTS:
+        return JSONResponse(
+            content={"error": f"Decimation points must be between 3 and {MAX_DECIMATION_POINTS}."},
+            status_code=400
+        )
+    if not 0 <= channel < data.shape[1] - 1:
+        return JSONResponse(content={"error": "Invalid channel"}, status_code=400)
+    if start is not None and end is not None and end < start:
+        return JSONResponse(content={"error": "Decimation range must end after it starts."}, status_code=400)
+
+    peak_indices = None
+    if peaks:
+        try:
+            peak_indices = np.asarray(json.loads(peaks), dtype=np.int64).ravel()
+        except (ValueError, TypeError):
+            return JSONResponse(content={"error": "Peaks must be a JSON list of sample indices"}, status_code=400)
+    label_request(method=method)
+
+    timestamps = data[:, 0]
+    values = data[:, channel + 1]
+    try:
+        pyramid = None
+        if signal_id:
+            pyramid = pyramid_cache.get((signal_id, channel))
+            if pyramid is None:
+                pyramid = await run_compute(MinMaxPyramid, values)
+                pyramid_cache.put((signal_id, channel), pyramid)
+            with request_phase("compute"):
+                selected, info = decimate(timestamps, values, points, method, start, end, peak_indices, pyramid)
+        else:
+            selected, info = await run_compute(
+                decimate, timestamps, values, points, method, start, end, peak_indices)
+    except ExecutorUnavailable as e:
+        return unavailable_response(e)
+
+    return signal_response(request, np.column_stack((timestamps[selected], values[selected])), info)
 
 
 @app.options("/resampling", include_in_schema=False)
@@ -134,42 +470,54 @@ async def options_resampling():
 
 @app.post("/resampling", summary="Resample a signal", tags=["Preprocessing"])
 async def resampling(
-    signal: str = Form(...,
-                       description="JSON-encoded list of `[timestamp, value]` pairs representing the input signal."),
+    request: Request,
+    signal: str | UploadFile | None = Form(
+        None, description="JSON-encoded list of `[timestamp, value, ...]` rows (one value per channel) or `{\"timestamps\": [...], \"values\": [[...], ...]}` or, when uniformly sampled, `{\"t0\": ..., \"fs\": ..., \"values\": [...]}`, or a binary file part (packed float64, `.npy` or Arrow IPC)."),
+    signal_id: str | None = Form(
+        None, description="Id of a signal stored with `/signals`, used instead of `signal`."),
     interpolation_technique: str = Form(
-        ..., description="Interpolation method to use: `'1d'` or `'spline'`."),
+        ..., description="Interpolation method to use: `'1d'` (linear), `'spline'` (smoothing spline), `'cubic'` (chunked cubic spline, bounded memory) or `'polyphase'` (`resample_poly` for uniformly sampled input, chunked cubic otherwise)."),
     target_sampling_rate: float = Form(...,
                                        description="Desired target sampling rate, in Hz."),
+    use_cache: bool = Form(
+        True, description="Reuse the cached result of an identical earlier request."),
+    store_result: bool = Form(
+        False, description="Store the output and return its `signal_id` for follow-up requests."),
 ):
     """
     Resample a signal with state-of-art interpolation techniques.
-    """
-    signal = np.array(json.loads(signal), dtype=np.float64)
 
-    min_timestamp = signal[:, 0].min()
-    max_timestamp = signal[:, 0].max()
+    The response reports the `strategy` that produced the output and its
+    computation time in `elapsed_ms`.
+    """
+    try:
+        signal = await resolve_signal(signal, signal_id)
+    except TransportError as e:
+        return transport_error_response(e)
 
-    duration = max_timestamp - min_timestamp
-    num_samples = int(np.floor(duration * target_sampling_rate)) + 1
+    if interpolation_technique not in RESAMPLING_TECHNIQUES:
+        return JSONResponse(content={"error": "Invalid interpolation technique"}, status_code=400)
+    label_request(technique=interpolation_technique)
 
-    error = check_max_samples(num_samples, "Resampling")
+    error = check_max_samples(
+        resampled_length(signal, target_sampling_rate) * (signal.shape[1] - 1), "Resampling")
     if error:
         return error
 
-    new_time = min_timestamp + \
-        np.arange(num_samples, dtype=np.float64) / target_sampling_rate
-
-    if interpolation_technique == "spline":
-        interp_func = scipy.interpolate.UnivariateSpline(
-            signal[:, 0], signal[:, 1], s=1.0)
-    else:
-        interp_func = scipy.interpolate.interp1d(
-            signal[:, 0], signal[:, 1], kind='linear')
-
-    new_values = interp_func(new_time)
-    new_data = np.stack((new_time, new_values), axis=1)
+    try:
+        new_data, info = await cached_compute(
+            use_cache,
+            "resampling",
+            signal,
+            {"interpolation_technique": interpolation_technique, "target_sampling_rate": target_sampling_rate},
+            resample_signal, signal, interpolation_technique, target_sampling_rate, return_info=True)
+        output = {**info, **stored_output(store_result, new_data)}
+    except ExecutorUnavailable as e:
+        return unavailable_response(e)
+    except TransportError as e:
+        return transport_error_response(e)
 
-    return JSONResponse(content={"data": new_data.tolist()})
+    return signal_response(request, new_data, output)
 
 
 @app.options("/outliers", include_in_schema=False)
@@ -179,30 +527,101 @@ async def options_outliers():
 
 @app.post("/outliers", summary="Remove outliers from signal", tags=["Preprocessing"])
 async def outliers(
-    signal: str = Form(...,
-                       description="JSON-encoded list of `[timestamp, value]` pairs."),
+    request: Request,
+    signal: str | UploadFile | None = Form(
+        None, description="JSON-encoded list of `[timestamp, value, ...]` rows (one value per channel) or `{\"timestamps\": [...], \"values\": [[...], ...]}` or, when uniformly sampled, `{\"t0\": ..., \"fs\": ..., \"values\": [...]}`, or a binary file part (packed float64, `.npy` or Arrow IPC)."),
+    signal_id: str | None = Form(
+        None, description="Id of a signal stored with `/signals`, used instead of `signal`."),
     outlier_technique: str = Form(
-        ..., description="Outlier detection method: `'hampel'` or `'iqr'`."),
+        ..., description="Outlier detection method: `'hampel'`, `'iqr'`, or a local detector `'rolling_iqr'`, `'rolling_mad'` or `'rolling_zscore'`."),
+    sampling_rate: float | None = Form(
+        None, description="Sampling rate in Hz used to size the rolling window. Estimated from the timestamps when omitted."),
+    window_seconds: float = Form(
+        OUTLIER_WINDOW_SECONDS, description="Length in seconds of the centred window used by `hampel` and the rolling techniques."),
+    threshold: float | None = Form(
+        None, description="IQR multiplier for the IQR techniques, or number of (robust) standard deviations for the others. Defaults to 1.5 and 3 respectively."),
+    include_mask: bool = Form(
+        False, description="Include the boolean `outlier_mask` of the replaced samples in JSON responses."),
+    use_cache: bool = Form(
+        True, description="Reuse the cached result of an identical earlier request."),
+    store_result: bool = Form(
+        False, description="Store the output and return its `signal_id` for follow-up requests."),
 ):
     """
     Remove statistical outliers from a signal using the selected method.
     """
-    signal = np.array(json.loads(signal))
-    values = signal[:, 1]
+    try:
+        signal = await resolve_signal(signal, signal_id)
+    except TransportError as e:
+        return transport_error_response(e)
+    values = channel_values(signal)
 
-    error = check_max_samples(len(values), "Outlier detection")
+    error = check_max_samples(channel_samples(signal), "Outlier detection", chunked=True)
     if error:
         return error
 
-    if outlier_technique == "hampel":
-        new_values = hampel(values)
-    elif outlier_technique == "iqr":
-        new_values = IQR(values)
-    else:
+    if outlier_technique not in OUTLIER_THRESHOLDS:
         return JSONResponse(content={"error": "Invalid technique"}, status_code=400)
+    label_request(technique=outlier_technique)
+
+    if threshold is not None and (not np.isfinite(threshold) or threshold <= 0):
+        return JSONResponse(
+            content={"error": "Outlier threshold must be greater than 0."},
+            status_code=400,
+        )
+
+    if outlier_technique in WINDOWED_TECHNIQUES:
+        if sampling_rate is None:
+            try:
+                sampling_rate = estimate_sampling_rate(signal[:, 0])
+            except ValueError as e:
+                return JSONResponse(content={"error": str(e)}, status_code=400)
+        error = validate_sampling_rate(sampling_rate, "Windowed outlier detection")
+        if error:
+            return error
+        if not np.isfinite(window_seconds) or window_seconds <= 0:
+            return JSONResponse(
+                content={"error": "Outlier window must be greater than 0 seconds."},
+                status_code=400,
+            )
+        if not covers_overlap(window_size(sampling_rate, window_seconds)):
+            error = check_max_samples(channel_samples(signal), "Outlier detection")
+            if error:
+                return error
+
+    try:
+        new_values, outlier_mask = await cached_compute(
+            use_cache,
+            "outliers",
+            values,
+            {
+                "outlier_technique": outlier_technique,
+                "sampling_rate": sampling_rate,
+                "window_seconds": window_seconds,
+                "threshold": threshold,
+            },
+            remove_outliers,
+            values,
+            outlier_technique,
+            sampling_rate,
+            window_seconds,
+            threshold,
+            return_mask=True,
+        )
+    except ExecutorUnavailable as e:
+        return unavailable_response(e)
+
+    new_data = with_timestamps(signal[:, 0], new_values)
+    try:
+        output = stored_output(store_result, new_data)
+    except TransportError as e:
+        return transport_error_response(e)
+
+    output["outlier_count"] = int(np.count_nonzero(outlier_mask))
+    if include_mask:
+        output["outlier_mask"] = outlier_mask.tolist()
 
-    new_data = np.stack((signal[:, 0], new_values), axis=1)
-    return JSONResponse(content={"data": new_data.tolist()})
+    return signal_response(request, new_data, output)
 
 
 @app.options("/filtering", include_in_schema=False)
@@ -212,12 +631,19 @@ async def options_filtering():
 
 @app.post("/filtering", summary="Apply filter to signal", tags=["Preprocessing"])
 async def filtering(
-    signal: str = Form(...,
-                       description="JSON-encoded list of `[timestamp, value]` pairs."),
+    request: Request,
+    signal: str | UploadFile | None = Form(
+        None, description="JSON-encoded list of `[timestamp, value, ...]` rows (one value per channel) or `{\"timestamps\": [...], \"values\": [[...], ...]}` or, when uniformly sampled, `{\"t0\": ..., \"fs\": ..., \"values\": [...]}`, or a binary file part (packed float64, `.npy` or Arrow IPC)."),
+    signal_id: str | None = Form(
+        None, description="Id of a signal stored with `/signals`, used instead of `signal`."),
     sampling_rate: float = Form(...,
                               description="Sampling rate of the input signal in Hz."),
     filter_config: str = Form(
         ..., description="JSON-encoded dict including `method`, built-in parameters such as `lowcut`, `highcut`, `order`, or a `python` function body when `method` is `python`."),
+    use_cache: bool = Form(
+        True, description="Reuse the cached result of an identical earlier request."),
+    store_result: bool = Form(
+        False, description="Store the output and return its `signal_id` for follow-up requests."),
 ):
     """
     Filter a signal using a predefined or custom method.
@@ -227,40 +653,50 @@ async def filtering(
 
     try:
         config = json.loads(filter_config)
-        data = np.array(json.loads(signal))
-        python_enabled = os.getenv("PYTHON_ENABLED") == "true"
+        data = await resolve_signal(signal, signal_id)
 
         sampling_rate_error = validate_sampling_rate(sampling_rate, "Filtering")
         if sampling_rate_error:
             return sampling_rate_error
 
-        error = check_max_samples(len(data), "Filtering")
+        error = check_max_samples(
+            channel_samples(data), "Filtering", chunked=filter_runs_chunked(config, sampling_rate))
         if error:
             return error
 
         if config.get("method") == "python" and not config.get("python"):
             return JSONResponse(content={"error": "Python code is required when method is 'python'"}, status_code=400)
+        label_request(method="python" if config.get("python") else config.get("method"))
 
         if "python" in config and config["python"]:
-            if not python_enabled:
+            if not python_enabled():
                 return JSONResponse(content={"error": "Python code is disabled in public build"}, status_code=403)
             try:
-                namespace = globals().copy()
-                exec(config["python"], namespace)
-                filter_signal = namespace["filter_signal"]
-                new_values = filter_signal(data[:, 1])
+                new_values = await run_compute(apply_python_filter, config["python"], channel_values(data))
+            except ExecutorUnavailable as e:
+                return unavailable_response(e)
             except Exception as e:
                 return JSONResponse(content={"error": str(e)}, status_code=400)
         else:
             sanitized_config = sanitize_filter_config(config)
-            new_values = apply_builtin_filter(
-                data[:, 1],
+            values = channel_values(data)
+            new_values = await cached_compute(
+                use_cache,
+                "filtering",
+                values,
+                {"sampling_rate": sampling_rate, "config": sanitized_config},
+                apply_builtin_filter,
+                values,
                 sampling_rate=sampling_rate,
                 config=sanitized_config
             )
 
-        new_data = np.stack((data[:, 0], new_values), axis=1)
-        return JSONResponse(content={"data": new_data.tolist()})
+        new_data = with_timestamps(data[:, 0], new_values)
+        return signal_response(request, new_data, stored_output(store_result, new_data))
+    except ExecutorUnavailable as e:
+        return unavailable_response(e)
+    except TransportError as e:
+        return transport_error_response(e)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=400)
 
@@ -272,25 +708,42 @@ async def options_normalization():
 
 @app.post("/normalization", summary="Normalize a signal", tags=["Preprocessing"])
 async def normalization(
-    signal: str = Form(...,
-                       description="JSON-encoded list of `[timestamp, value]` pairs."),
+    request: Request,
+    signal: str | UploadFile | None = Form(
+        None, description="JSON-encoded list of `[timestamp, value, ...]` rows (one value per channel) or `{\"timestamps\": [...], \"values\": [[...], ...]}` or, when uniformly sampled, `{\"t0\": ..., \"fs\": ..., \"values\": [...]}`, or a binary file part (packed float64, `.npy` or Arrow IPC)."),
+    signal_id: str | None = Form(
+        None, description="Id of a signal stored with `/signals`, used instead of `signal`."),
     normalization_method: str = Form(
         ..., description="Normalization method: `'zscore'` or `'minmax'`."),
+    use_cache: bool = Form(
+        True, description="Reuse the cached result of an identical earlier request."),
+    store_result: bool = Form(
+        False, description="Store the output and return its `signal_id` for follow-up requests."),
 ):
     """
     Normalize a signal using a standard scaling strategy.
     """
     try:
-        data = np.array(json.loads(signal), dtype=np.float64)
-        values = data[:, 1]
+        data = await resolve_signal(signal, signal_id)
+        values = channel_values(data)
 
-        error = check_max_samples(len(values), "Normalization")
+        error = check_max_samples(channel_samples(data), "Normalization", chunked=True)
         if error:
             return error
-
-        normalized_values = apply_normalization(values, normalization_method)
-        new_data = np.stack((data[:, 0], normalized_values), axis=1)
-        return JSONResponse(content={"data": new_data.tolist()})
+        label_request(method=normalization_method)
+
+        normalized_values = await cached_compute(
+            use_cache,
+            "normalization",
+            values,
+            {"normalization_method": normalization_method},
+            apply_normalization, values, normalization_method)
+        new_data = with_timestamps(data[:, 0], normalized_values)
+        return signal_response(request, new_data, stored_output(store_result, new_data))
+    except ExecutorUnavailable as e:
+        return unavailable_response(e)
+    except TransportError as e:
+        return transport_error_response(e)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=400)
 
@@ -302,8 +755,11 @@ async def options_peaks():
 
 @app.post("/peaks", summary="Detect peaks in a signal", tags=["Analysis"])
 async def peaks(
-    signal: str = Form(...,
-                       description="JSON-encoded list of `[timestamp, value]` pairs."),
+    request: Request,
+    signal: str | UploadFile | None = Form(
+        None, description="JSON-encoded list of `[timestamp, value]` pairs or, when uniformly sampled, `{\"t0\": ..., \"fs\": ..., \"values\": [...]}`, or a binary file part (packed float64, `.npy` or Arrow IPC)."),
+    signal_id: str | None = Form(
+        None, description="Id of a signal stored with `/signals`, used instead of `signal`."),
     sampling_rate: float = Form(..., description="Sampling rate of the input signal in Hz."),
     detector: str = Form(
         "scipy", description="Peak detector backend: `'scipy'` or `'neurokit'`."),
@@ -313,62 +769,62 @@ async def peaks(
         0.0, description="Minimum distance between peaks, in seconds."),
     height: float | None = Form(
         None, description="Minimum height required for a peak."),
+    use_cache: bool = Form(
+        True, description="Reuse the cached result of an identical earlier request."),
 ):
     """
     Detect peaks in a signal using SciPy peak detection.
     """
     try:
-        data = np.array(json.loads(signal), dtype=np.float64)
+        data = await resolve_signal(signal, signal_id)
+        error = check_single_channel(data, "Peak detection")
+        if error:
+            return error
         values = data[:, 1]
 
         sampling_rate_error = validate_sampling_rate(sampling_rate, "Peak detection")
         if sampling_rate_error:
             return sampling_rate_error
 
-        error = check_max_samples(len(values), "Peak detection")
+        error = check_max_samples(
+            len(values),
+            "Peak detection",
+            chunked=detector.lower() == "scipy"
+            and covers_overlap(peak_overlap(sampling_rate, min_distance_seconds)),
+        )
         if error:
             return error
 
-        detector = detector.lower()
-        signal_type = signal_type.upper()
-
-        if detector == "neurokit":
-            if signal_type == "PPG":
-                cleaned = neurokit2.ppg_clean(values, sampling_rate=sampling_rate)
-                info = neurokit2.ppg_findpeaks(cleaned, sampling_rate=sampling_rate)
-                peak_indices = np.asarray(info["PPG_Peaks"], dtype=int)
-                peaks_data = build_peak_payload(data, peak_indices)
-            elif signal_type == "EDA":
-                cleaned = neurokit2.eda_clean(values, sampling_rate=sampling_rate)
-                phasic = neurokit2.eda_phasic(cleaned, sampling_rate=sampling_rate)
-                phasic_values = np.asarray(phasic["EDA_Phasic"].values, dtype=np.float64)
-                info = neurokit2.eda_findpeaks(
-                    phasic_values,
-                    sampling_rate=sampling_rate,
-                    method="neurokit",
-                )
-                peak_indices = np.asarray(info["SCR_Peaks"], dtype=int)
-                peaks_data = build_peak_payload(data, peak_indices)
-            else:
-                info = neurokit2.signal_findpeaks(values, relative_height_min=0)
-                peak_indices = np.asarray(info["Peaks"], dtype=int)
-                peaks_data = build_peak_payload(data, peak_indices)
-        elif detector == "scipy":
-            min_distance_samples = max(
-                1,
-                int(round(max(min_distance_seconds, 0) * sampling_rate))
-            )
-
-            peak_indices, properties = scipy.signal.find_peaks(
-                values,
-                distance=min_distance_samples,
-                height=height,
-            )
-            peaks_data = build_peak_payload(data, peak_indices)
-        else:
+        if detector.lower() not in ("scipy", "neurokit"):
             return JSONResponse(content={"error": "Invalid peak detector"}, status_code=400)
-
-        return JSONResponse(content={"peaks": peaks_data})
+        label_request(detector=detector.lower(), signal_type=signal_type.upper())
+
+        peak_indices = await cached_compute(
+            use_cache,
+            "peaks",
+            values,
+            {
+                "sampling_rate": sampling_rate,
+                "detector": detector.lower(),
+                "signal_type": signal_type.upper(),
+                "min_distance_seconds": min_distance_seconds,
+                "height": height,
+            },
+            detect_peak_indices,
+            values,
+            sampling_rate=sampling_rate,
+            detector=detector,
+            signal_type=signal_type,
+            min_distance_seconds=min_distance_seconds,
+            height=height,
+            intermediates=Intermediates(values, sampling_rate, memoize=use_cache),
+        )
+        with request_phase("encode"):
+            return JSONResponse(content={"peaks": build_peak_payload(data, peak_indices)})
+    except ExecutorUnavailable as e:
+        return unavailable_response(e)
+    except TransportError as e:
+        return transport_error_response(e)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=400)
 
@@ -380,16 +836,26 @@ async def options_hr():
 
 @app.post("/hr", summary="Estimate heart rate from a PPG signal", tags=["Analysis"])
 async def heart_rate(
-    signal: str = Form(...,
-                       description="JSON-encoded list of `[timestamp, value]` pairs."),
+    request: Request,
+    signal: str | UploadFile | None = Form(
+        None, description="JSON-encoded list of `[timestamp, value]` pairs or, when uniformly sampled, `{\"t0\": ..., \"fs\": ..., \"values\": [...]}`, or a binary file part (packed float64, `.npy` or Arrow IPC)."),
+    signal_id: str | None = Form(
+        None, description="Id of a signal stored with `/signals`, used instead of `signal`."),
     sampling_rate: float = Form(..., description="Sampling rate of the input signal in Hz."),
     signal_type: str = Form(
         ..., description="Signal type. Heart rate analysis is only supported for `'PPG'`."),
     method: str = Form(
         "emotibit", description="Heart rate backend: `'emotibit'` or `'neurokit'`."),
+    use_cache: bool = Form(
+        True, description="Reuse the cached result of an identical earlier request."),
+    store_result: bool = Form(
+        False, description="Store the output and return its `signal_id` for follow-up requests."),
 ):
     try:
-        data = np.array(json.loads(signal), dtype=np.float64)
+        data = await resolve_signal(signal, signal_id)
+        error = check_single_channel(data, "Heart rate")
+        if error:
+            return error
 
         sampling_rate_error = validate_sampling_rate(sampling_rate, "Heart rate")
         if sampling_rate_error:
@@ -406,88 +872,554 @@ async def heart_rate(
             )
 
         method = method.lower()
-        if method == "emotibit":
-            heart_rate_data = compute_emotibit_heart_rate(data, sampling_rate)
-        elif method == "neurokit":
-            heart_rate_data = compute_neurokit_heart_rate(data, sampling_rate)
-        else:
+        label_request(method=method)
+        if method not in HEART_RATE_METHODS:
             return JSONResponse(
                 content={"error": "Invalid heart rate method"},
                 status_code=400
             )
+        heart_rate_data = await cached_compute(
+            use_cache, "hr", data, {"sampling_rate": sampling_rate, "method": method},
+            HEART_RATE_METHODS[method], data, sampling_rate,
+            Intermediates(data[:, 1], sampling_rate, memoize=use_cache))
 
-        return JSONResponse(content={
-            "data": build_series_payload(heart_rate_data),
+        return signal_response(request, heart_rate_data, {
             "beat_count": int(len(heart_rate_data)),
+            **stored_output(store_result, heart_rate_data),
         })
+    except ExecutorUnavailable as e:
+        return unavailable_response(e)
+    except TransportError as e:
+        return transport_error_response(e)
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+
+
+@app.options("/analyze", include_in_schema=False)
+async def options_analyze():
+    return {"message": "Preflight OPTIONS request handled"}
+
+
+@app.post("/analyze", summary="Run several analyses of a signal together", tags=["Analysis"])
+async def analyze(
+    request: Request,
+    signal: str | UploadFile | None = Form(
+        None, description="JSON-encoded list of `[timestamp, value]` pairs or, when uniformly sampled, `{\"t0\": ..., \"fs\": ..., \"values\": [...]}`, or a binary file part (packed float64, `.npy` or Arrow IPC)."),
+    signal_id: str | None = Form(
+        None, description="Id of a signal stored with `/signals`, used instead of `signal`."),
+    sampling_rate: float = Form(..., description="Sampling rate of the input signal in Hz."),
+    signal_type: str = Form(
+        ..., description="Signal type: `'PPG'`, `'EDA'` or `'OTHER'`."),
+    analyses: str | None = Form(
+        None, description="Comma-separated analyses among `peaks`, `hr` and `metrics`. Defaults to all of them for PPG and to `peaks,metrics` otherwise."),
+    detector: str = Form(
+        "neurokit", description="Peak detector backend: `'scipy'` or `'neurokit'`."),
+    min_distance_seconds: float = Form(
+        0.0, description="Minimum distance between peaks, in seconds, for the `scipy` detector."),
+    height: float | None = Form(
+        None, description="Minimum height required for a peak, for the `scipy` detector."),
+    hr_method: str = Form(
+        "emotibit", description="Heart rate backend: `'emotibit'` or `'neurokit'`."),
+    use_cache: bool = Form(
+        True, description="Reuse the cached result of an identical earlier request."),
+):
+    """
+    Detect peaks, estimate heart rate and extract quality metrics in one
+    request.
+
+    The analyses share their intermediate products (cleaned signal, peaks,
+    EDA phasic and tonic components), so each is computed exactly once, and
+    with `use_cache` those computed by earlier `/peaks`, `/hr` or `/analyze`
+    requests on the same recording are reused. `intermediates` lists the
+    stages this request computed and reused, with `cached_result` set when
+    the whole result came from the result cache.
+    """
+    try:
+        data = await resolve_signal(signal, signal_id)
+        error = check_single_channel(data, "Analysis")
+        if error:
+            return error
+
+        sampling_rate_error = validate_sampling_rate(sampling_rate, "Analysis")
+        if sampling_rate_error:
+            return sampling_rate_error
+
+        error = check_max_samples(len(data), "Analysis")
+        if error:
+            return error
+
+        signal_type = signal_type.upper()
+        detector = detector.lower()
+        hr_method = hr_method.lower()
+        if analyses:
+            selected = [name.strip().lower() for name in analyses.split(",") if name.strip()]
+        else:
+            selected = [name for name in ANALYSES if name != "hr" or signal_type == "PPG"]
+        invalid = [name for name in selected if name not in ANALYSES]
+        if invalid or not selected:
+            return JSONResponse(
+                content={"error": f"Invalid analyses, expected a combination of {', '.join(ANALYSES)}"},
+                status_code=400
+            )
+        if detector not in ("scipy", "neurokit"):
+            return JSONResponse(content={"error": "Invalid peak detector"}, status_code=400)
+        if "hr" in selected:
+            if signal_type != "PPG":
+                return JSONResponse(
+                    content={"error": "Heart rate analysis is only available for PPG signals."},
+                    status_code=400
+                )
+            if hr_method not in HEART_RATE_METHODS:
+                return JSONResponse(content={"error": "Invalid heart rate method"}, status_code=400)
+        label_request(signal_type=signal_type, detector=detector)
+
+        result, report = await cached_compute_with_details(
+            use_cache,
+            "analyze",
+            data,
+            {
+                "sampling_rate": sampling_rate,
+                "signal_type": signal_type,
+                "analyses": sorted(set(selected)),
+                "detector": detector,
+                "min_distance_seconds": min_distance_seconds,
+                "height": height,
+                "hr_method": hr_method,
+            },
+            analyze_signal,
+            data,
+            sampling_rate,
+            signal_type,
+            selected,
+            detector=detector,
+            min_distance_seconds=min_distance_seconds,
+            height=height,
+            hr_method=hr_method,
+            intermediates=Intermediates(data[:, 1], sampling_rate, memoize=use_cache),
+        )
+        if report is None:
+            report = {"computed": [], "reused": [], "cached_result": True}
+        else:
+            report["cached_result"] = False
+        with request_phase("encode"):
+            return JSONResponse(content={**result, "intermediates": report})
+    except ExecutorUnavailable as e:
+        return unavailable_response(e)
+    except TransportError as e:
+        return transport_error_response(e)
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=400)
 
 
+@app.options("/spectrum", include_in_schema=False)
+async def options_spectrum():
+    return {"message": "Preflight OPTIONS request handled"}
+
+
+@app.post("/spectrum", summary="Compute the power spectrum of a signal", tags=["Analysis"])
+async def spectrum(
+    signal: str | UploadFile | None = Form(
+        None, description="JSON-encoded list of `[timestamp, value, ...]` rows (one value per channel) or `{\"timestamps\": [...], \"values\": [[...], ...]}` or, when uniformly sampled, `{\"t0\": ..., \"fs\": ..., \"values\": [...]}`, or a binary file part (packed float64, `.npy` or Arrow IPC)."),
+    signal_id: str | None = Form(
+        None, description="Id of a signal stored with `/signals`, used instead of `signal`."),
+    processed_signal: str | UploadFile | None = Form(
+        None, description="Optional processed version of the signal, in the same formats, whose spectrum is returned alongside."),
+    processed_signal_id: str | None = Form(
+        None, description="Id of a stored processed signal, used instead of `processed_signal`."),
+    sampling_rate: float | None = Form(
+        None, description="Sampling rate of the signal in Hz. Estimated from the timestamps when omitted."),
+    processed_sampling_rate: float | None = Form(
+        None, description="Sampling rate of the processed signal in Hz. Estimated from its timestamps when omitted."),
+    method: str = Form(
+        "welch", description="`'welch'` (averaged power spectral density) or `'stft'` (Welch PSD plus a spectrogram)."),
+    segment_seconds: float = Form(
+        DEFAULT_SEGMENT_SECONDS, description="Length of each Welch segment, in seconds. Longer segments give finer frequency resolution."),
+    max_bins: int = Form(
+        DEFAULT_SPECTRUM_BINS, description=f"Maximum number of frequency bins returned (2 to {MAX_SPECTRUM_BINS})."),
+    max_frames: int = Form(
+        DEFAULT_SPECTROGRAM_FRAMES, description=f"Maximum number of spectrogram time frames (1 to {MAX_SPECTROGRAM_FRAMES})."),
+    use_cache: bool = Form(
+        True, description="Reuse the cached result of an identical earlier request."),
+):
+    """
+    Estimate the power spectral density with `scipy.signal.welch`, optionally
+    with an STFT spectrogram, for a signal and, when given, its processed
+    version.
+
+    Each spectrum is cached per signal, so changing the processing only
+    recomputes the processed one. Values are float32.
+    """
+    method = method.lower()
+    if method not in SPECTRUM_METHODS:
+        return JSONResponse(content={"error": "Invalid spectrum method"}, status_code=400)
+    if not 2 <= max_bins <= MAX_SPECTRUM_BINS:
+        return JSONResponse(
+            content={"error": f"Spectrum bins must be between 2 and {MAX_SPECTRUM_BINS}."}, status_code=400)
+    if not 1 <= max_frames <= MAX_SPECTROGRAM_FRAMES:
+        return JSONResponse(
+            content={"error": f"Spectrogram frames must be between 1 and {MAX_SPECTROGRAM_FRAMES}."}, status_code=400)
+    if not np.isfinite(segment_seconds) or segment_seconds <= 0:
+        return JSONResponse(content={"error": "Spectrum segment must be longer than 0 seconds."}, status_code=400)
+    label_request(method=method)
+
+    inputs = {"original": (signal, signal_id, sampling_rate)}
+    if processed_signal is not None or processed_signal_id:
+        inputs["processed"] = (processed_signal, processed_signal_id, processed_sampling_rate)
+
+    sources = {}
+    for name, (source, source_id, rate) in inputs.items():
+        try:
+            data = await resolve_signal(source, source_id)
+        except TransportError as e:
+            return transport_error_response(e)
+
+        if method == "stft":
+            error = check_single_channel(data, "Spectrogram")
+            if error:
+                return error
+        if len(data) < MIN_SEGMENT_SAMPLES:
+            return JSONResponse(
+                content={"error": f"Spectrum requires at least {MIN_SEGMENT_SAMPLES} samples."}, status_code=400)
+        error = check_max_samples(channel_samples(data), "Spectrum", chunked=True)
+        if error:
+            return error
+
+        if rate is None:
+            try:
+                rate = estimate_sampling_rate(data[:, 0])
+            except ValueError as e:
+                return JSONResponse(content={"error": str(e)}, status_code=400)
+        error = validate_sampling_rate(rate, "Spectrum")
+        if error:
+            return error
+        sources[name] = (channel_values(data), rate)
+
+    try:
+        spectra = await asyncio.gather(*(
+            cached_compute(
+                use_cache,
+                "spectrum",
+                values,
+                {
+                    "sampling_rate": rate,
+                    "method": method,
+                    "segment_seconds": segment_seconds,
+                    "max_bins": max_bins,
+                    "max_frames": max_frames,
+                },
+                compute_spectrum, values, rate, method, segment_seconds, max_bins, max_frames)
+            for values, rate in sources.values()
+        ))
+    except ExecutorUnavailable as e:
+        return unavailable_response(e)
+
+    with request_phase("encode"):
+        return JSONResponse(content=dict(zip(sources, spectra)))
+
+
 @app.options("/metrics", include_in_schema=False)
 async def options_metrics():
     return {"message": "Preflight OPTIONS request handled"}
 
 
 @app.post("/metrics", summary="Extract signal quality metrics", tags=["Metrics"])
-def get_metrics(
-    signal: str = Form(...,
-                       description="JSON-encoded list of `[timestamp, value]` pairs."),
+async def get_metrics(
+    request: Request,
+    signal: str | UploadFile | None = Form(
+        None, description="JSON-encoded list of `[timestamp, value, ...]` rows (one value per channel) or `{\"timestamps\": [...], \"values\": [[...], ...]}` or, when uniformly sampled, `{\"t0\": ..., \"fs\": ..., \"values\": [...]}`, or a binary file part (packed float64, `.npy` or Arrow IPC)."),
+    signal_id: str | None = Form(
+        None, description="Id of a signal stored with `/signals`, used instead of `signal`."),
     signal_type: str = Form(...,
                             description="Signal type: `'EDA'` or `'PPG'`."),
     sampling_rate: float = Form(..., description="Sampling rate in Hz."),
+    use_cache: bool = Form(
+        True, description="Reuse the cached result of an identical earlier request."),
 ):
     """
     Compute quality metrics for EDA or PPG signals based on literature.
 
-    Returns a dictionary with multiple metric values and their descriptions.
+    Returns a dictionary with multiple metric values and their descriptions,
+    or `{"channels": [...]}` with one such dictionary per channel.
     """
     try:
-        data = np.array(json.loads(signal))
-        values = data[:, 1]
+        data = await resolve_signal(signal, signal_id)
+        values = channel_values(data)
 
         sampling_rate_error = validate_sampling_rate(sampling_rate, "Metrics")
         if sampling_rate_error:
             return sampling_rate_error
 
-        error = check_max_samples(len(values), "Metrics")
+        error = check_max_samples(channel_samples(data), "Metrics")
         if error:
             return error
+        label_request(signal_type=signal_type.upper())
 
+    except TransportError as e:
+        return transport_error_response(e)
     except Exception as e:
         return {"error": f"Invalid signal format: {e}"}
 
-    signal_type = signal_type.upper()
+    try:
+        metrics = await cached_compute(
+            use_cache,
+            "metrics",
+            values,
+            {"signal_type": signal_type.upper(), "sampling_rate": sampling_rate},
+            quality_metrics, values, signal_type, sampling_rate)
+    except ExecutorUnavailable as e:
+        return unavailable_response(e)
+
+    with request_phase("encode"):
+        return JSONResponse(content=metrics)
 
-    if signal_type == "EDA":
-        return {
-            "Böttcher et al. (2022)": {
-                "metric_id": "bottcher_2022",
-                "value": bottcher_quality(values, fs=sampling_rate),
-                "preference": "higher",
-                "description": "EDA quality score based on amplitude plausibility and RAC stability. Higher is better.",
-            },
-            "Kleckner et al. (2017) Raw": {
-                "metric_id": "kleckner_2017_raw",
-                "value": kleckner_quality(values, fs=sampling_rate),
-                "preference": "higher",
-                "description": "Automated EDA quality score using range, slope and artifact spreading rules on the raw signal. Higher is better.",
+
+@app.options("/pipeline", include_in_schema=False)
+async def options_pipeline():
+    return {"message": "Preflight OPTIONS request handled"}
+
+
+@app.post("/pipeline", summary="Run a full processing pipeline", tags=["Pipeline"])
+async def pipeline(
+    request: Request,
+    signal: str | UploadFile | None = Form(
+        None, description="JSON-encoded list of `[timestamp, value]` pairs or, when uniformly sampled, `{\"t0\": ..., \"fs\": ..., \"values\": [...]}`, or a binary file part (packed float64, `.npy` or Arrow IPC)."),
+    signal_id: str | None = Form(
+        None, description="Id of a signal stored with `/signals`, used instead of `signal`."),
+    pipeline: str = Form(
+        ..., description="JSON-encoded pipeline exported from the processing workspace (`nodes` and `edges`)."),
+    sampling_rate: float = Form(..., description="Sampling rate of the input signal in Hz."),
+    signal_type: str | None = Form(
+        None, description="Signal type (`'EDA'`, `'PPG'`...). Defaults to the pipeline `signalType`."),
+    intermediates: str = Form(
+        "[]", description="JSON-encoded list of node ids whose output should also be returned."),
+    use_cache: bool = Form(
+        True, description="Reuse the cached result of an identical earlier request."),
+    store_result: bool = Form(
+        False, description="Store the output and return its `signal_id` for follow-up requests."),
+):
+    """
+    Run every stage of an exported pipeline in a single request.
+
+    Stages are chained in-process, so the signal is only decoded once and
+    only the final output (plus any requested intermediates) is encoded.
+    Binary responses carry only the final output, so requesting intermediates
+    always answers with JSON.
+    """
+    try:
+        definition = json.loads(pipeline)
+        requested_intermediates = json.loads(intermediates)
+        data = await resolve_signal(signal, signal_id)
+        error = check_single_channel(data, "Pipeline")
+        if error:
+            return error
+
+        sampling_rate_error = validate_sampling_rate(sampling_rate, "Pipeline")
+        if sampling_rate_error:
+            return sampling_rate_error
+
+        error = check_max_samples(len(data), "Pipeline")
+        if error:
+            return error
+
+        if not isinstance(requested_intermediates, list):
+            return JSONResponse(content={"error": "Intermediates must be a list of node ids"}, status_code=400)
+
+        if signal_type is None:
+            signal_type = (definition.get("signalType") if isinstance(definition, dict) else None) or "OTHER"
+
+        result = await cached_compute(
+            use_cache and not pipeline_uses_python(definition),
+            "pipeline",
+            data,
+            {
+                "pipeline": definition,
+                "sampling_rate": sampling_rate,
+                "signal_type": signal_type.upper(),
+                "intermediates": sorted(str(node_id) for node_id in requested_intermediates),
             },
-            "Kleckner et al. (2017) 2s Filter": {
-                "metric_id": "kleckner_2017_filter_2s",
-                "value": kleckner_quality_filter(values, fs=sampling_rate),
-                "preference": "higher",
-                "description": "Automated EDA quality score using the same range, slope and artifact spreading rules after a 2-second pre-filter. Higher is better.",
+            run_pipeline,
+            definition,
+            data,
+            sampling_rate=sampling_rate,
+            signal_type=signal_type,
+            intermediates=requested_intermediates,
+        )
+        output = stored_output(store_result, result["data"])
+    except PipelineError as e:
+        content = {"error": str(e)}
+        if e.node_id is not None:
+            content["node_id"] = e.node_id
+        return JSONResponse(content=content, status_code=e.status_code)
+    except ExecutorUnavailable as e:
+        return unavailable_response(e)
+    except TransportError as e:
+        return transport_error_response(e)
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+
+    extra = {
+        "sampling_rate": result["sampling_rate"],
+        "steps": result["steps"],
+        **output,
+    }
+    if result["peaks"] is not None:
+        extra["peaks"] = result["peaks"]
+        extra["peak_count"] = len(result["peaks"])
+    if result["beat_count"] is not None:
+        extra["beat_count"] = result["beat_count"]
+
+    if result["intermediates"]:
+        return JSONResponse(content={
+            "data": result["data"].tolist(),
+            **extra,
+            "intermediates": {
+                node_id: node_data.tolist()
+                for node_id, node_data in result["intermediates"].items()
             },
-        }
-    elif signal_type == "PPG":
-        return {
-            "Maki et al. (2020)": {
-                "metric_id": "maki_2020",
-                "value": maki_quality(values, fs=sampling_rate),
-                "preference": "lower",
-                "description": "Q_PHV pulse-height variability metric based on beat-to-beat pulse height variation. Lower is better.",
-            }
-        }
-    else:
-        return {"error": "Signal type not supported"}
+        })
+
+    return signal_response(request, result["data"], {**extra, "intermediates": {}})
+
+
+@app.options("/batch", include_in_schema=False)
+async def options_batch():
+    return {"message": "Preflight OPTIONS request handled"}
+
+
+@app.post("/batch", summary="Start a batch processing job", tags=["Pipeline"], status_code=202)
+async def batch(
+    files: list[UploadFile] = File(...,
+                                   description="CSV files to process, or a single ZIP archive containing them."),
+    pipeline: str = Form(
+        ..., description="JSON-encoded pipeline exported from the processing workspace (`nodes` and `edges`)."),
+    signal_column: str = Form(...,
+                              description="Header name (or zero-based index) of the signal column."),
+    sampling_rate: float = Form(..., description="Sampling rate of the input signals in Hz."),
+    timestamp_column: str | None = Form(
+        None, description="Header name (or zero-based index) of the timestamp column. Timestamps are calculated from the sampling rate when omitted."),
+    signal_type: str | None = Form(
+        None, description="Signal type (`'EDA'`, `'PPG'`...). Defaults to the pipeline `signalType`."),
+):
+    """
+    Process many recordings with the same column mapping and pipeline.
+
+    Files are spread across a process pool sized to the available cores.
+    Poll `/batch/{job_id}` for per-file status and download
+    `/batch/{job_id}/results`, which streams a ZIP as files finish.
+    """
+    try:
+        definition = json.loads(pipeline)
+
+        sampling_rate_error = validate_sampling_rate(sampling_rate, "Batch")
+        if sampling_rate_error:
+            return sampling_rate_error
+
+        if signal_type is None:
+            signal_type = (definition.get("signalType") if isinstance(definition, dict) else None) or "OTHER"
+
+        uploads = [(upload.filename or "", upload.file) for upload in files]
+        job = await create_batch_job(uploads, {
+            "pipeline": definition,
+            "signal_column": signal_column,
+            "timestamp_column": timestamp_column,
+            "sampling_rate": sampling_rate,
+            "signal_type": signal_type,
+        })
+    except Exception as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+
+    if not job.files:
+        delete_batch_job(job.id)
+        return JSONResponse(content={"error": "No CSV files found in the upload"}, status_code=400)
+
+    return JSONResponse(content=job.status_payload(), status_code=202)
+
+
+@app.get("/batch/{job_id}", summary="Get batch job status", tags=["Pipeline"])
+async def batch_status(job_id: str):
+    job = get_batch_job(job_id)
+    if job is None:
+        return JSONResponse(content={"error": "Batch job not found"}, status_code=404)
+
+    return JSONResponse(content=job.status_payload())
+
+
+@app.get("/batch/{job_id}/results", summary="Download batch results", tags=["Pipeline"])
+async def batch_results(job_id: str):
+    """
+    Stream a ZIP archive with every processed file, added as each one finishes.
+    """
+    job = get_batch_job(job_id)
+    if job is None:
+        return JSONResponse(content={"error": "Batch job not found"}, status_code=404)
+
+    return StreamingResponse(
+        job.stream_results(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="signalchemist-batch-{job_id}.zip"'},
+    )
+
+
+@app.delete("/batch/{job_id}", summary="Delete a batch job", tags=["Pipeline"])
+async def batch_delete(job_id: str):
+    if not delete_batch_job(job_id):
+        return JSONResponse(content={"error": "Batch job not found"}, status_code=404)
+
+    return {"message": "Batch job deleted"}
+
+
+active_streams = 0
+
+
+@app.websocket("/stream")
+async def stream(websocket: WebSocket):
+    """
+    Process live samples incrementally.
+
+    The first text message is a JSON config: `sampling_rate`, an optional
+    built-in `filter` (`method`, `order`, `lowcut`, `highcut`), optional
+    `peaks` (`min_distance_seconds`, `height`) and `heart_rate`. Every
+    following message is a batch of samples, either JSON
+    `{"data": [[timestamp, value], ...]}` or packed little-endian float64
+    pairs, and is answered with the filtered samples, newly confirmed peaks
+    and heart rate updates.
+    """
+    global active_streams
+
+    await websocket.accept()
+    if active_streams >= MAX_STREAMS:
+        await websocket.close(code=1013, reason="Too many concurrent streams")
+        return
+
+    active_streams += 1
+    try:
+        try:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("text") is None:
+                raise StreamError("The first message must be a JSON config with a sampling_rate.")
+            processor = StreamProcessor.from_config(json.loads(message["text"]))
+        except (StreamError, ValueError, TypeError) as e:
+            await websocket.send_json({"type": "error", "error": str(e)})
+            await websocket.close(code=1008)
+            return
+        await websocket.send_json({"type": "ready"})
+
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            try:
+                if message.get("bytes") is not None:
+                    data = decode_raw(message["bytes"])
+                else:
+                    data = json.loads(message.get("text") or "{}").get("data", [])
+                await websocket.send_json(processor.process(data))
+            except (StreamError, TransportError, ValueError, TypeError, AttributeError) as e:
+                await websocket.send_json({"type": "error", "error": str(e)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        active_streams -= 1
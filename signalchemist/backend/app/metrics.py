@@ -1,5 +1,5 @@
 import numpy as np
-from scipy.signal import filtfilt, find_peaks
+import scipy
 
 
 def bottcher_quality(eda, stamps=None, fs=4):
@@ -12,40 +12,44 @@ def bottcher_quality(eda, stamps=None, fs=4):
 
     def get_rac(signal, window_seconds=2):
         window_samples = int(window_seconds * fs)
-        intervals = range(0, len(signal), window_samples)
-        rac = np.full(len(signal), np.nan)
-
-        for start in intervals:
-            if (start + window_samples) >= len(signal):
-                continue
-
-            window = signal[start : start + window_samples]
-            min_index = np.argmin(window)
-            min_value = window[min_index]
-            max_index = np.argmax(window)
-            max_value = window[max_index]
-
-            if min_index < max_index:
-                rac[start] = (max_value - min_value) / (abs(min_value) + 1e-20)
-            elif min_index > max_index:
-                rac[start] = (min_value - max_value) / (abs(max_value) + 1e-20)
+        if window_samples <= 0:
+            raise ValueError("RAC window must contain at least one sample")
+
+        # Only windows that end strictly before the last sample are scored.
+        window_count = max(0, (len(signal) - 1) // window_samples)
+        windows = signal[: window_count * window_samples].reshape(window_count, window_samples)
+
+        min_index = np.argmin(windows, axis=1)
+        max_index = np.argmax(windows, axis=1)
+        min_value = np.take_along_axis(windows, min_index[:, None], axis=1)[:, 0]
+        max_value = np.take_along_axis(windows, max_index[:, None], axis=1)[:, 0]
+
+        window_rac = np.full(window_count, np.nan)
+        rising = min_index < max_index
+        falling = min_index > max_index
+        window_rac[rising] = (max_value[rising] - min_value[rising]) / (
+            np.abs(min_value[rising]) + 1e-20
+        )
+        window_rac[falling] = (min_value[falling] - max_value[falling]) / (
+            np.abs(max_value[falling]) + 1e-20
+        )
 
-        last_value = np.nan
-        for index in range(len(rac)):
-            if not np.isnan(rac[index]):
-                last_value = rac[index]
-            else:
-                rac[index] = last_value
+        rac = np.full(len(signal), np.nan)
+        rac[: window_count * window_samples : window_samples] = window_rac
 
-        return rac
+        # Forward-fill every sample with the last scored window value.
+        last_valid = np.where(~np.isnan(rac), np.arange(len(rac)), 0)
+        np.maximum.accumulate(last_valid, out=last_valid)
+        return rac[last_valid]
 
     def get_windowed_mm_score(score, window_seconds=60):
         moving_window = int(window_seconds * fs)
         cumsum = np.cumsum(np.insert(score, 0, 0))
         head_mean = (cumsum[moving_window:] - cumsum[:-moving_window]) / moving_window
-        tail_means = np.array(
-            [np.mean(score[-i:]) for i in range(moving_window - 1, 0, -1)]
-        )
+        # Means of the trailing 1..moving_window-1 samples, longest first.
+        tail_lengths = np.minimum(np.arange(moving_window - 1, 0, -1), len(score))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            tail_means = (cumsum[-1] - cumsum[len(score) - tail_lengths]) / tail_lengths
         score_mm = np.concatenate((head_mean, tail_means))
         max_length = min(len(score), len(stamps)) if stamps is not None else len(score)
         return score_mm[:max_length:moving_window]
@@ -55,6 +59,54 @@ def bottcher_quality(eda, stamps=None, fs=4):
     return float(np.mean(score_windowed))
 
 
+def running_mean_filtfilt(values, window_size):
+    """
+    Zero-phase boxcar filter equivalent to
+    `filtfilt((1 / window_size) * np.ones(int(window_size)), 1, values)`.
+
+    Both passes use an O(n) running mean instead of an FIR kernel whose cost
+    grows with the window length. Padding and initial conditions follow
+    `filtfilt`: odd extension of `3 * int(window_size)` samples and a steady
+    state start on the first sample of each pass.
+    """
+    values = np.asarray(values, dtype=float)
+    length = int(window_size)
+    if length < 2 or np.isnan(values).any():
+        return scipy.signal.filtfilt((1 / window_size) * np.ones(length), 1, values)
+
+    padlen = 3 * length
+    if len(values) <= padlen:
+        raise ValueError("The length of the input vector x must be greater than padlen, which is %d." % padlen)
+
+    extended = np.concatenate((
+        2 * values[0] - values[padlen:0:-1],
+        values,
+        2 * values[-1] - values[-2:-(padlen + 2):-1],
+    ))
+    gain = length / window_size
+    origin = (length - 1) // 2
+
+    forward = gain * scipy.ndimage.uniform_filter1d(extended, length, mode="nearest", origin=origin)
+    backward = gain * scipy.ndimage.uniform_filter1d(forward[::-1], length, mode="nearest", origin=origin)
+    return backward[::-1][padlen:-padlen]
+
+
+def spread_invalid(invalid, spread_samples):
+    """
+    Mark every sample within `spread_samples - 1` of an invalid sample as invalid.
+    """
+    invalid = np.asarray(invalid, dtype=bool)
+    radius = spread_samples - 1
+    if radius <= 0 or len(invalid) == 0:
+        return invalid.copy()
+
+    counts = np.concatenate(([0], np.cumsum(invalid, dtype=np.int64)))
+    positions = np.arange(len(invalid))
+    lower = np.maximum(positions - radius, 0)
+    upper = np.minimum(positions + radius + 1, len(invalid))
+    return (counts[upper] - counts[lower]) > 0
+
+
 def kleckner_quality(
     data_eda_us,
     fs=4,
@@ -107,9 +159,8 @@ def kleckner_quality(
 
     if qa_filter_window_eda_sec:
         window_size = qa_filter_window_eda_sec / sampling_period_eda
-        kernel = (1 / window_size) * np.ones(int(window_size))
-        data_eda_us_filtered = filtfilt(kernel, 1, data_eda_us)
-        data_temperature_c_filtered = filtfilt(kernel, 1, data_temperature_c)
+        data_eda_us_filtered = running_mean_filtfilt(data_eda_us, window_size)
+        data_temperature_c_filtered = running_mean_filtfilt(data_temperature_c, window_size)
 
         if np.sum(~np.isnan(data_temperature_c_filtered)) == 0:
             data_temperature_c_filtered = data_temperature_c
@@ -132,13 +183,7 @@ def kleckner_quality(
     )
 
     spread_samples = int(qa_radius_to_spread_invalid_datum_sec / sampling_period_eda)
-    eda_datum_invalid = eda_datum_invalid_123.copy()
-
-    for index, is_invalid in enumerate(eda_datum_invalid_123):
-        if not is_invalid:
-            continue
-        eda_datum_invalid[index : index + spread_samples] = 1
-        eda_datum_invalid[max(0, index - spread_samples + 1) : index] = 1
+    eda_datum_invalid = spread_invalid(eda_datum_invalid_123, spread_samples)
 
     return float(np.mean(~eda_datum_invalid))
 
@@ -163,25 +208,26 @@ def maki_quality(data, fs=64, min_peak_distance=60 / 240, min_peak_height=0):
     data = np.asarray(data, dtype=float)
     min_peak_distance_samples = max(1, int(round(min_peak_distance * fs)))
 
-    def normalize_mean_peak_height(values):
-        centered = values - np.mean(values)
-        peak_indices, _ = find_peaks(
-            centered,
+    def find_peaks(values):
+        peak_indices, _ = scipy.signal.find_peaks(
+            values,
             height=min_peak_height,
             distance=min_peak_distance_samples,
         )
-        peaks = centered[peak_indices]
-        if peaks.size == 0 or np.isclose(np.mean(peaks), 0):
-            raise ValueError("Unable to normalize signal: no valid peaks found.")
-        return centered / np.mean(peaks)
-
-    normalized_signal = normalize_mean_peak_height(data)
-    peak_indices, _ = find_peaks(
-        normalized_signal,
-        height=min_peak_height,
-        distance=min_peak_distance_samples,
-    )
-    peaks = normalized_signal[peak_indices]
+        return values[peak_indices]
+
+    centered = data - np.mean(data)
+    peaks = find_peaks(centered)
+    if peaks.size == 0 or np.isclose(np.mean(peaks), 0):
+        raise ValueError("Unable to normalize signal: no valid peaks found.")
+    mean_peak_height = np.mean(peaks)
+    if mean_peak_height > 0 and min_peak_height == 0:
+        # Scaling by a positive mean height moves no peak and leaves a zero
+        # height threshold unchanged, so the peaks of the normalized signal
+        # are already known. Any other threshold selects different peaks.
+        peaks = peaks / mean_peak_height
+    else:
+        peaks = find_peaks(centered / mean_peak_height)
     if peaks.size <= 1:
         return 0.0
 
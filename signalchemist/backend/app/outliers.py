@@ -1,54 +1,161 @@
 import numpy as np
-import pandas as pd
-import neurokit2
+import scipy
 
-def IQR(signal):
-    """Remove outliers using Interquartile Range (IQR) and interpolate missing values."""
-    signal_array = np.array(signal, dtype=float)
+from app.chunked import process_blockwise
 
-    Q1 = np.percentile(signal_array, 25)
-    Q3 = np.percentile(signal_array, 75)
-    IQR = Q3 - Q1
+OUTLIER_WINDOW_SECONDS = 5.0
+MAD_SCALE = 1.4826  # Makes the MAD consistent with the standard deviation of normal data
 
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
+# Techniques accepted by `clean_outliers` with their default threshold: the
+# IQR multiplier for the IQR techniques, otherwise the number of (robust)
+# standard deviations.
+OUTLIER_THRESHOLDS = {
+    "iqr": 1.5,
+    "hampel": 3.0,
+    "rolling_iqr": 1.5,
+    "rolling_mad": 3.0,
+    "rolling_zscore": 3.0,
+}
+WINDOWED_TECHNIQUES = ("hampel", "rolling_iqr", "rolling_mad", "rolling_zscore")
 
-    outliers = (signal_array < lower_bound) | (signal_array > upper_bound)
 
-    clean_signal = signal_array.copy()
-    clean_signal[outliers] = np.nan
+def window_size(sampling_rate, window_seconds=OUTLIER_WINDOW_SECONDS):
+    """Odd number of samples covering `window_seconds` at `sampling_rate`."""
+    if sampling_rate <= 0 or window_seconds <= 0:
+        raise ValueError("Sampling rate and outlier window must be positive")
+    return max(3, int(round(window_seconds * sampling_rate)) | 1)
 
-    nans = np.isnan(clean_signal)
-    if any(nans):
-        clean_signal[nans] = np.interp(
-            np.nonzero(nans)[0],  # Índices de los NaN
-            np.nonzero(~nans)[0],  # Índices de los valores válidos
-            clean_signal[~nans],  # Valores válidos
-        )
 
-    clean_signal[np.isnan(clean_signal)] = np.nanmean(clean_signal)
+def interpolate_nans(signal):
+    """Linearly interpolate NaN samples, holding the nearest valid value at the edges."""
+    nans = np.isnan(signal)
+    if not nans.any() or nans.all():
+        return signal
 
-    return clean_signal.tolist()
+    signal = signal.copy()
+    signal[nans] = np.interp(np.flatnonzero(nans), np.flatnonzero(~nans), signal[~nans])
+    return signal
 
 
-def hampel(gsr):
-    """Remove outliers from GSR signal using Hampel method and IQR logic."""
-    gsr_filtered = np.array(neurokit2.rsp_clean(
-        gsr, sampling_rate=4, method="hampel"))
+def replace_outliers(signal, outliers):
+    """Interpolate over the samples flagged in the `outliers` mask."""
+    if not outliers.any():
+        return signal
+
+    signal = signal.copy()
+    signal[outliers] = np.nan
+    return interpolate_nans(signal)
+
+
+def iqr_outliers(signal, k=OUTLIER_THRESHOLDS["iqr"]):
+    """Flag samples more than `k` IQRs outside the global quartiles."""
+    q1, q3 = np.quantile(signal, [0.25, 0.75])
+    spread = k * (q3 - q1)
+    return (signal < q1 - spread) | (signal > q3 + spread)
+
+
+def rolling_iqr_outliers(signal, size, k=OUTLIER_THRESHOLDS["rolling_iqr"]):
+    """Flag samples more than `k` IQRs outside the quartiles of their centred window."""
+    q1 = scipy.ndimage.percentile_filter(signal, 25, size=size, mode="nearest")
+    q3 = scipy.ndimage.percentile_filter(signal, 75, size=size, mode="nearest")
+    spread = k * (q3 - q1)
+    return (signal < q1 - spread) | (signal > q3 + spread)
 
-    Q1 = np.percentile(gsr_filtered, 25)
-    Q3 = np.percentile(gsr_filtered, 75)
-    IQR = Q3 - Q1
 
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
+def rolling_mad_outliers(signal, size, threshold=OUTLIER_THRESHOLDS["rolling_mad"]):
+    """
+    Flag samples more than `threshold` scaled MADs away from the centred
+    rolling median, and return the mask together with that median.
 
-    outliers = (gsr_filtered < lower_bound) | (gsr_filtered > upper_bound)
+    The rolling MAD is taken as the rolling median of the absolute
+    deviations. Both passes use SciPy's heap-based 1-D median filter, so the
+    cost is O(n log w) in the window size.
+    """
+    rolling_median = scipy.ndimage.median_filter(signal, size=size, mode="nearest")
+    deviation = np.abs(signal - rolling_median)
+    rolling_mad = MAD_SCALE * scipy.ndimage.median_filter(deviation, size=size, mode="nearest")
+    return deviation > threshold * rolling_mad, rolling_median
 
-    gsr_cleaned = gsr_filtered.copy()
-    gsr_cleaned[outliers] = np.nan
 
-    gsr_clean_series = pd.Series(gsr_cleaned).interpolate(method="linear")
-    gsr_clean_series = gsr_clean_series.fillna(gsr_clean_series.mean())
+def rolling_zscore_outliers(signal, size, threshold=OUTLIER_THRESHOLDS["rolling_zscore"], offset=None):
+    """
+    Flag samples more than `threshold` standard deviations from their centred
+    window mean. The running moments are taken around `offset`, the signal
+    mean by default, to limit cancellation.
+    """
+    centred = signal - (signal.mean() if offset is None else offset)
+    rolling_mean = scipy.ndimage.uniform_filter1d(centred, size=size, mode="nearest")
+    rolling_square = scipy.ndimage.uniform_filter1d(centred * centred, size=size, mode="nearest")
+    rolling_std = np.sqrt(np.maximum(rolling_square - rolling_mean * rolling_mean, 0))
+    return np.abs(centred - rolling_mean) > threshold * rolling_std
 
-    return gsr_clean_series.to_numpy()
\ No newline at end of file
+
+def _hampel_block(signal, size, threshold):
+    outliers, rolling_median = rolling_mad_outliers(signal, size, threshold)
+    return outliers, np.where(outliers, rolling_median, signal)
+
+
+def IQR(signal, k=OUTLIER_THRESHOLDS["iqr"]):
+    """Remove outliers using Interquartile Range (IQR) and interpolate missing values."""
+    signal_array = interpolate_nans(np.asarray(signal, dtype=np.float64))
+    return replace_outliers(signal_array, iqr_outliers(signal_array, k))
+
+
+def hampel(gsr, sampling_rate, window_seconds=OUTLIER_WINDOW_SECONDS, threshold=OUTLIER_THRESHOLDS["hampel"]):
+    """Remove outliers from GSR signal using Hampel method and IQR logic."""
+    return clean_outliers(gsr, "hampel", sampling_rate, window_seconds, threshold)[0]
+
+
+def clean_outliers(
+    signal,
+    technique: str,
+    sampling_rate=None,
+    window_seconds=OUTLIER_WINDOW_SECONDS,
+    threshold=None,
+):
+    """
+    Detect outliers with `technique` and interpolate over them.
+
+    Returns the cleaned signal and the boolean mask of the samples that were
+    changed. `hampel` replaces local outliers with the rolling median before
+    removing global IQR outliers; the other techniques only flag samples and
+    interpolate over them.
+    """
+    if technique not in OUTLIER_THRESHOLDS:
+        raise ValueError("Invalid technique")
+    if threshold is None:
+        threshold = OUTLIER_THRESHOLDS[technique]
+
+    signal = interpolate_nans(np.asarray(signal, dtype=np.float64))
+
+    if technique == "iqr":
+        outliers = iqr_outliers(signal, threshold)
+        return replace_outliers(signal, outliers), outliers
+
+    if sampling_rate is None:
+        raise ValueError("Sampling rate is required for windowed outlier techniques")
+    size = window_size(sampling_rate, window_seconds)
+
+    # A window filter reaches `size // 2` samples on each side, and the MAD
+    # stacks two of them, so an overlap of `size` keeps long signals
+    # processed block by block identical to the whole-signal result.
+    overlap = size
+
+    if technique == "hampel":
+        local_outliers, filtered = process_blockwise(
+            lambda block: _hampel_block(block, size, threshold), signal, overlap)
+        global_outliers = iqr_outliers(filtered)
+        return replace_outliers(filtered, global_outliers), local_outliers | global_outliers
+
+    if technique == "rolling_iqr":
+        outliers = process_blockwise(
+            lambda block: rolling_iqr_outliers(block, size, threshold), signal, overlap)
+    elif technique == "rolling_mad":
+        outliers = process_blockwise(
+            lambda block: rolling_mad_outliers(block, size, threshold)[0], signal, overlap)
+    else:
+        offset = signal.mean()
+        outliers = process_blockwise(
+            lambda block: rolling_zscore_outliers(block, size, threshold, offset), signal, overlap)
+
+    return replace_outliers(signal, outliers), outliers
@@ -0,0 +1,294 @@
+import numpy as np
+
+from app.chunked import covers_overlap
+from app.intermediates import Intermediates
+from app.outliers import OUTLIER_WINDOW_SECONDS, window_size
+from app.processing import (
+    HEART_RATE_METHODS,
+    apply_builtin_filter,
+    apply_normalization,
+    apply_python_filter,
+    build_peak_payload,
+    detect_peak_indices,
+    exceeds_max_samples,
+    filter_runs_chunked,
+    peak_overlap,
+    python_enabled,
+    remove_outliers,
+    resample_signal,
+    resampled_length,
+    sanitize_filter_config,
+)
+
+INPUT_NODE_ID = "1"
+OUTPUT_NODE_ID = "2"
+
+
+class PipelineError(Exception):
+    """
+    Error raised while validating or executing a pipeline definition.
+    """
+
+    def __init__(self, message: str, status_code: int = 400, node_id: str | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.node_id = node_id
+
+    def __reduce__(self):
+        return (PipelineError, (str(self), self.status_code, self.node_id))
+
+
+def order_pipeline_nodes(pipeline: dict) -> list[dict]:
+    """
+    Follow the edges from the input node to the output node, mirroring
+    `getOrderedPipelineNodes` in the frontend batch runner.
+    """
+    if (
+        not isinstance(pipeline, dict)
+        or not isinstance(pipeline.get("nodes"), list)
+        or not isinstance(pipeline.get("edges"), list)
+    ):
+        raise PipelineError("Invalid pipeline file")
+
+    node_map = {
+        str(node["id"]): {
+            "id": str(node["id"]),
+            "type": node.get("type"),
+            "data": node.get("data") or {},
+        }
+        for node in pipeline["nodes"]
+        if isinstance(node, dict) and "id" in node
+    }
+    edge_map = {
+        str(edge["source"]): str(edge["target"])
+        for edge in pipeline["edges"]
+        if isinstance(edge, dict) and "source" in edge and "target" in edge
+    }
+
+    ordered_nodes = []
+    visited = set()
+    current_node_id = INPUT_NODE_ID
+
+    while current_node_id and current_node_id not in visited:
+        visited.add(current_node_id)
+        next_node_id = edge_map.get(current_node_id)
+        if not next_node_id or next_node_id == OUTPUT_NODE_ID:
+            break
+
+        next_node = node_map.get(next_node_id)
+        if next_node is None:
+            raise PipelineError("Pipeline contains invalid node references")
+
+        ordered_nodes.append(next_node)
+        current_node_id = next_node_id
+
+    return ordered_nodes
+
+
+def pipeline_uses_python(pipeline: dict) -> bool:
+    """
+    Whether any filtering stage of the pipeline runs custom Python code.
+    """
+    if not isinstance(pipeline, dict) or not isinstance(pipeline.get("nodes"), list):
+        return False
+
+    for node in pipeline["nodes"]:
+        if not isinstance(node, dict) or node.get("type") != "FilteringNode":
+            continue
+        data = node.get("data") or {}
+        if data.get("filter") == "python" or (data.get("fields") or {}).get("python"):
+            return True
+    return False
+
+
+def _check_length(length: int, operation: str, node_id: str, chunked: bool = False):
+    if exceeds_max_samples(length, chunked):
+        raise PipelineError(
+            f"{operation} request too large for production server.",
+            node_id=node_id,
+        )
+
+
+def _intermediates(data, sampling_rate: float, state) -> Intermediates:
+    """
+    The `Intermediates` of the current stage data, shared by consecutive
+    stages until one of them changes the data or the sampling rate.
+    """
+    intermediates = state["intermediates"]
+    if intermediates is None or intermediates.sampling_rate != sampling_rate:
+        intermediates = Intermediates(data[:, 1], sampling_rate)
+        state["intermediates"] = intermediates
+    return intermediates
+
+
+def _run_resampling(node, data, state):
+    target_sampling_rate = float(
+        node["data"].get("targetSamplingRate", state["sampling_rate"]))
+    _check_length(resampled_length(data, target_sampling_rate), "Resampling", node["id"])
+
+    state["sampling_rate"] = target_sampling_rate
+    return resample_signal(
+        data,
+        node["data"].get("interpolationTechnique", "spline"),
+        target_sampling_rate,
+    )
+
+
+def _run_outliers(node, data, state):
+    technique = node["data"].get("outlierTechnique", "iqr")
+    window_seconds = node["data"].get("windowSeconds")
+    window_seconds = float(window_seconds) if window_seconds else OUTLIER_WINDOW_SECONDS
+    chunked = technique == "iqr" or covers_overlap(window_size(state["sampling_rate"], window_seconds))
+    _check_length(len(data), "Outlier detection", node["id"], chunked=chunked)
+    threshold = node["data"].get("threshold")
+    new_values = remove_outliers(
+        data[:, 1],
+        technique,
+        sampling_rate=state["sampling_rate"],
+        window_seconds=window_seconds,
+        threshold=float(threshold) if threshold not in (None, "") else None,
+    )
+    return np.stack((data[:, 0], new_values), axis=1)
+
+
+def _run_filtering(node, data, state):
+    sampling_rate = float(node["data"].get("samplingRate", state["sampling_rate"]))
+    config = {
+        "method": node["data"].get("filter", "butterworth"),
+        **(node["data"].get("fields") or {}),
+    }
+    _check_length(len(data), "Filtering", node["id"], chunked=filter_runs_chunked(config, sampling_rate))
+
+    if config.get("method") == "python" and not config.get("python"):
+        raise PipelineError(
+            "Python code is required when method is 'python'", node_id=node["id"])
+
+    if config.get("python"):
+        if not python_enabled():
+            raise PipelineError(
+                "Python code is disabled in public build",
+                status_code=403,
+                node_id=node["id"],
+            )
+        new_values = apply_python_filter(config["python"], data[:, 1])
+    else:
+        new_values = apply_builtin_filter(
+            data[:, 1],
+            sampling_rate=sampling_rate,
+            config=sanitize_filter_config(config),
+        )
+
+    return np.stack((data[:, 0], new_values), axis=1)
+
+
+def _run_normalization(node, data, state):
+    _check_length(len(data), "Normalization", node["id"], chunked=True)
+    new_values = apply_normalization(
+        data[:, 1], node["data"].get("normalizationMethod", "zscore"))
+    return np.stack((data[:, 0], new_values), axis=1)
+
+
+def _run_peaks(node, data, state):
+    detector = node["data"].get("detector", "scipy")
+    sampling_rate = float(node["data"].get("samplingRate", state["sampling_rate"]))
+    min_distance_seconds = float(node["data"].get("minDistanceSeconds") or 0)
+    chunked = detector.lower() == "scipy" and covers_overlap(peak_overlap(sampling_rate, min_distance_seconds))
+    _check_length(len(data), "Peak detection", node["id"], chunked=chunked)
+    height = node["data"].get("height")
+    peak_indices = detect_peak_indices(
+        data[:, 1],
+        sampling_rate=sampling_rate,
+        detector=detector,
+        signal_type=state["signal_type"],
+        min_distance_seconds=min_distance_seconds,
+        height=float(height) if height not in (None, "") else None,
+        intermediates=_intermediates(data, sampling_rate, state),
+    )
+    state["peaks"] = build_peak_payload(data, peak_indices)
+    return data
+
+
+def _run_heart_rate(node, data, state):
+    _check_length(len(data), "Heart rate", node["id"])
+    if state["signal_type"] != "PPG":
+        raise PipelineError(
+            "Heart rate analysis is only available for PPG signals.",
+            node_id=node["id"],
+        )
+
+    sampling_rate = float(node["data"].get("samplingRate", state["sampling_rate"]))
+    method = str(node["data"].get("method", "emotibit")).lower()
+    if method not in HEART_RATE_METHODS:
+        raise PipelineError("Invalid heart rate method", node_id=node["id"])
+    heart_rate_data = HEART_RATE_METHODS[method](
+        data, sampling_rate, _intermediates(data, sampling_rate, state))
+
+    state["beat_count"] = int(len(heart_rate_data))
+    return heart_rate_data
+
+
+STAGE_RUNNERS = {
+    "ResamplingNode": _run_resampling,
+    "OutliersNode": _run_outliers,
+    "FilteringNode": _run_filtering,
+    "NormalizationNode": _run_normalization,
+    "PeaksNode": _run_peaks,
+    "HeartRateNode": _run_heart_rate,
+}
+
+
+def run_pipeline(
+    pipeline: dict,
+    data,
+    sampling_rate: float,
+    signal_type: str = "OTHER",
+    intermediates=(),
+):
+    """
+    Execute every stage of an exported pipeline in-process on NumPy arrays.
+    Stages that leave the data unchanged, like peak detection, share their
+    cleaned signal and peaks with the next stage through `Intermediates`.
+
+    Returns a dict with the final `data` array, the `sampling_rate` after the
+    last stage, the executed `steps`, the arrays of the requested
+    `intermediates` (keyed by node id) and, when the pipeline contains those
+    stages, the detected `peaks` and the heart rate `beat_count`.
+    """
+    ordered_nodes = order_pipeline_nodes(pipeline)
+    requested = {str(node_id) for node_id in intermediates}
+    state = {
+        "sampling_rate": float(sampling_rate),
+        "signal_type": signal_type.upper(),
+        "peaks": None,
+        "beat_count": None,
+        "intermediates": None,
+    }
+    stored_intermediates = {}
+
+    for node in ordered_nodes:
+        runner = STAGE_RUNNERS.get(node["type"])
+        if runner is None:
+            raise PipelineError(
+                f"Unsupported node type: {node['type']}", node_id=node["id"])
+
+        try:
+            new_data = runner(node, data, state)
+        except PipelineError:
+            raise
+        except Exception as e:
+            raise PipelineError(str(e), node_id=node["id"]) from e
+
+        if new_data is not data:
+            state["intermediates"] = None
+        data = new_data
+        if node["id"] in requested:
+            stored_intermediates[node["id"]] = data
+
+    return {
+        "data": data,
+        "sampling_rate": state["sampling_rate"],
+        "steps": [{"id": node["id"], "type": node["type"]} for node in ordered_nodes],
+        "intermediates": stored_intermediates,
+        "peaks": state["peaks"],
+        "beat_count": state["beat_count"],
+    }
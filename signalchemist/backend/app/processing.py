@@ -0,0 +1,391 @@
+import os
+
+import numpy as np
+import scipy
+
+from app.backends import backends
+from app.chunked import (
+    CHUNK_SAMPLES,
+    blockwise_mean_std,
+    blockwise_min_max,
+    covers_overlap,
+    find_peaks_blockwise,
+    process_blockwise,
+)
+from app.filters import SOS_METHODS, sos_block_overlap, sos_filter
+from app.hr import compute_emotibit_heart_rate, compute_neurokit_heart_rate
+from app.intermediates import Intermediates
+from app.metrics import (
+    bottcher_quality,
+    kleckner_quality,
+    kleckner_quality_filter,
+    maki_quality,
+)
+from app.outliers import OUTLIER_WINDOW_SECONDS, clean_outliers
+from app.resampling import timed_resample
+from app.sandbox import python_filter_pool
+
+neurokit2 = backends.lazy("neurokit2")
+
+MAX_SAMPLES_ALLOWED = 150_000  # Maximum samples of whole-signal processing in production
+DEFAULT_PROCESSING_MEMORY_BYTES = 2 * 1024 * 1024 * 1024
+
+# Memory budget for one chunked request in production. Whole-signal
+# operations (NeuroKit, pandas, interpolation) allocate temporaries far
+# beyond any per-sample estimate, so they keep the fixed sample cap.
+PROCESSING_MEMORY_BYTES = int(
+    os.getenv("PROCESSING_MEMORY_BYTES") or DEFAULT_PROCESSING_MEMORY_BYTES)
+
+SIGNAL_BYTES_PER_SAMPLE = 6 * 8  # [timestamp, value] input, output values and [timestamp, value] output
+WORKING_BYTES_PER_SAMPLE = 16 * 8  # Temporaries of an operation, bounded by the block size when chunked
+PEAK_MIN_OVERLAP = 1024  # Context kept around each block when detecting peaks blockwise
+ANALYSES = ("peaks", "hr", "metrics")
+HEART_RATE_METHODS = {
+    "emotibit": compute_emotibit_heart_rate,
+    "neurokit": compute_neurokit_heart_rate,
+}
+
+
+def python_enabled() -> bool:
+    return os.getenv("PYTHON_ENABLED") == "true"
+
+
+def estimated_memory_bytes(length: int, chunked: bool = False) -> int:
+    """
+    Approximate peak memory of processing `length` samples, with temporaries
+    spanning one block when the operation runs `chunked`.
+    """
+    working_length = min(length, CHUNK_SAMPLES) if chunked else length
+    return length * SIGNAL_BYTES_PER_SAMPLE + working_length * WORKING_BYTES_PER_SAMPLE
+
+
+def exceeds_max_samples(length: int, chunked: bool = False) -> bool:
+    if python_enabled():
+        return False
+    if not chunked:
+        return length > MAX_SAMPLES_ALLOWED
+    return estimated_memory_bytes(length, chunked) > PROCESSING_MEMORY_BYTES
+
+
+def gaussian_overlap(sigma) -> int:
+    return int(4 * float(sigma) + 0.5) + 1
+
+
+def min_distance_samples(sampling_rate: float, min_distance_seconds: float) -> int:
+    return max(1, int(round(max(min_distance_seconds, 0) * sampling_rate)))
+
+
+def peak_overlap(sampling_rate: float, min_distance_seconds: float) -> int:
+    return max(2 * min_distance_samples(sampling_rate, min_distance_seconds), PEAK_MIN_OVERLAP)
+
+
+def filter_runs_chunked(config: dict, sampling_rate: float) -> bool:
+    """
+    Whether `apply_builtin_filter` processes the config block by block: a
+    gaussian or SOS filter whose reach fits in a block. Wider kernels and
+    slowly settling filters run on the whole signal.
+    """
+    method = str(config.get("method", "")).lower()
+    if method == "gaussian":
+        return covers_overlap(gaussian_overlap(config.get("sigma", 100)))
+    if method in SOS_METHODS:
+        overlap = sos_block_overlap(config, sampling_rate)
+        return overlap is not None and covers_overlap(overlap)
+    return False
+
+
+def sanitize_filter_config(config: dict) -> dict:
+    return {
+        key: value
+        for key, value in config.items()
+        if key != "python" and value is not None
+    }
+
+
+def channel_values(data):
+    """
+    Values of a `[timestamp, value, ...]` array: 1-D for a single channel,
+    `(n, channels)` otherwise.
+    """
+    return data[:, 1] if data.shape[1] == 2 else data[:, 1:]
+
+
+def with_timestamps(timestamps, values):
+    return np.column_stack((timestamps, values))
+
+
+def per_channel(func, values):
+    """
+    Apply a 1-D operation to each column of a multi-channel value array.
+    """
+    if np.ndim(values) == 1:
+        return func(values)
+    return np.column_stack([func(values[:, channel]) for channel in range(values.shape[1])])
+
+
+def apply_builtin_filter(values, sampling_rate: float, config: dict):
+    method = config.get("method")
+
+    if method == "gaussian":
+        sigma = config.get("sigma", 100)
+        return process_blockwise(
+            lambda block: scipy.ndimage.gaussian_filter1d(block, sigma=sigma, axis=0),
+            values,
+            overlap=gaussian_overlap(sigma),
+        )
+
+    filtered = sos_filter(values, sampling_rate, config)
+    if filtered is not None:
+        return filtered
+
+    return per_channel(
+        lambda channel: neurokit2.signal_filter(
+            channel,
+            sampling_rate=sampling_rate,
+            **config
+        ),
+        values,
+    )
+
+
+def apply_python_filter(code: str, values):
+    """
+    Run a user supplied `filter_signal` function over the signal values,
+    once per channel, in the isolated custom filter workers.
+    """
+    return python_filter_pool.run(code, values)
+
+
+def _scale(shifted, scale):
+    if np.ndim(scale) == 0:
+        if scale == 0:
+            return np.zeros_like(shifted, dtype=np.float64)
+        shifted /= scale
+        return shifted
+
+    constant = scale == 0
+    shifted /= np.where(constant, 1, scale)
+    shifted[:, constant] = 0
+    return shifted
+
+
+def apply_normalization(values, method: str):
+    """
+    Normalize each channel of `values` independently.
+    """
+    if method == "zscore":
+        mean, std = blockwise_mean_std(values)
+        return _scale(np.subtract(values, mean, dtype=np.float64), std)
+
+    if method == "minmax":
+        min_value, max_value = blockwise_min_max(values)
+        return _scale(np.subtract(values, min_value, dtype=np.float64), max_value - min_value)
+
+    raise ValueError("Invalid normalization method")
+
+
+def resampled_length(data, target_sampling_rate: float) -> int:
+    duration = data[:, 0].max() - data[:, 0].min()
+    return int(np.floor(duration * target_sampling_rate)) + 1
+
+
+def resample_signal(
+    data,
+    interpolation_technique: str,
+    target_sampling_rate: float,
+    return_info: bool = False,
+):
+    min_timestamp = data[:, 0].min()
+    num_samples = resampled_length(data, target_sampling_rate)
+
+    new_time = min_timestamp + \
+        np.arange(num_samples, dtype=np.float64) / target_sampling_rate
+
+    new_values, strategy, elapsed_ms = timed_resample(
+        data, interpolation_technique, target_sampling_rate, new_time)
+    new_data = with_timestamps(new_time, new_values)
+    if return_info:
+        return new_data, {"strategy": strategy, "elapsed_ms": elapsed_ms}
+    return new_data
+
+
+def estimate_sampling_rate(timestamps) -> float:
+    """
+    Sampling rate implied by the median spacing of the timestamps.
+    """
+    intervals = np.diff(np.asarray(timestamps, dtype=np.float64))
+    intervals = intervals[intervals > 0]
+    if len(intervals) == 0:
+        raise ValueError("Cannot estimate the sampling rate from the timestamps")
+    return float(1.0 / np.median(intervals))
+
+
+def remove_outliers(
+    values,
+    outlier_technique: str,
+    sampling_rate: float | None = None,
+    window_seconds: float = OUTLIER_WINDOW_SECONDS,
+    threshold: float | None = None,
+    return_mask: bool = False,
+):
+    if np.ndim(values) == 1:
+        cleaned, outliers = clean_outliers(
+            values, outlier_technique, sampling_rate, window_seconds, threshold)
+    else:
+        channels = [
+            clean_outliers(values[:, channel], outlier_technique, sampling_rate, window_seconds, threshold)
+            for channel in range(values.shape[1])
+        ]
+        cleaned = np.column_stack([channel[0] for channel in channels])
+        outliers = np.column_stack([channel[1] for channel in channels])
+
+    if return_mask:
+        return cleaned, outliers
+    return cleaned
+
+
+def detect_peak_indices(
+    values,
+    sampling_rate: float,
+    detector: str = "scipy",
+    signal_type: str = "OTHER",
+    min_distance_seconds: float = 0.0,
+    height: float | None = None,
+    intermediates: Intermediates | None = None,
+):
+    detector = detector.lower()
+    signal_type = signal_type.upper()
+
+    if detector == "neurokit":
+        if intermediates is None:
+            intermediates = Intermediates(values, sampling_rate)
+        if signal_type == "PPG":
+            return intermediates.ppg_peaks()
+
+        if signal_type == "EDA":
+            return intermediates.eda_peaks()
+
+        info = neurokit2.signal_findpeaks(values, relative_height_min=0)
+        return np.asarray(info["Peaks"], dtype=int)
+
+    if detector == "scipy":
+        return find_peaks_blockwise(
+            lambda block: scipy.signal.find_peaks(
+                block,
+                distance=min_distance_samples(sampling_rate, min_distance_seconds),
+                height=height,
+            )[0],
+            values,
+            overlap=peak_overlap(sampling_rate, min_distance_seconds),
+        )
+
+    raise ValueError("Invalid peak detector")
+
+
+def build_peak_payload(data, peak_indices):
+    return [
+        {
+            "index": int(index),
+            "timestamp": float(data[index, 0]),
+            "value": float(data[index, 1]),
+            "height": float(data[index, 1]),
+        }
+        for index in peak_indices
+    ]
+
+
+def build_series_payload(data):
+    return [[float(row[0]), float(row[1])] for row in data]
+
+
+def quality_metrics(values, signal_type: str, sampling_rate: float) -> dict:
+    """
+    Compute the literature quality metrics available for the signal type,
+    separately for each channel of a multi-channel signal.
+    """
+    if np.ndim(values) == 2:
+        return {"channels": [
+            quality_metrics(values[:, channel], signal_type, sampling_rate)
+            for channel in range(values.shape[1])
+        ]}
+
+    signal_type = signal_type.upper()
+
+    if signal_type == "EDA":
+        return {
+            "Böttcher et al. (2022)": {
+                "metric_id": "bottcher_2022",
+                "value": bottcher_quality(values, fs=sampling_rate),
+                "preference": "higher",
+                "description": "EDA quality score based on amplitude plausibility and RAC stability. Higher is better.",
+            },
+            "Kleckner et al. (2017) Raw": {
+                "metric_id": "kleckner_2017_raw",
+                "value": kleckner_quality(values, fs=sampling_rate),
+                "preference": "higher",
+                "description": "Automated EDA quality score using range, slope and artifact spreading rules on the raw signal. Higher is better.",
+            },
+            "Kleckner et al. (2017) 2s Filter": {
+                "metric_id": "kleckner_2017_filter_2s",
+                "value": kleckner_quality_filter(values, fs=sampling_rate),
+                "preference": "higher",
+                "description": "Automated EDA quality score using the same range, slope and artifact spreading rules after a 2-second pre-filter. Higher is better.",
+            },
+        }
+    elif signal_type == "PPG":
+        return {
+            "Maki et al. (2020)": {
+                "metric_id": "maki_2020",
+                "value": maki_quality(values, fs=sampling_rate),
+                "preference": "lower",
+                "description": "Q_PHV pulse-height variability metric based on beat-to-beat pulse height variation. Lower is better.",
+            }
+        }
+    else:
+        return {"error": "Signal type not supported"}
+
+
+def analyze_signal(
+    data,
+    sampling_rate: float,
+    signal_type: str,
+    analyses,
+    detector: str = "neurokit",
+    min_distance_seconds: float = 0.0,
+    height: float | None = None,
+    hr_method: str = "emotibit",
+    intermediates: Intermediates | None = None,
+):
+    """
+    Run several analyses of one single-channel recording together.
+
+    The analyses share one `Intermediates`, so the cleaned signal, the peaks
+    and the EDA components they have in common are computed once. Returns
+    the results and, separately since it only describes this call, the
+    report of the stages that were computed and those reused from earlier
+    requests.
+    """
+    values = data[:, 1]
+    if intermediates is None:
+        intermediates = Intermediates(values, sampling_rate)
+
+    result = {}
+    if "peaks" in analyses:
+        peak_indices = detect_peak_indices(
+            values,
+            sampling_rate=sampling_rate,
+            detector=detector,
+            signal_type=signal_type,
+            min_distance_seconds=min_distance_seconds,
+            height=height,
+            intermediates=intermediates,
+        )
+        result["peaks"] = build_peak_payload(data, peak_indices)
+    if "hr" in analyses:
+        heart_rate_data = HEART_RATE_METHODS[hr_method](data, sampling_rate, intermediates)
+        result["heart_rate"] = build_series_payload(heart_rate_data)
+        result["beat_count"] = int(len(heart_rate_data))
+    if "metrics" in analyses:
+        result["metrics"] = quality_metrics(values, signal_type, sampling_rate)
+
+    return result, intermediates.report()
@@ -0,0 +1,123 @@
+import time
+from fractions import Fraction
+
+import numpy as np
+import scipy
+
+from app.timebase import detect_uniform
+
+MAX_POLYPHASE_FACTOR = 1000  # Largest up/down factor tried for resample_poly
+CUBIC_CHUNK_SAMPLES = 65_536  # Input samples fitted per piecewise cubic
+CUBIC_OVERLAP_SAMPLES = 32  # Extra samples fitted on each side of a chunk
+
+RESAMPLING_TECHNIQUES = ("spline", "1d", "cubic", "polyphase")
+
+
+def polyphase_factors(input_rate: float, target_rate: float, num_samples: int):
+    """
+    Rational `(up, down)` approximating `target_rate / input_rate` closely
+    enough that the output grid drifts by less than half a sample over
+    `num_samples`, or None when no factors up to `MAX_POLYPHASE_FACTOR` do.
+    """
+    ratio = target_rate / input_rate
+    fraction = Fraction(ratio).limit_denominator(MAX_POLYPHASE_FACTOR)
+    if fraction.numerator == 0 or fraction.numerator > MAX_POLYPHASE_FACTOR:
+        return None
+    if abs(fraction.numerator / fraction.denominator - ratio) / ratio * num_samples >= 0.5:
+        return None
+    return fraction.numerator, fraction.denominator
+
+
+def resample_linear(timestamps, values, new_time):
+    if values.ndim == 1:
+        return np.interp(new_time, timestamps, values)
+    return np.column_stack([np.interp(new_time, timestamps, channel) for channel in values.T])
+
+
+def resample_smoothing_spline(timestamps, values, new_time):
+    if values.ndim == 1:
+        return scipy.interpolate.UnivariateSpline(timestamps, values, s=1.0)(new_time)
+    return np.column_stack([
+        scipy.interpolate.UnivariateSpline(timestamps, channel, s=1.0)(new_time) for channel in values.T])
+
+
+def resample_polyphase(values, up: int, down: int, num_samples: int):
+    resampled = scipy.signal.resample_poly(values, up, down, axis=0, padtype="line")
+    return resampled[:num_samples]
+
+
+def resample_chunked_cubic(
+    timestamps,
+    values,
+    new_time,
+    chunk_samples: int = CUBIC_CHUNK_SAMPLES,
+    overlap_samples: int = CUBIC_OVERLAP_SAMPLES,
+):
+    """
+    Piecewise cubic interpolation fitted over consecutive input chunks.
+
+    Each chunk is fitted together with `overlap_samples` neighbours on both
+    sides, so memory stays bounded by the chunk size while the result stays
+    within rounding of a single cubic spline through every sample.
+    """
+    if len(timestamps) < 4:
+        return resample_linear(timestamps, values, new_time)
+
+    new_values = np.empty((len(new_time),) + values.shape[1:], dtype=np.float64)
+    boundaries = np.searchsorted(new_time, timestamps[::chunk_samples][1:])
+    starts = np.concatenate(([0], boundaries))
+    stops = np.concatenate((boundaries, [len(new_time)]))
+
+    for chunk, (start, stop) in enumerate(zip(starts, stops)):
+        if start == stop:
+            continue
+        first = max(0, chunk * chunk_samples - overlap_samples)
+        last = min(len(timestamps), (chunk + 1) * chunk_samples + overlap_samples + 1)
+        spline = scipy.interpolate.CubicSpline(
+            timestamps[first:last], values[first:last], bc_type="not-a-knot", extrapolate=True)
+        new_values[start:stop] = spline(new_time[start:stop])
+
+    return new_values
+
+
+def resample(data, interpolation_technique: str, target_sampling_rate: float, new_time):
+    """
+    Interpolate a `[timestamp, value, ...]` array onto `new_time`, the uniform
+    grid at `target_sampling_rate`. Every channel shares the timebase, so
+    multi-channel values come back as an `(len(new_time), channels)` array.
+
+    Returns the new values together with the strategy that produced them:
+    `linear` (np.interp), `smoothing_spline` (global UnivariateSpline),
+    `chunked_cubic`, or `polyphase` (resample_poly, used by the `polyphase`
+    technique when `app.timebase.detect_uniform` finds the timestamps on a
+    uniform grid and the rate ratio is a small rational number, otherwise
+    it falls back to `chunked_cubic`).
+    """
+    if interpolation_technique not in RESAMPLING_TECHNIQUES:
+        raise ValueError("Invalid interpolation technique")
+
+    timestamps = data[:, 0]
+    values = data[:, 1] if data.shape[1] == 2 else data[:, 1:]
+    if np.any(np.diff(timestamps) < 0):
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+        values = values[order]
+
+    if interpolation_technique == "spline":
+        return resample_smoothing_spline(timestamps, values, new_time), "smoothing_spline"
+    if interpolation_technique == "1d":
+        return resample_linear(timestamps, values, new_time), "linear"
+
+    timebase = detect_uniform(timestamps) if interpolation_technique == "polyphase" else None
+    if timebase is not None:
+        factors = polyphase_factors(timebase.fs, target_sampling_rate, len(new_time))
+        if factors is not None:
+            return resample_polyphase(values, *factors, len(new_time)), "polyphase"
+
+    return resample_chunked_cubic(timestamps, values, new_time), "chunked_cubic"
+
+
+def timed_resample(data, interpolation_technique: str, target_sampling_rate: float, new_time):
+    started = time.perf_counter()
+    new_values, strategy = resample(data, interpolation_technique, target_sampling_rate, new_time)
+    return new_values, strategy, (time.perf_counter() - started) * 1000
@@ -0,0 +1,386 @@
+import hashlib
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+from collections import OrderedDict
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Resource limits are only available on Unix
+    resource = None
+
+DEFAULT_FILTER_MEMORY_BYTES = 1024 * 1024 * 1024
+DEFAULT_FILTER_CPU_SECONDS = 30
+DEFAULT_FILTER_TIMEOUT_SECONDS = 60
+DEFAULT_COMPILED_FILTERS = 64  # Distinct filter bodies kept compiled in each worker
+WORKER_START_TIMEOUT_SECONDS = 120  # Time a new worker gets to import its filter globals
+
+# Names available to custom filters, matching the package list shown in the
+# filtering form.
+FILTER_GLOBALS = {
+    "np": "numpy",
+    "pd": "pandas",
+    "neurokit2": "neurokit2",
+    "scipy": "scipy",
+}
+
+
+class PythonFilterError(Exception):
+    """
+    A custom filter failed, returned an invalid result or exceeded its limits.
+    """
+
+
+class _CpuLimitExceeded(BaseException):
+    pass
+
+
+def filter_key(code: str) -> str:
+    return hashlib.sha256(code.encode()).hexdigest()
+
+
+def _attach(name: str) -> SharedMemory:
+    """
+    Open a block created by the API process. Spawned workers share the API
+    process's resource tracker, where the block is already registered, so
+    only the creator unlinks it.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    return SharedMemory(name=name)
+
+
+def _virtual_memory_bytes() -> int | None:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmSize:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class _Limits:
+    """
+    Per-call CPU time and address space limits, relative to what the worker
+    already uses, lifted again once the call returns.
+    """
+
+    def __init__(self, cpu_seconds: float, memory_bytes: int):
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+
+    def __enter__(self):
+        if resource is None:
+            return self
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        _, cpu_hard = resource.getrlimit(resource.RLIMIT_CPU)
+        resource.setrlimit(resource.RLIMIT_CPU, (int(usage.ru_utime + usage.ru_stime + self.cpu_seconds) + 1, cpu_hard))
+        in_use = _virtual_memory_bytes()
+        if in_use is not None and self.memory_bytes:
+            _, memory_hard = resource.getrlimit(resource.RLIMIT_AS)
+            resource.setrlimit(resource.RLIMIT_AS, (in_use + self.memory_bytes, memory_hard))
+        return self
+
+    def __exit__(self, *exc_info):
+        if resource is None:
+            return False
+        for limit in (resource.RLIMIT_CPU, resource.RLIMIT_AS):
+            _, hard = resource.getrlimit(limit)
+            resource.setrlimit(limit, (hard, hard))
+        return False
+
+
+def _raise_cpu_limit(signum, frame):
+    raise _CpuLimitExceeded()
+
+
+def _run_filter(filter_signal, values):
+    channels = values.reshape(len(values), -1)
+    results = []
+    for channel in range(channels.shape[1]):
+        result = np.asarray(filter_signal(np.array(channels[:, channel], dtype=np.float64)), dtype=np.float64)
+        if result.shape != (len(values),):
+            raise PythonFilterError(
+                f"filter_signal must return one value per sample ({len(values)}), got shape {result.shape}")
+        results.append(result)
+    return np.column_stack(results).reshape(values.shape)
+
+
+def _worker_main(connection, compiled_limit: int):
+    """
+    Loop of a filter worker: import the filter globals once, then compile
+    each distinct filter body once and run calls against shared memory.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, "SIGXCPU"):
+        signal.signal(signal.SIGXCPU, _raise_cpu_limit)
+
+    import importlib
+
+    base_namespace = {name: importlib.import_module(module) for name, module in FILTER_GLOBALS.items()}
+    for module in ("scipy.signal", "scipy.ndimage"):
+        importlib.import_module(module)
+    connection.send(("ready", None))
+
+    compiled = OrderedDict()
+
+    while True:
+        try:
+            key, code, input_name, output_name, shape, cpu_seconds, memory_bytes = connection.recv()
+        except (EOFError, OSError):
+            return
+
+        input_block = output_block = None
+        try:
+            input_block = _attach(input_name)
+            output_block = _attach(output_name)
+            values = np.ndarray(shape, dtype=np.float64, buffer=input_block.buf)
+            output = np.ndarray(shape, dtype=np.float64, buffer=output_block.buf)
+
+            # Module-level code of the filter runs under the same limits as
+            # the filter itself.
+            with _Limits(cpu_seconds, memory_bytes):
+                filter_signal = compiled.get(key)
+                if filter_signal is None:
+                    namespace = dict(base_namespace)
+                    exec(compile(code, "<filter_signal>", "exec"), namespace)
+                    filter_signal = namespace.get("filter_signal")
+                    if not callable(filter_signal):
+                        raise PythonFilterError("Python code must define a filter_signal(signal) function")
+                    compiled[key] = filter_signal
+                    while len(compiled) > compiled_limit:
+                        compiled.popitem(last=False)
+                else:
+                    compiled.move_to_end(key)
+
+                output[...] = _run_filter(filter_signal, values)
+            del values, output
+            reply = ("ok", None)
+        except _CpuLimitExceeded:
+            reply = ("error", f"Custom filter exceeded its CPU time limit of {cpu_seconds:g} s")
+        except MemoryError:
+            reply = ("error", f"Custom filter exceeded its memory limit of {memory_bytes // (1024 * 1024)} MB")
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}" if not isinstance(e, PythonFilterError) else str(e))
+        finally:
+            for block in (input_block, output_block):
+                if block is not None:
+                    block.close()
+
+        try:
+            connection.send(reply)
+        except (BrokenPipeError, OSError):
+            return
+
+
+class _Worker:
+    def __init__(self, context, compiled_limit: int):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_connection, compiled_limit),
+            name="signalchemist-python-filter",
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+        self.keys = OrderedDict()
+        self.compiled_limit = compiled_limit
+        self.ready = False
+
+    def wait_ready(self):
+        if self.ready:
+            return
+        if not self.connection.poll(WORKER_START_TIMEOUT_SECONDS):
+            raise PythonFilterError("Custom filter worker did not start in time")
+        self.connection.recv()
+        self.ready = True
+
+    def remember(self, key: str):
+        self.keys[key] = None
+        self.keys.move_to_end(key)
+        while len(self.keys) > self.compiled_limit:
+            self.keys.popitem(last=False)
+
+    def stop(self):
+        self.connection.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+
+
+class PythonFilterPool:
+    """
+    Run custom `filter_signal` code in isolated, pre-warmed worker processes.
+
+    Each worker compiles a distinct filter body once and keeps it by the
+    hash of its code, and calls are routed to an idle worker that already
+    holds the filter when there is one. Signals travel through shared
+    memory. Every call runs under a CPU time and an address space limit
+    inside the worker, and a wall-clock timeout after which the worker is
+    killed and replaced, so runaway code cannot take the API down.
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        memory_bytes: int = DEFAULT_FILTER_MEMORY_BYTES,
+        cpu_seconds: float = DEFAULT_FILTER_CPU_SECONDS,
+        timeout_seconds: float = DEFAULT_FILTER_TIMEOUT_SECONDS,
+        compiled_limit: int = DEFAULT_COMPILED_FILTERS,
+    ):
+        self.workers = max(1, workers)
+        self.memory_bytes = max(0, memory_bytes)
+        self.cpu_seconds = cpu_seconds
+        self.timeout_seconds = timeout_seconds
+        self.compiled_limit = max(1, compiled_limit)
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._idle = []
+        self._started = 0
+        self._available = threading.Condition(self._lock)
+        self._counters = {
+            "completed": 0,
+            "compiled_reuse": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "restarts": 0,
+        }
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            workers=int(os.getenv("PYTHON_FILTER_WORKERS") or min(4, os.cpu_count() or 1)),
+            memory_bytes=int(os.getenv("PYTHON_FILTER_MEMORY_BYTES") or DEFAULT_FILTER_MEMORY_BYTES),
+            cpu_seconds=float(os.getenv("PYTHON_FILTER_CPU_SECONDS") or DEFAULT_FILTER_CPU_SECONDS),
+            timeout_seconds=float(os.getenv("PYTHON_FILTER_TIMEOUT_SECONDS") or DEFAULT_FILTER_TIMEOUT_SECONDS),
+        )
+
+    def start(self):
+        """
+        Spawn every worker up front so the first requests skip the imports.
+        """
+        with self._lock:
+            while self._started < self.workers:
+                self._idle.append(_Worker(self._context, self.compiled_limit))
+                self._started += 1
+            starting = list(self._idle)
+        for worker in starting:
+            try:
+                worker.wait_ready()
+            except (PythonFilterError, EOFError, OSError):
+                pass
+
+    def _acquire(self, key: str) -> _Worker:
+        with self._available:
+            while True:
+                for worker in reversed(self._idle):
+                    if key in worker.keys:
+                        self._idle.remove(worker)
+                        return worker
+                if self._idle:
+                    return self._idle.pop()
+                if self._started < self.workers:
+                    self._started += 1
+                    break
+                self._available.wait()
+
+        try:
+            return _Worker(self._context, self.compiled_limit)
+        except Exception:
+            with self._available:
+                self._started -= 1
+                self._available.notify()
+            raise
+
+    def _release(self, worker: _Worker | None):
+        if worker is None:
+            # Replace a killed worker right away so the pool stays warm.
+            try:
+                worker = _Worker(self._context, self.compiled_limit)
+            except Exception:
+                with self._available:
+                    self._started -= 1
+                    self._available.notify()
+                return
+
+        with self._available:
+            self._idle.append(worker)
+            self._available.notify()
+
+    def run(self, code: str, values):
+        """
+        Apply `filter_signal` from `code` to every channel of `values`.
+        """
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        key = filter_key(code)
+        worker = self._acquire(key)
+        input_block = SharedMemory(create=True, size=max(1, values.nbytes))
+        output_block = SharedMemory(create=True, size=max(1, values.nbytes))
+        try:
+            np.ndarray(values.shape, dtype=np.float64, buffer=input_block.buf)[...] = values
+            reused = key in worker.keys
+            try:
+                worker.wait_ready()
+                worker.connection.send((
+                    key, code, input_block.name, output_block.name, values.shape,
+                    self.cpu_seconds, self.memory_bytes,
+                ))
+                if not worker.connection.poll(self.timeout_seconds):
+                    worker.stop()
+                    worker = None
+                    self._count("timeouts", "restarts")
+                    raise PythonFilterError(f"Custom filter timed out after {self.timeout_seconds:g} s")
+                status, message = worker.connection.recv()
+            except (EOFError, OSError):
+                worker.stop()
+                worker = None
+                self._count("errors", "restarts")
+                raise PythonFilterError("Custom filter worker crashed") from None
+
+            if status != "ok":
+                self._count("errors")
+                raise PythonFilterError(message)
+
+            worker.remember(key)
+            self._count("completed", *(("compiled_reuse",) if reused else ()))
+            return np.array(np.ndarray(values.shape, dtype=np.float64, buffer=output_block.buf))
+        finally:
+            for block in (input_block, output_block):
+                block.close()
+                block.unlink()
+            self._release(worker)
+
+    def _count(self, *names):
+        with self._lock:
+            for name in names:
+                self._counters[name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "started": self._started,
+                "idle": len(self._idle),
+                "memory_bytes": self.memory_bytes,
+                "cpu_seconds": self.cpu_seconds,
+                "timeout_seconds": self.timeout_seconds,
+                **self._counters,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._started -= len(idle)
+        for worker in idle:
+            worker.stop()
+
+
+python_filter_pool = PythonFilterPool.from_env()
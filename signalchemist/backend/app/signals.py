@@ -0,0 +1,178 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+from fastapi import UploadFile
+
+from app.telemetry import record_samples, request_phase
+from app.timebase import detect_uniform
+from app.transport import TransportError, decode_signal
+
+DEFAULT_SIGNAL_STORE_BYTES = 1024 * 1024 * 1024
+DEFAULT_SIGNAL_TTL_SECONDS = 30 * 60
+DEFAULT_SIGNAL_SPILL_BYTES = 16 * 1024 * 1024
+
+
+class SignalStore:
+    """
+    Server-side storage for uploaded and computed signals, addressed by id.
+
+    Small arrays stay in memory, uniformly sampled ones as their values plus
+    `t0` and `fs` with the timestamps rebuilt on access; arrays of at least
+    `spill_bytes` are written to a `.npy` file and memory-mapped read-only,
+    so reads do not copy them. Entries expire after
+    `ttl_seconds` without access, and the least recently used ones are evicted
+    once the stored bytes exceed `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_SIGNAL_STORE_BYTES,
+        ttl_seconds: float = DEFAULT_SIGNAL_TTL_SECONDS,
+        spill_bytes: int = DEFAULT_SIGNAL_SPILL_BYTES,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.spill_bytes = spill_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._directory = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_bytes=int(os.getenv("SIGNAL_STORE_MAX_BYTES") or DEFAULT_SIGNAL_STORE_BYTES),
+            ttl_seconds=float(os.getenv("SIGNAL_STORE_TTL_SECONDS") or DEFAULT_SIGNAL_TTL_SECONDS),
+            spill_bytes=int(os.getenv("SIGNAL_STORE_SPILL_BYTES") or DEFAULT_SIGNAL_SPILL_BYTES),
+        )
+
+    def _spill_path(self, signal_id: str) -> str:
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="signalchemist-signals-")
+        return os.path.join(self._directory, f"{signal_id}.npy")
+
+    def _remove(self, signal_id: str):
+        entry = self._entries.pop(signal_id)
+        self._bytes -= entry["nbytes"]
+        if entry["path"] is not None:
+            entry["data"] = None
+            try:
+                os.remove(entry["path"])
+            except OSError:
+                pass
+
+    def _purge_expired(self, now: float):
+        for signal_id, entry in list(self._entries.items()):
+            if now - entry["accessed_at"] > self.ttl_seconds:
+                self._remove(signal_id)
+
+    def put(self, data) -> str:
+        data = np.asarray(data, dtype=np.float64)
+        if data.nbytes > self.max_bytes:
+            raise TransportError("Signal too large to store", status_code=413)
+
+        signal_id = uuid.uuid4().hex
+        path = None
+        timebase = None
+        if data.nbytes >= self.spill_bytes:
+            path = self._spill_path(signal_id)
+            np.save(path, data, allow_pickle=False)
+            data = np.load(path, mmap_mode="r")
+        else:
+            timebase = detect_uniform(data[:, 0])
+            if timebase is not None:
+                data = np.ascontiguousarray(data[:, 1:])
+            data.setflags(write=False)
+
+        now = time.time()
+        with self._lock:
+            self._purge_expired(now)
+            self._entries[signal_id] = {
+                "data": data,
+                "nbytes": data.nbytes,
+                "path": path,
+                "timebase": timebase,
+                "accessed_at": now,
+            }
+            self._bytes += data.nbytes
+
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+
+        return signal_id
+
+    def get(self, signal_id: str):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(signal_id)
+            if entry is None:
+                return None
+            if now - entry["accessed_at"] > self.ttl_seconds:
+                self._remove(signal_id)
+                return None
+
+            entry["accessed_at"] = now
+            self._entries.move_to_end(signal_id)
+            data, timebase = entry["data"], entry["timebase"]
+
+        if timebase is None:
+            return data
+        data = timebase.with_timestamps(data)
+        data.setflags(write=False)
+        return data
+
+    def delete(self, signal_id: str) -> bool:
+        with self._lock:
+            if signal_id not in self._entries:
+                return False
+            self._remove(signal_id)
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._purge_expired(time.time())
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "spilled_entries": sum(1 for entry in self._entries.values() if entry["path"]),
+                "uniform_entries": sum(1 for entry in self._entries.values() if entry["timebase"]),
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "spill_bytes": self.spill_bytes,
+            }
+
+    def close(self):
+        with self._lock:
+            for signal_id in list(self._entries):
+                self._remove(signal_id)
+            if self._directory is not None:
+                shutil.rmtree(self._directory, ignore_errors=True)
+                self._directory = None
+
+
+signal_store = SignalStore.from_env()
+
+
+async def resolve_signal(signal: str | UploadFile | None, signal_id: str | None):
+    """
+    Return the request signal, either decoded from `signal` or loaded from the
+    store by `signal_id`.
+    """
+    with request_phase("decode"):
+        if signal_id:
+            data = signal_store.get(signal_id)
+            if data is None:
+                raise TransportError("Signal not found or expired", status_code=404)
+        elif signal is None:
+            raise TransportError("Either signal or signal_id is required")
+        else:
+            data = await decode_signal(signal)
+
+    record_samples(len(data))
+    return data
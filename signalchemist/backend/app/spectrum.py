@@ -0,0 +1,129 @@
+import numpy as np
+import scipy
+
+SPECTRUM_METHODS = ("welch", "stft")
+DEFAULT_SEGMENT_SECONDS = 8.0
+DEFAULT_SPECTRUM_BINS = 1024
+MAX_SPECTRUM_BINS = 16384
+DEFAULT_SPECTROGRAM_FRAMES = 256
+MAX_SPECTROGRAM_FRAMES = 2048
+MIN_SEGMENT_SAMPLES = 8
+SEGMENTS_PER_BLOCK = 4096  # Segments transformed at once, bounding temporary memory
+
+
+def segment_samples(length: int, sampling_rate: float, segment_seconds: float, max_bins: int) -> int:
+    """
+    Welch segment length: `segment_seconds` of signal, shortened so the
+    one-sided spectrum has at most `max_bins` frequency bins.
+    """
+    samples = int(round(segment_seconds * sampling_rate))
+    samples = min(samples, 2 * (max_bins - 1), length)
+    return max(min(MIN_SEGMENT_SAMPLES, length), samples)
+
+
+def _float32_list(values) -> list:
+    """
+    Values rounded to float32 precision (7 significant digits), so the JSON
+    output is about as compact as float32 data.
+    """
+    values = np.asarray(values, dtype=np.float32).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        exponent = np.floor(np.log10(np.abs(values)))
+        scale = 10.0 ** (6 - np.where(np.isfinite(exponent), exponent, 0))
+        return (np.round(values * scale) / scale).tolist()
+
+
+def segment_power(values, sampling_rate: float, nperseg: int, frames: int | None = None):
+    """
+    Welch power spectral density of one channel from Hann-windowed,
+    mean-detrended segments overlapping by half, matching
+    `scipy.signal.welch` defaults.
+
+    Segments are transformed a block at a time straight from a strided view
+    of the signal, which avoids SciPy's full copy of every segment. With
+    `frames`, consecutive segments are also averaged into at most that many
+    spectrogram frames. Returns the frequencies, the PSD and, with
+    `frames`, the frame centres in seconds and the frame PSDs.
+    """
+    hop = nperseg - nperseg // 2
+    window = scipy.signal.get_window("hann", nperseg).astype(values.dtype)
+    scale = 1.0 / (sampling_rate * np.sum(window.astype(np.float64) ** 2))
+    segments = np.lib.stride_tricks.sliding_window_view(values, nperseg)[::hop]
+    count = len(segments)
+    bins = nperseg // 2 + 1
+
+    total = np.zeros(bins)
+    if frames is not None:
+        frames = min(frames, count)
+        frame_of_segment = np.arange(count) * frames // count
+        spectrogram = np.zeros((frames, bins))
+
+    for first in range(0, count, SEGMENTS_PER_BLOCK):
+        block = segments[first:first + SEGMENTS_PER_BLOCK]
+        block = (block - block.mean(axis=1, keepdims=True)) * window
+        spectra = scipy.fft.rfft(block, axis=1)
+        power = spectra.real.astype(np.float64) ** 2 + spectra.imag.astype(np.float64) ** 2
+        total += power.sum(axis=0)
+        if frames is not None:
+            groups = frame_of_segment[first:first + len(block)]
+            starts = np.flatnonzero(np.diff(groups, prepend=-1))
+            spectrogram[groups[starts]] += np.add.reduceat(power, starts, axis=0)
+
+    one_sided = np.full(bins, 2.0 * scale)
+    one_sided[0] = scale
+    if nperseg % 2 == 0:
+        one_sided[-1] = scale
+    frequencies = np.fft.rfftfreq(nperseg, 1.0 / sampling_rate)
+    psd = total / count * one_sided
+    if frames is None:
+        return frequencies, psd
+
+    segment_counts = np.bincount(frame_of_segment, minlength=frames)
+    centres = np.bincount(frame_of_segment, weights=np.arange(count) * hop + nperseg / 2, minlength=frames)
+    times = centres / segment_counts / sampling_rate
+    return frequencies, psd, times, spectrogram / segment_counts[:, None] * one_sided
+
+
+def compute_spectrum(
+    values,
+    sampling_rate: float,
+    method: str = "welch",
+    segment_seconds: float = DEFAULT_SEGMENT_SECONDS,
+    max_bins: int = DEFAULT_SPECTRUM_BINS,
+    max_frames: int = DEFAULT_SPECTROGRAM_FRAMES,
+) -> dict:
+    """
+    Power spectral density of a signal by Welch's method, or a spectrogram.
+
+    Values are processed in float32. `psd` holds one value per frequency for
+    a single channel, or one row of channel values per frequency. The
+    `stft` spectrogram has one row of bin powers per time frame; when the
+    recording has more than `max_frames` segments, consecutive segments are
+    averaged into `max_frames` frames, so the output stays bounded.
+    """
+    if method not in SPECTRUM_METHODS:
+        raise ValueError("Invalid spectrum method")
+
+    values = np.asarray(values, dtype=np.float32)
+    nperseg = segment_samples(len(values), sampling_rate, segment_seconds, max_bins)
+    result = {
+        "method": method,
+        "sampling_rate": sampling_rate,
+        "segment_samples": nperseg,
+        "resolution_hz": sampling_rate / nperseg,
+    }
+
+    if values.ndim == 2:
+        channels = [segment_power(values[:, channel], sampling_rate, nperseg) for channel in range(values.shape[1])]
+        frequencies = channels[0][0]
+        psd = np.column_stack([channel_psd for _, channel_psd in channels])
+    elif method == "stft":
+        frequencies, psd, times, spectrogram = segment_power(values, sampling_rate, nperseg, max_frames)
+        result["times"] = _float32_list(times)
+        result["spectrogram"] = _float32_list(spectrogram)
+    else:
+        frequencies, psd = segment_power(values, sampling_rate, nperseg)
+
+    result["frequencies"] = _float32_list(frequencies)
+    result["psd"] = _float32_list(psd)
+    return result
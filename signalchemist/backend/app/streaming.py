@@ -0,0 +1,179 @@
+import os
+
+import numpy as np
+import scipy
+
+from app.filters import filter_design_cache, normalize_sos_config
+from app.hr import DigitalFilter
+
+MAX_STREAM_BATCH_SAMPLES = 65_536
+DEFAULT_MAX_STREAMS = 512
+DEFAULT_BEAT_DISTANCE_SECONDS = 0.3  # Minimum beat spacing for heart rate, about 200 bpm
+
+MAX_STREAMS = int(os.getenv("STREAM_MAX_CONNECTIONS") or DEFAULT_MAX_STREAMS)
+
+
+class StreamError(Exception):
+    """
+    Invalid stream configuration or sample batch.
+    """
+
+
+class StreamProcessor:
+    """
+    Incremental filtering, peak detection and heart rate for one live stream.
+
+    Built-in filters run causally with `sosfilt`, carrying the `zi` state
+    from batch to batch. Peaks are searched with `scipy.signal.find_peaks`
+    over a lookback buffer and reported once every sample within the minimum
+    peak distance after them has arrived. The minimum distance is also kept
+    from the last reported peak, so reported peaks always respect it, but
+    since `find_peaks` resolves conflicting peaks over the whole signal the
+    stream can pick different peaks than a whole-signal search. The buffer
+    is trimmed to one minimum distance of context, so every batch costs
+    O(batch size) however long the stream has been running. Heart rate
+    follows the EmotiBit method, feeding each confirmed beat's instantaneous
+    rate into a running `DigitalFilter`; it requires a minimum peak distance
+    and uses `DEFAULT_BEAT_DISTANCE_SECONDS` when none is configured.
+    """
+
+    def __init__(
+        self,
+        sampling_rate: float,
+        filter_config: dict | None = None,
+        peaks: dict | None = None,
+        heart_rate: bool = False,
+    ):
+        sampling_rate = float(sampling_rate)
+        if not np.isfinite(sampling_rate) or sampling_rate <= 0:
+            raise StreamError("Streaming requires a valid sampling rate greater than 0.")
+        self.sampling_rate = sampling_rate
+
+        self._sos = None
+        self._zi = None
+        if filter_config:
+            key = normalize_sos_config(filter_config, sampling_rate)
+            if key is None:
+                raise StreamError(
+                    "Streaming supports butterworth, bessel and chebyshevii filters with a lowcut or highcut.")
+            try:
+                self._sos = filter_design_cache.get(key)
+            except ValueError as e:
+                raise StreamError(str(e)) from e
+
+        if heart_rate and peaks is None:
+            peaks = {}
+        self._detect_peaks = peaks is not None
+        peaks = peaks or {}
+        self._height = peaks.get("height")
+        min_distance_seconds = max(float(peaks.get("min_distance_seconds") or 0), 0)
+        if heart_rate and not min_distance_seconds:
+            # Without a refractory period every local maximum would count as a beat.
+            min_distance_seconds = DEFAULT_BEAT_DISTANCE_SECONDS
+        self._distance = max(1, int(round(min_distance_seconds * sampling_rate)))
+        self._last_peak = -1
+        self._buffer_timestamps = np.empty(0, dtype=np.float64)
+        self._buffer_values = np.empty(0, dtype=np.float64)
+        self._buffer_start = 0
+        self._confirmed_until = 0
+
+        self._heart_rate_filter = DigitalFilter("IIR_LOWPASS", sampling_rate, 1) if heart_rate else None
+        self._last_beat = -1
+        self.sample_count = 0
+
+    @classmethod
+    def from_config(cls, config: dict):
+        if not isinstance(config, dict) or "sampling_rate" not in config:
+            raise StreamError("The first message must be a config with a sampling_rate.")
+        return cls(
+            sampling_rate=config["sampling_rate"],
+            filter_config=config.get("filter"),
+            peaks=config.get("peaks"),
+            heart_rate=bool(config.get("heart_rate", False)),
+        )
+
+    def _filter(self, values):
+        if self._sos is None:
+            return values
+        if self._zi is None:
+            self._zi = scipy.signal.sosfilt_zi(self._sos) * values[0]
+        filtered, self._zi = scipy.signal.sosfilt(self._sos, values, zi=self._zi)
+        return filtered
+
+    def _confirm_peaks(self, timestamps, values):
+        self._buffer_timestamps = np.concatenate((self._buffer_timestamps, timestamps))
+        self._buffer_values = np.concatenate((self._buffer_values, values))
+
+        # A candidate before `ready` has every sample within the minimum
+        # distance after it, so no taller neighbour can still arrive.
+        ready = self._buffer_start + len(self._buffer_values) - self._distance
+        if ready <= self._confirmed_until:
+            return np.empty(0, dtype=int), []
+
+        found, _ = scipy.signal.find_peaks(
+            self._buffer_values, distance=self._distance, height=self._height)
+        found += self._buffer_start
+        confirmed = []
+        for index in found[(found >= self._confirmed_until) & (found < ready)]:
+            # Peaks confirmed in earlier batches may have left the buffer,
+            # so the distance to the last one is enforced here.
+            if self._last_peak < 0 or index - self._last_peak >= self._distance:
+                confirmed.append(index)
+                self._last_peak = int(index)
+        confirmed = np.asarray(confirmed, dtype=int)
+        self._confirmed_until = ready
+
+        # Keep the minimum distance of context before the unconfirmed
+        # samples so taller earlier neighbours still suppress smaller peaks.
+        keep_from = max(self._buffer_start, self._confirmed_until - self._distance)
+        peak_payload = [
+            {
+                "index": int(index),
+                "timestamp": float(self._buffer_timestamps[index - self._buffer_start]),
+                "value": float(self._buffer_values[index - self._buffer_start]),
+            }
+            for index in confirmed
+        ]
+        self._buffer_timestamps = self._buffer_timestamps[keep_from - self._buffer_start:]
+        self._buffer_values = self._buffer_values[keep_from - self._buffer_start:]
+        self._buffer_start = keep_from
+        return confirmed, peak_payload
+
+    def _heart_rates(self, beats, peak_payload):
+        time_period_ms = (1.0 / self.sampling_rate) * 1000.0
+        updates = []
+        for beat, peak in zip(beats, peak_payload):
+            inter_beat_interval = (beat - self._last_beat) * time_period_ms
+            heart_rate = self._heart_rate_filter.filter((60.0 / inter_beat_interval) * 1000.0)
+            updates.append([peak["timestamp"], heart_rate])
+            self._last_beat = int(beat)
+        return updates
+
+    def process(self, data) -> dict:
+        """
+        Consume a `[timestamp, value]` batch and return the filtered samples,
+        newly confirmed peaks and heart rate updates.
+        """
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim != 2 or data.shape[1] != 2:
+            raise StreamError("Sample batches must be [timestamp, value] pairs.")
+        if len(data) > MAX_STREAM_BATCH_SAMPLES:
+            raise StreamError(f"Sample batches are limited to {MAX_STREAM_BATCH_SAMPLES} samples.")
+
+        update = {"type": "update", "filtered": [], "samples": self.sample_count}
+        if len(data) == 0:
+            return update
+
+        timestamps = data[:, 0]
+        filtered = self._filter(data[:, 1])
+        self.sample_count += len(data)
+        update["samples"] = self.sample_count
+        update["filtered"] = np.stack((timestamps, filtered), axis=1).tolist()
+
+        if self._detect_peaks:
+            beats, peak_payload = self._confirm_peaks(timestamps, filtered)
+            update["peaks"] = peak_payload
+            if self._heart_rate_filter is not None:
+                update["heart_rate"] = self._heart_rates(beats, peak_payload)
+
+        return update
@@ -0,0 +1,289 @@
+import bisect
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SAMPLE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+PHASES = ("decode", "validate", "compute", "encode")
+MAX_ALGORITHMS_PER_ENDPOINT = 32  # Distinct algorithm labels kept per endpoint before folding into "other"
+OTHER_ALGORITHM = "other"
+UNMATCHED_ENDPOINT = "unmatched"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def server_timing_enabled() -> bool:
+    return os.getenv("SERVER_TIMING") == "true"
+
+
+class Histogram:
+    """
+    Cumulative Prometheus histogram over fixed upper bounds.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def lines(self, name: str, labels: str):
+        separator = "," if labels else ""
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels}{separator}le="{bound:g}"}} {cumulative}'
+        cumulative += self.counts[-1]
+        yield f'{name}_bucket{{{labels}{separator}le="+Inf"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.total:.9g}"
+        yield f"{name}_count{{{labels}}} {cumulative}"
+
+
+class RequestTiming:
+    """
+    Phase durations, algorithm labels and sample count of one HTTP request.
+
+    Phases are timed where the work happens: `decode` around signal
+    decoding, `compute` around the executor and result cache, `encode`
+    around response encoding. `validate` is the time between the end of
+    `decode` and the start of `compute`, where the handlers check their
+    parameters.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.labels = {}
+        self.samples = None
+        self._active = None
+        self._decoded_at = None
+
+    @contextmanager
+    def phase(self, name: str):
+        if self._active is not None:
+            yield
+            return
+
+        started = time.perf_counter()
+        if name == "compute" and self._decoded_at is not None and "validate" not in self.phases:
+            self.phases["validate"] = started - self._decoded_at
+        self._active = name
+        try:
+            yield
+        finally:
+            self._active = None
+            finished = time.perf_counter()
+            self.phases[name] = self.phases.get(name, 0.0) + finished - started
+            if name == "decode":
+                self._decoded_at = finished
+
+    @property
+    def algorithm(self) -> str:
+        return ",".join(f"{key}={value}" for key, value in sorted(self.labels.items()))
+
+    def server_timing(self) -> str:
+        entries = [
+            f"{name};dur={self.phases[name] * 1000:.3f}"
+            for name in PHASES
+            if name in self.phases
+        ]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.3f}")
+        return ", ".join(entries)
+
+
+_current_timing = contextvars.ContextVar("request_timing", default=None)
+
+
+@contextmanager
+def request_phase(name: str):
+    """
+    Time a block as phase `name` of the current request, if it is instrumented.
+    """
+    timing = _current_timing.get()
+    if timing is None:
+        yield
+        return
+    with timing.phase(name):
+        yield
+
+
+def label_request(**labels):
+    """
+    Attach algorithm labels, such as `detector="neurokit"`, to the current request.
+    """
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.labels.update({key: str(value) for key, value in labels.items() if value is not None})
+
+
+def record_samples(count: int):
+    timing = _current_timing.get()
+    if timing is not None:
+        timing.samples = int(count)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+
+
+class RequestMetrics:
+    """
+    Process-wide request latency, phase, size and in-flight statistics,
+    rendered in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self._requests = {}
+        self._durations = {}
+        self._phases = {}
+        self._samples = {}
+        self._request_bytes = {}
+        self._response_bytes = {}
+        self._algorithms = {}
+
+    def _algorithm(self, endpoint: str, algorithm: str) -> str:
+        known = self._algorithms.setdefault(endpoint, set())
+        if algorithm in known:
+            return algorithm
+        if len(known) >= MAX_ALGORITHMS_PER_ENDPOINT:
+            return OTHER_ALGORITHM
+        known.add(algorithm)
+        return algorithm
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(
+        self,
+        endpoint: str,
+        status: int,
+        timing: RequestTiming,
+        request_bytes: int,
+        response_bytes: int,
+    ):
+        duration = time.perf_counter() - timing.started
+        with self._lock:
+            self.in_flight -= 1
+            algorithm = self._algorithm(endpoint, timing.algorithm)
+            key = (endpoint, algorithm)
+
+            request_key = key + (str(status),)
+            self._requests[request_key] = self._requests.get(request_key, 0) + 1
+            self._durations.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(duration)
+            for phase, seconds in timing.phases.items():
+                self._phases.setdefault(key + (phase,), Histogram(LATENCY_BUCKETS)).observe(seconds)
+            if timing.samples is not None:
+                self._samples.setdefault(key, Histogram(SAMPLE_BUCKETS)).observe(timing.samples)
+            self._request_bytes[endpoint] = self._request_bytes.get(endpoint, 0) + request_bytes
+            self._response_bytes[endpoint] = self._response_bytes.get(endpoint, 0) + response_bytes
+
+    def render(self) -> str:
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            header("signalchemist_requests_in_flight", "gauge", "HTTP requests currently being handled.")
+            lines.append(f"signalchemist_requests_in_flight {self.in_flight}")
+
+            header("signalchemist_requests_total", "counter", "HTTP requests by endpoint, algorithm and status.")
+            for (endpoint, algorithm, status), count in sorted(self._requests.items()):
+                lines.append(
+                    f"signalchemist_requests_total{{{_labels(endpoint=endpoint, algorithm=algorithm, status=status)}}} {count}")
+
+            header("signalchemist_request_duration_seconds", "histogram", "End-to-end request latency.")
+            for (endpoint, algorithm), histogram in sorted(self._durations.items()):
+                lines.extend(histogram.lines(
+                    "signalchemist_request_duration_seconds", _labels(endpoint=endpoint, algorithm=algorithm)))
+
+            header("signalchemist_request_phase_seconds", "histogram",
+                   "Time spent decoding, validating, computing and encoding.")
+            for (endpoint, algorithm, phase), histogram in sorted(self._phases.items()):
+                lines.extend(histogram.lines(
+                    "signalchemist_request_phase_seconds",
+                    _labels(endpoint=endpoint, algorithm=algorithm, phase=phase)))
+
+            header("signalchemist_request_samples", "histogram", "Samples in the decoded request signal.")
+            for (endpoint, algorithm), histogram in sorted(self._samples.items()):
+                lines.extend(histogram.lines(
+                    "signalchemist_request_samples", _labels(endpoint=endpoint, algorithm=algorithm)))
+
+            header("signalchemist_request_bytes_total", "counter", "Request body bytes received.")
+            for endpoint, count in sorted(self._request_bytes.items()):
+                lines.append(f"signalchemist_request_bytes_total{{{_labels(endpoint=endpoint)}}} {count}")
+
+            header("signalchemist_response_bytes_total", "counter", "Response body bytes sent.")
+            for endpoint, count in sorted(self._response_bytes.items()):
+                lines.append(f"signalchemist_response_bytes_total{{{_labels(endpoint=endpoint)}}} {count}")
+
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
+
+
+class TelemetryMiddleware:
+    """
+    ASGI middleware timing every HTTP request into `request_metrics`.
+
+    Endpoints are reported by their route template, so `/signals/{signal_id}`
+    stays one series. With `SERVER_TIMING=true` the phase breakdown is also
+    sent in a `Server-Timing` response header.
+    """
+
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current_timing.set(timing)
+        add_header = server_timing_enabled()
+        sizes = {"request": 0, "response": 0}
+        status = 500
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                sizes["request"] += len(message.get("body", b""))
+            return message
+
+        async def timed_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if add_header:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", timing.server_timing().encode("latin-1")))
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                sizes["response"] += len(message.get("body", b""))
+            await send(message)
+
+        self.metrics.started()
+        try:
+            await self.app(scope, counting_receive, timed_send)
+        finally:
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or UNMATCHED_ENDPOINT
+            self.metrics.finished(endpoint, status, timing, sizes["request"], sizes["response"])
+            _current_timing.reset(token)
@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.chunked import CHUNK_SAMPLES
+
+# Largest deviation from a uniform grid, as a fraction of the sample
+# interval, for timestamps to be represented by a start time and rate.
+# Covers timestamps printed with a few decimals, not real clock jitter.
+UNIFORM_TOLERANCE = 1e-4
+
+
+@dataclass(frozen=True)
+class UniformTimebase:
+    """
+    Timestamps `t0 + i / fs` of a uniformly sampled signal.
+    """
+
+    t0: float
+    fs: float
+
+    def timestamps(self, length: int) -> np.ndarray:
+        return self.t0 + np.arange(length, dtype=np.float64) / self.fs
+
+    def with_timestamps(self, values) -> np.ndarray:
+        """
+        Materialize a `[timestamp, value, ...]` array from values with one
+        column per channel, or a single channel.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        data = np.empty((len(values), 1 + (values.shape[1] if values.ndim == 2 else 1)), dtype=np.float64)
+        data[:, 0] = self.timestamps(len(values))
+        data[:, 1:] = values.reshape(len(values), -1)
+        return data
+
+
+def detect_uniform(timestamps, tolerance: float = UNIFORM_TOLERANCE) -> UniformTimebase | None:
+    """
+    The uniform timebase matching `timestamps` within `tolerance` of a
+    sample interval, or `None` when they are irregular. Checked block by
+    block, so no temporary spans the whole signal.
+    """
+    length = len(timestamps)
+    if length < 2:
+        return None
+
+    t0 = float(timestamps[0])
+    duration = float(timestamps[-1]) - t0
+    if not np.isfinite(duration) or duration <= 0:
+        return None
+    fs = (length - 1) / duration
+    limit = tolerance / fs
+
+    for start in range(0, length, CHUNK_SAMPLES):
+        block = np.asarray(timestamps[start:start + CHUNK_SAMPLES], dtype=np.float64)
+        expected = t0 + np.arange(start, start + len(block), dtype=np.float64) / fs
+        if not np.all(np.abs(block - expected) <= limit):
+            return None
+
+    return UniformTimebase(t0, fs)
@@ -0,0 +1,320 @@
+import io
+import json
+
+import numpy as np
+from fastapi import Request, UploadFile
+from fastapi.responses import JSONResponse, Response
+
+from app.telemetry import request_phase
+from app.timebase import UniformTimebase, detect_uniform
+
+JSON_MEDIA_TYPE = "application/json"
+RAW_MEDIA_TYPE = "application/octet-stream"
+NPY_MEDIA_TYPE = "application/x-npy"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+UNIFORM_TIMEBASE_PARAM = "timebase=uniform"
+
+BINARY_MEDIA_TYPES = (RAW_MEDIA_TYPE, NPY_MEDIA_TYPE, ARROW_MEDIA_TYPE)
+SIGNAL_DTYPE = np.dtype("<f8")
+
+_EXTENSION_MEDIA_TYPES = {
+    ".bin": RAW_MEDIA_TYPE,
+    ".f64": RAW_MEDIA_TYPE,
+    ".npy": NPY_MEDIA_TYPE,
+    ".arrow": ARROW_MEDIA_TYPE,
+    ".arrows": ARROW_MEDIA_TYPE,
+}
+
+
+class TransportError(Exception):
+    """
+    Error raised when a signal body cannot be decoded or encoded.
+    """
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _media_type_of(upload: UploadFile) -> str:
+    content_type = (upload.content_type or "").split(";")[0].strip().lower()
+    if content_type in BINARY_MEDIA_TYPES or content_type == JSON_MEDIA_TYPE:
+        return content_type
+
+    filename = (upload.filename or "").lower()
+    for extension, media_type in _EXTENSION_MEDIA_TYPES.items():
+        if filename.endswith(extension):
+            return media_type
+
+    return RAW_MEDIA_TYPE
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError as e:
+        raise TransportError("Arrow transport requires pyarrow to be installed", status_code=415) from e
+    return pyarrow
+
+
+def decode_raw(buffer: bytes) -> np.ndarray:
+    """
+    Decode packed little-endian float64 `[timestamp, value]` rows without copying.
+    """
+    if len(buffer) % (2 * SIGNAL_DTYPE.itemsize):
+        raise TransportError("Binary signal length must be a multiple of 16 bytes")
+    return np.frombuffer(buffer, dtype=SIGNAL_DTYPE).reshape(-1, 2)
+
+
+def decode_npy(buffer: bytes) -> np.ndarray:
+    """
+    Decode an `.npy` body by reading its header and viewing the payload in place.
+    """
+    stream = io.BytesIO(buffer)
+    try:
+        version = np.lib.format.read_magic(stream)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+    except ValueError as e:
+        raise TransportError(f"Invalid NPY signal: {e}") from e
+
+    if dtype.hasobject:
+        raise TransportError("Object arrays are not supported")
+
+    data = np.frombuffer(buffer, dtype=dtype, offset=stream.tell(), count=int(np.prod(shape)))
+    data = data.reshape(shape, order="F" if fortran_order else "C")
+    if data.ndim != 2 or data.shape[1] < 2:
+        raise TransportError("NPY signal must have shape (n, 2) or (n, 1 + channels)")
+    return data if data.dtype == SIGNAL_DTYPE else data.astype(SIGNAL_DTYPE)
+
+
+def decode_arrow(buffer: bytes) -> np.ndarray:
+    """
+    Decode an Arrow IPC stream whose first column is the timestamp and every
+    following column a channel.
+    """
+    pyarrow = _import_pyarrow()
+    table = pyarrow.ipc.open_stream(pyarrow.py_buffer(buffer)).read_all()
+    if table.num_columns < 2:
+        raise TransportError("Arrow signal must have timestamp and value columns")
+
+    return np.column_stack([
+        table.column(index).to_numpy().astype(SIGNAL_DTYPE, copy=False)
+        for index in range(table.num_columns)
+    ])
+
+
+def decode_uniform_json(payload: dict) -> np.ndarray:
+    try:
+        timebase = UniformTimebase(float(payload.get("t0", 0.0)), float(payload["fs"]))
+        values = np.asarray(payload["values"], dtype=np.float64)
+    except KeyError as e:
+        raise TransportError("Uniform signals need fs and values") from e
+    except (TypeError, ValueError) as e:
+        raise TransportError(f"Invalid uniform signal: {e}") from e
+    if not np.isfinite(timebase.t0) or not np.isfinite(timebase.fs) or timebase.fs <= 0:
+        raise TransportError("Uniform signals need a finite t0 and an fs greater than 0")
+    if values.ndim not in (1, 2):
+        raise TransportError("Uniform signal values must be a list, or one list per channel")
+    return timebase.with_timestamps(values.T)
+
+
+def decode_json(payload) -> np.ndarray:
+    """
+    Decode the JSON forms of a signal: a list of `[timestamp, value, ...]`
+    rows, `{"timestamps": [...], "values": [[...], ...]}` with one list of
+    values per channel sharing the timestamps, or the uniform form
+    `{"t0": ..., "fs": ..., "values": [...]}` whose timestamps are
+    `t0 + i / fs` (`values` may also hold one list per channel).
+    """
+    if isinstance(payload, dict) and "fs" in payload:
+        return decode_uniform_json(payload)
+    if isinstance(payload, dict):
+        try:
+            timestamps = np.asarray(payload["timestamps"], dtype=np.float64)
+            values = np.asarray(payload["values"], dtype=np.float64)
+        except KeyError as e:
+            raise TransportError("Multi-channel signals need timestamps and values") from e
+        except (TypeError, ValueError) as e:
+            raise TransportError(f"Invalid multi-channel signal: {e}") from e
+        if values.ndim == 1:
+            values = values[np.newaxis]
+        if timestamps.ndim != 1 or values.ndim != 2 or values.shape[1] != len(timestamps):
+            raise TransportError("Each channel in values must have one value per timestamp")
+        return np.column_stack((timestamps, values.T))
+
+    try:
+        data = np.array(payload, dtype=np.float64)
+    except (TypeError, ValueError) as e:
+        raise TransportError("Signal must be a list of [timestamp, value, ...] rows") from e
+    if data.ndim != 2 or data.shape[1] < 2:
+        raise TransportError("Signal must be a list of [timestamp, value, ...] rows")
+    return data
+
+
+async def decode_signal(signal: str | UploadFile) -> np.ndarray:
+    """
+    Turn the `signal` form field into an `(n, 1 + channels)` float64 array.
+
+    Text fields hold the JSON list of `[timestamp, value]` pairs used by the
+    frontend, or a multi-channel form accepted by `decode_json`. File parts
+    are decoded according to their content type: packed little-endian
+    float64 pairs (`application/octet-stream`), `.npy` (`application/x-npy`)
+    or Arrow IPC (`application/vnd.apache.arrow.stream`); the last two may
+    carry extra channel columns, giving an `(n, 1 + channels)` array.
+    """
+    if isinstance(signal, str):
+        buffer, media_type = signal, JSON_MEDIA_TYPE
+    else:
+        buffer = await signal.read()
+        media_type = _media_type_of(signal)
+
+    # Every decoding failure, such as malformed JSON or a truncated binary
+    # payload, is a client error.
+    try:
+        if media_type == JSON_MEDIA_TYPE:
+            return decode_json(json.loads(buffer))
+        if media_type == NPY_MEDIA_TYPE:
+            return decode_npy(buffer)
+        if media_type == ARROW_MEDIA_TYPE:
+            return decode_arrow(buffer)
+        return decode_raw(buffer)
+    except (TypeError, ValueError, RecursionError) as e:
+        raise TransportError(f"Invalid signal: {e}") from e
+
+
+def negotiate_media_type(request: Request) -> str:
+    """
+    Pick the response media type from the `Accept` header, defaulting to JSON.
+    """
+    accept = request.headers.get("accept", "")
+    candidates = []
+
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, media_type.lower()))
+
+    for _, _, media_type in sorted(candidates):
+        if media_type in BINARY_MEDIA_TYPES or media_type == JSON_MEDIA_TYPE:
+            return media_type
+        if media_type in ("*/*", "application/*"):
+            return JSON_MEDIA_TYPE
+
+    return JSON_MEDIA_TYPE
+
+
+def encode_raw(data) -> bytes:
+    return np.ascontiguousarray(data, dtype=SIGNAL_DTYPE).tobytes()
+
+
+def encode_npy(data) -> bytes:
+    stream = io.BytesIO()
+    np.save(stream, np.ascontiguousarray(data, dtype=SIGNAL_DTYPE), allow_pickle=False)
+    return stream.getvalue()
+
+
+def encode_arrow(data, timebase: UniformTimebase | None = None) -> bytes:
+    """
+    Arrow IPC stream with a `timestamp` column and one `value` column per
+    channel. With `timebase`, `data` holds only the values and the stream
+    carries `t0` and `fs` as schema metadata instead of timestamps.
+    """
+    pyarrow = _import_pyarrow()
+    data = np.asarray(data, dtype=SIGNAL_DTYPE)
+    columns = {}
+    metadata = None
+    if timebase is None:
+        columns["timestamp"] = pyarrow.array(data[:, 0])
+        data = data[:, 1:]
+    else:
+        metadata = {"t0": repr(timebase.t0), "fs": repr(timebase.fs)}
+    if data.shape[1] == 1:
+        columns["value"] = pyarrow.array(data[:, 0])
+    else:
+        for channel in range(data.shape[1]):
+            columns[f"value_{channel}"] = pyarrow.array(data[:, channel])
+    table = pyarrow.table(columns, metadata=metadata)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+_ENCODERS = {
+    RAW_MEDIA_TYPE: encode_raw,
+    NPY_MEDIA_TYPE: encode_npy,
+    ARROW_MEDIA_TYPE: encode_arrow,
+}
+
+
+def uniform_timebase_requested(request: Request) -> bool:
+    """
+    Whether the client accepts signals as `t0`, `fs` and values, signalled
+    by a `timebase=uniform` parameter in the `Accept` header.
+    """
+    accept = request.headers.get("accept", "").replace(" ", "").lower()
+    return UNIFORM_TIMEBASE_PARAM in accept
+
+
+def signal_response(request: Request, data, extra: dict | None = None):
+    """
+    Encode a `[timestamp, value, ...]` array in the media type negotiated
+    with the client.
+
+    JSON responses carry `{"data": [...], **extra}`. Binary responses carry only
+    the array, with its shape in `X-Signal-Shape` and each scalar of `extra`
+    in an `X-<Name>` header.
+
+    When the client accepts `timebase=uniform` and the timestamps are
+    uniform, the timestamp column is left out: JSON responses carry
+    `{"t0": ..., "fs": ..., "values": [...], **extra}` (one list per
+    channel for multi-channel signals) and binary responses only the
+    values, with `X-Signal-T0` and `X-Signal-Fs` headers.
+    """
+    extra = extra or {}
+    with request_phase("encode"):
+        media_type = negotiate_media_type(request)
+        data = np.asarray(data)
+        if data.ndim != 2:
+            data = data.reshape(-1, 2)
+        timebase = detect_uniform(data[:, 0]) if uniform_timebase_requested(request) else None
+
+        if media_type == JSON_MEDIA_TYPE:
+            if timebase is None:
+                content = {"data": data.tolist(), **extra}
+            else:
+                values = data[:, 1] if data.shape[1] == 2 else data[:, 1:].T
+                content = {"t0": timebase.t0, "fs": timebase.fs, "values": values.tolist(), **extra}
+            return JSONResponse(content=content, headers={"Vary": "Accept"})
+
+        data = np.asarray(data, dtype=SIGNAL_DTYPE)
+        headers = {"Vary": "Accept"}
+        if timebase is not None:
+            data = data[:, 1:]
+            headers["X-Signal-T0"] = repr(timebase.t0)
+            headers["X-Signal-Fs"] = repr(timebase.fs)
+        headers["X-Signal-Shape"] = f"{data.shape[0]},{data.shape[1]}"
+        for key, value in extra.items():
+            if value is not None and not isinstance(value, (list, dict)):
+                headers["X-" + "-".join(word.capitalize() for word in key.split("_"))] = str(value)
+
+        if media_type == ARROW_MEDIA_TYPE:
+            content = encode_arrow(data, timebase)
+        else:
+            content = _ENCODERS[media_type](data)
+        return Response(content=content, media_type=media_type, headers=headers)
+
+
+def transport_error_response(error: TransportError):
+    return JSONResponse(content={"error": str(error)}, status_code=error.status_code)
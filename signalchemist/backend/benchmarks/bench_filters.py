@@ -0,0 +1,66 @@
+"""
+Equivalence check and benchmark for the cached SOS filtering engine.
+
+Run from `signalchemist/backend`:
+
+    python -m benchmarks.bench_filters
+    python -m benchmarks.bench_filters --sizes 1000 100000 --repeats 200
+
+Every built-in config handled by the SOS engine is compared against
+`neurokit2.signal_filter`, which redesigns the coefficients on each call.
+Many short calls with the same config show the saving of the design cache,
+as in the batch and pipeline workflows.
+"""
+import argparse
+
+import neurokit2
+import numpy as np
+
+from app.filters import filter_design_cache
+from app.processing import apply_builtin_filter
+from benchmarks.common import timed_repeats
+
+CONFIGS = [
+    {"method": "butterworth", "order": 2, "highcut": 5.0},
+    {"method": "butterworth", "order": 4, "lowcut": 0.5, "highcut": 8.0},
+    {"method": "butterworth", "order": 3, "lowcut": 0.05},
+    {"method": "bessel", "lowcut": 0.5, "highcut": 8.0},
+    {"method": "bessel", "order": 5, "highcut": 3.0},
+    {"method": "chebyshevii", "order": 4, "lowcut": 0.5, "highcut": 8.0},
+]
+
+
+def synthetic_signal(length, sampling_rate, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(length) / sampling_rate
+    return np.sin(2 * np.pi * 1.2 * t) + 0.3 * np.sin(2 * np.pi * 20 * t) + 0.1 * rng.standard_normal(length)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6])
+    parser.add_argument("--fs", type=float, default=64.0)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--tolerance", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    print(f"{'method':>12} {'samples':>10} {'max abs diff':>13} {'sos s':>9} {'neurokit s':>11} {'speedup':>8}")
+    for size in args.sizes:
+        values = synthetic_signal(size, args.fs)
+        repeats = max(1, args.repeats * 1000 // size)
+        for config in CONFIGS:
+            filtered, elapsed = timed_repeats(
+                lambda: apply_builtin_filter(values, args.fs, config), repeats)
+            expected, reference_elapsed = timed_repeats(
+                lambda: neurokit2.signal_filter(values, sampling_rate=args.fs, **config), repeats)
+
+            difference = np.max(np.abs(filtered - expected))
+            if difference > args.tolerance:
+                raise SystemExit(f"{config} differs from NeuroKit by {difference} at {size} samples")
+            print(f"{config['method']:>12} {size:>10} {difference:>13.2e} {elapsed:>9.4f} {reference_elapsed:>11.4f} {reference_elapsed / elapsed:>7.1f}x")
+
+    print(f"design cache: {filter_design_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
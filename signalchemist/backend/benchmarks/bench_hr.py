@@ -0,0 +1,126 @@
+"""
+Equivalence check and benchmark for the EmotiBit heart rate engine.
+
+Run from `signalchemist/backend`:
+
+    python -m benchmarks.bench_hr
+    python -m benchmarks.bench_hr --sizes 100000 10000000 --recordings 64
+
+Peaks are generated synthetically so the timings isolate the heart rate
+engine from NeuroKit peak detection. Every case is compared bit for bit
+against the previous per-sample loop, kept below as the reference.
+`emotibit_mismatches` runs the same comparison without timing for the
+`benchmarks.suite` checks.
+"""
+import argparse
+
+import numpy as np
+
+from app.hr import (
+    DigitalFilter,
+    emotibit_heart_rate_from_peak_sets,
+    emotibit_heart_rate_from_peaks,
+)
+from benchmarks.common import timed
+
+
+def reference_emotibit_heart_rate(timestamps, peaks, sampling_rate):
+    heart_rate_filter = DigitalFilter("IIR_LOWPASS", sampling_rate, 1)
+    time_period_ms = (1.0 / sampling_rate) * 1000.0
+
+    beats = np.zeros(len(timestamps), dtype=int)
+    beats[peaks] = 1
+
+    heart_rates = []
+    beat_timestamps = []
+    inter_beat_sample_count = 0
+
+    for index, has_beat in enumerate(beats):
+        inter_beat_sample_count += 1
+
+        if has_beat:
+            inter_beat_interval = inter_beat_sample_count * time_period_ms
+            heart_rate = (60.0 / inter_beat_interval) * 1000.0
+            heart_rate = heart_rate_filter.filter(heart_rate)
+
+            heart_rates.append(heart_rate)
+            beat_timestamps.append(timestamps[index])
+            inter_beat_sample_count = 0
+
+    if not heart_rates:
+        return np.empty((0, 2), dtype=np.float64)
+
+    return np.column_stack((beat_timestamps, heart_rates))
+
+
+def synthetic_peaks(length, sampling_rate, seed=0):
+    """
+    Beat indices for a heart rate wandering around 70 bpm.
+    """
+    rng = np.random.default_rng(seed)
+    mean_interval = 60 / 70 * sampling_rate
+    intervals = rng.normal(mean_interval, 0.08 * mean_interval, int(length / mean_interval) + 2)
+    peaks = np.cumsum(np.maximum(intervals, 1)).astype(int)
+    return peaks[peaks < length]
+
+
+def emotibit_mismatches(sizes=(1000, 100_003), fs_values=(25.0, 64.0), recordings: int = 8) -> list[str]:
+    """
+    Compare the vectorized EmotiBit engine, single and batched, bit for bit
+    with the per-sample reference.
+    """
+    mismatches = []
+    for fs in fs_values:
+        for size in sizes:
+            timestamps = np.arange(size) / fs
+            peak_sets = [synthetic_peaks(size, fs, seed) for seed in range(recordings)]
+            batch = emotibit_heart_rate_from_peak_sets(peak_sets, fs)
+            for seed, (peaks, (_, batch_heart_rates)) in enumerate(zip(peak_sets, batch)):
+                beats, heart_rates = emotibit_heart_rate_from_peaks(peaks, fs)
+                result = np.column_stack((timestamps[beats], heart_rates)) if len(beats) else np.empty((0, 2))
+                if not np.array_equal(result, reference_emotibit_heart_rate(timestamps, peaks, fs)):
+                    mismatches.append(f"EmotiBit heart rate at {size} samples, fs {fs:g}, seed {seed}")
+                if not np.array_equal(batch_heart_rates, heart_rates):
+                    mismatches.append(f"Batch EmotiBit heart rate at {size} samples, fs {fs:g}, seed {seed}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6, 10**7])
+    parser.add_argument("--fs", type=float, default=64.0)
+    parser.add_argument("--recordings", type=int, default=32,
+                        help="Recordings processed together in the batch case.")
+    parser.add_argument("--reference-limit", type=int, default=10**6,
+                        help="Largest size also timed with the per-sample reference.")
+    args = parser.parse_args()
+
+    print(f"{'case':>10} {'samples':>10} {'beats':>8} {'vectorized s':>13} {'reference s':>12} {'speedup':>8}")
+    for size in args.sizes:
+        timestamps = np.arange(size) / args.fs
+        peaks = synthetic_peaks(size, args.fs)
+        (beats, heart_rates), elapsed = timed(emotibit_heart_rate_from_peaks, peaks, args.fs)
+
+        if size > args.reference_limit:
+            print(f"{'single':>10} {size:>10} {len(beats):>8} {elapsed:>13.4f} {'-':>12} {'-':>8}")
+        else:
+            expected, reference_elapsed = timed(reference_emotibit_heart_rate, timestamps, peaks, args.fs)
+            result = np.column_stack((timestamps[beats], heart_rates)) if len(beats) else np.empty((0, 2))
+            if not np.array_equal(result, expected):
+                raise SystemExit(f"EmotiBit heart rate mismatch at {size} samples")
+            print(f"{'single':>10} {size:>10} {len(beats):>8} {elapsed:>13.4f} {reference_elapsed:>12.4f} {reference_elapsed / elapsed:>7.1f}x")
+
+        peak_sets = [synthetic_peaks(size, args.fs, seed) for seed in range(args.recordings)]
+        batch, batch_elapsed = timed(emotibit_heart_rate_from_peak_sets, peak_sets, args.fs)
+        looped_elapsed = 0.0
+        for peak_set, (_, batch_heart_rates) in zip(peak_sets, batch):
+            (_, single_heart_rates), elapsed = timed(emotibit_heart_rate_from_peaks, peak_set, args.fs)
+            looped_elapsed += elapsed
+            if not np.array_equal(batch_heart_rates, single_heart_rates):
+                raise SystemExit(f"Batch heart rate mismatch at {size} samples")
+        beat_total = sum(len(beats) for beats, _ in batch)
+        print(f"{'batch':>10} {size:>10} {beat_total:>8} {batch_elapsed:>13.4f} {looped_elapsed:>12.4f} {looped_elapsed / batch_elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
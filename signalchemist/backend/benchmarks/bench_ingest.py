@@ -0,0 +1,109 @@
+"""
+Benchmark for CSV and Parquet ingestion with `/ingest`.
+
+Run from `signalchemist/backend`:
+
+    python -m benchmarks.bench_ingest
+    python -m benchmarks.bench_ingest --megabytes 256 --channels 1 --keep
+
+Writes a synthetic wearable export of about `--megabytes` of CSV (a
+timestamp column, `--channels` value columns and a text column that is
+never selected), plus its gzip and Parquet versions, to a temporary
+directory. It then times `ingest_signal` on each with a single value
+column selected, reporting throughput against the uncompressed CSV size.
+The pandas C parser and the frontend's previous JSON upload format are
+timed on the same CSV for comparison.
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pyarrow
+import pyarrow.csv
+import pyarrow.parquet
+
+from app.ingest import ingest_signal
+from benchmarks.common import timed
+
+ROWS_PER_BATCH = 1_000_000
+JSON_COMPARISON_ROWS = 2_000_000
+
+
+def write_files(directory: str, megabytes: int, channels: int, fs: float):
+    csv_path = os.path.join(directory, "recording.csv")
+    rng = np.random.default_rng(0)
+    rows = 0
+    writer = None
+    parquet_writer = None
+    with open(csv_path, "wb") as csv_file:
+        while os.path.getsize(csv_path) < megabytes * 1024 * 1024 or writer is None:
+            timestamps = (rows + np.arange(ROWS_PER_BATCH)) / fs
+            columns = {"LocalTimestamp": timestamps}
+            for channel in range(channels):
+                columns[f"channel_{channel}"] = np.round(rng.standard_normal(ROWS_PER_BATCH), 6)
+            columns["tag"] = pyarrow.array(["ok"] * ROWS_PER_BATCH)
+            table = pyarrow.table(columns)
+            if writer is None:
+                writer = pyarrow.csv.CSVWriter(csv_file, table.schema)
+                parquet_writer = pyarrow.parquet.ParquetWriter(
+                    os.path.join(directory, "recording.parquet"), table.schema)
+            writer.write_table(table)
+            parquet_writer.write_table(table)
+            csv_file.flush()
+            rows += ROWS_PER_BATCH
+        writer.close()
+    parquet_writer.close()
+
+    with open(csv_path, "rb") as source, gzip.open(csv_path + ".gz", "wb", compresslevel=1) as target:
+        shutil.copyfileobj(source, target, 16 * 1024 * 1024)
+    return csv_path, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=int, default=1024)
+    parser.add_argument("--channels", type=int, default=3)
+    parser.add_argument("--sampling-rate", type=float, default=64.0)
+    parser.add_argument("--keep", action="store_true", help="Keep the generated files.")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="signalchemist-ingest-")
+    try:
+        csv_path, rows = write_files(directory, args.megabytes, args.channels, args.sampling_rate)
+        csv_megabytes = os.path.getsize(csv_path) / 1024 / 1024
+        print(f"{rows} rows, {csv_megabytes:.0f} MB CSV in {directory}")
+
+        for label, path in (
+            ("csv", csv_path),
+            ("csv.gz", csv_path + ".gz"),
+            ("parquet", os.path.join(directory, "recording.parquet")),
+        ):
+            with open(path, "rb") as file:
+                (data, _), elapsed = timed(lambda: ingest_signal(file, path, value_columns="channel_0"))
+            size = os.path.getsize(path) / 1024 / 1024
+            print(f"{label:>8}: {size:8.0f} MB on disk, {elapsed:6.2f} s, "
+                  f"{csv_megabytes / elapsed:7.0f} MB/s of CSV, {len(data) / elapsed / 1e6:6.1f} M rows/s")
+
+        import pandas
+
+        _, elapsed = timed(lambda: pandas.read_csv(csv_path, usecols=["LocalTimestamp", "channel_0"], engine="c"))
+        print(f"{'pandas':>8}: {elapsed:6.2f} s, {csv_megabytes / elapsed:7.0f} MB/s of CSV")
+
+        sample = np.column_stack((np.arange(JSON_COMPARISON_ROWS) / args.sampling_rate,
+                                  np.random.default_rng(1).standard_normal(JSON_COMPARISON_ROWS)))
+        payload = json.dumps(sample.tolist())
+        _, elapsed = timed(lambda: np.array(json.loads(payload), dtype=np.float64))
+        print(f"{'json':>8}: {JSON_COMPARISON_ROWS / elapsed / 1e6:6.1f} M rows/s decoding the previous JSON upload")
+    finally:
+        if args.keep:
+            print(f"kept {directory}")
+        else:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
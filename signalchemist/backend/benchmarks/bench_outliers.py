@@ -0,0 +1,71 @@
+"""
+Throughput benchmark for the Hampel outlier filter.
+
+Run from `signalchemist/backend`:
+
+    python -m benchmarks.bench_outliers
+    python -m benchmarks.bench_outliers --sizes 100000 1000000 --reference-limit 1000000
+
+The reference is the previous implementation, `neurokit2.rsp_clean` with
+`method="hampel"` followed by a pandas interpolation. Its rolling MAD calls
+back into Python for every window, so by default it is only timed up to
+10^5 samples. The reference always used a 100 sample window; the new filter
+is timed with the same window for a like-for-like comparison.
+"""
+import argparse
+
+import neurokit2
+import numpy as np
+import pandas as pd
+
+from app.outliers import hampel
+from benchmarks.common import synthetic_ppg, timed
+
+
+def reference_hampel(gsr):
+    gsr_filtered = np.array(neurokit2.rsp_clean(gsr, sampling_rate=4, method="hampel"))
+
+    Q1 = np.percentile(gsr_filtered, 25)
+    Q3 = np.percentile(gsr_filtered, 75)
+    IQR = Q3 - Q1
+    outliers = (gsr_filtered < Q1 - 1.5 * IQR) | (gsr_filtered > Q3 + 1.5 * IQR)
+
+    gsr_cleaned = gsr_filtered.copy()
+    gsr_cleaned[outliers] = np.nan
+    gsr_clean_series = pd.Series(gsr_cleaned).interpolate(method="linear")
+    return gsr_clean_series.fillna(gsr_clean_series.mean()).to_numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**5, 10**6, 10**7])
+    parser.add_argument("--fs", type=float, default=64.0)
+    parser.add_argument("--window-seconds", type=float, default=5.0)
+    parser.add_argument("--reference-limit", type=int, default=10**5,
+                        help="Largest size also timed with the previous implementation.")
+    args = parser.parse_args()
+
+    legacy_window_seconds = 100 / args.fs
+    print(f"{'samples':>10} {'window':>7} {'hampel s':>9} {'Msamples/s':>11} {'reference s':>12} {'speedup':>8}")
+    for size in args.sizes:
+        values = synthetic_ppg(size, args.fs, spike_density=0.001)
+
+        _, elapsed = timed(hampel, values, args.fs, args.window_seconds)
+        window = int(round(args.window_seconds * args.fs)) | 1
+        print(f"{size:>10} {window:>7} {elapsed:>9.4f} {size / elapsed / 1e6:>11.2f} {'-':>12} {'-':>8}")
+
+        cleaned, elapsed = timed(hampel, values, args.fs, legacy_window_seconds)
+        if size > args.reference_limit:
+            print(f"{size:>10} {101:>7} {elapsed:>9.4f} {size / elapsed / 1e6:>11.2f} {'-':>12} {'-':>8}")
+            continue
+
+        expected, reference_elapsed = timed(reference_hampel, values)
+        # The reference leaves the first and last half-window untouched.
+        inner = slice(100, -100)
+        agreement = np.mean(np.isclose(cleaned[inner], expected[inner], atol=1e-6))
+        print(f"{size:>10} {101:>7} {elapsed:>9.4f} {size / elapsed / 1e6:>11.2f} {reference_elapsed:>12.4f} "
+              f"{reference_elapsed / elapsed:>7.1f}x  ({agreement:.2%} samples agree)")
+
+
+if __name__ == "__main__":
+    main()
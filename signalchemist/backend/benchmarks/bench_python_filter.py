@@ -0,0 +1,72 @@
+"""
+Benchmark for custom Python filters run in the isolated worker pool.
+
+Run from `signalchemist/backend`:
+
+    python -m benchmarks.bench_python_filter
+    python -m benchmarks.bench_python_filter --files 2000 --samples 20000 --workers 4
+
+Simulates a batch job applying one custom filter to many recordings. The
+previous in-process path, which copied the module namespace and executed
+the code on every call, is kept below as the reference. Outputs are
+compared before the timings are printed.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import scipy.ndimage
+
+from app.sandbox import PythonFilterPool
+
+FILTER_CODE = "def filter_signal(signal): \n\tnew_values = scipy.ndimage.gaussian_filter1d(signal, sigma=30) \n\treturn new_values"
+
+
+def reference_python_filter(code, values):
+    namespace = {**globals(), "np": np, "scipy": scipy}
+    exec(code, namespace)
+    return namespace["filter_signal"](np.array(values, dtype=np.float64))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--samples", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    recordings = [rng.standard_normal(args.samples) for _ in range(args.files)]
+
+    pool = PythonFilterPool(workers=args.workers)
+    started = time.perf_counter()
+    pool.start()
+    print(f"pre-warmed {args.workers} workers in {time.perf_counter() - started:.2f} s")
+
+    try:
+        started = time.perf_counter()
+        expected = [reference_python_filter(FILTER_CODE, values) for values in recordings]
+        reference_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as threads:
+            outputs = list(threads.map(lambda values: pool.run(FILTER_CODE, values), recordings))
+        pool_elapsed = time.perf_counter() - started
+
+        for output, reference in zip(outputs, expected):
+            if not np.array_equal(output, reference):
+                raise SystemExit("Worker output differs from the in-process reference")
+
+        stats = pool.stats()
+    finally:
+        pool.shutdown()
+
+    print(f"{args.files} recordings of {args.samples} samples")
+    print(f"in-process exec per call: {reference_elapsed:.3f} s ({reference_elapsed / args.files * 1000:.2f} ms per file)")
+    print(f"isolated worker pool:     {pool_elapsed:.3f} s ({pool_elapsed / args.files * 1000:.2f} ms per file)")
+    print(f"compiled filter reused on {stats['compiled_reuse']} of {stats['completed']} calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+Equivalence check and scaling benchmark for the quality metrics.
+
+Run from `signalchemist/backend`:
+
+    python -m benchmarks.bench_quality
+    python -m benchmarks.bench_quality --sizes 1000 100000 10000000 --reference-limit 1000000
+    python -m benchmarks.bench_quality --metric kleckner --densities 0 0.001 0.01 0.1
+    python -m benchmarks.bench_quality --metric maki --heights 0 0.3 0.8
+
+Each case compares the optimized metric against the previous implementation
+(kept below as the reference) and fails if the outputs differ. The
+`*_mismatches` functions run the same comparisons over a fixed set of
+sizes and parameters without timing, and `benchmarks.suite` runs them
+before its timings. The Kleckner
+cases are repeated for several artifact densities, since the old spreading
+loop slowed down as artifacts became denser, and the Maki cases for several
+minimum peak heights, since a nonzero height selects peaks on the normalized
+signal.
+"""
+import argparse
+
+import numpy as np
+from scipy.signal import filtfilt, find_peaks
+
+from app.metrics import bottcher_quality, kleckner_quality, maki_quality, running_mean_filtfilt
+from benchmarks.common import synthetic_eda, synthetic_ppg, timed
+
+CHECK_SIZES = (1000, 100_003)  # Sizes of the equivalence checks; the odd one leaves partial windows
+
+
+def reference_bottcher_quality(eda, stamps=None, fs=4):
+    eda = np.asarray(eda, dtype=float)
+
+    def get_rac(signal, window_seconds=2):
+        window_samples = int(window_seconds * fs)
+        intervals = range(0, len(signal), window_samples)
+        rac = np.full(len(signal), np.nan)
+
+        for start in intervals:
+            if (start + window_samples) >= len(signal):
+                continue
+
+            window = signal[start : start + window_samples]
+            min_index = np.argmin(window)
+            min_value = window[min_index]
+            max_index = np.argmax(window)
+            max_value = window[max_index]
+
+            if min_index < max_index:
+                rac[start] = (max_value - min_value) / (abs(min_value) + 1e-20)
+            elif min_index > max_index:
+                rac[start] = (min_value - max_value) / (abs(max_value) + 1e-20)
+
+        last_value = np.nan
+        for index in range(len(rac)):
+            if not np.isnan(rac[index]):
+                last_value = rac[index]
+            else:
+                rac[index] = last_value
+
+        return rac
+
+    def get_windowed_mm_score(score, window_seconds=60):
+        moving_window = int(window_seconds * fs)
+        cumsum = np.cumsum(np.insert(score, 0, 0))
+        head_mean = (cumsum[moving_window:] - cumsum[:-moving_window]) / moving_window
+        tail_means = np.array(
+            [np.mean(score[-i:]) for i in range(moving_window - 1, 0, -1)]
+        )
+        score_mm = np.concatenate((head_mean, tail_means))
+        max_length = min(len(score), len(stamps)) if stamps is not None else len(score)
+        return score_mm[:max_length:moving_window]
+
+    quality_values = (eda >= 0.05) & (np.abs(get_rac(eda)) < 0.2)
+    score_windowed = get_windowed_mm_score(quality_values)
+    return float(np.mean(score_windowed))
+
+
+def reference_kleckner_quality(
+    data_eda_us,
+    fs=4,
+    data_time_sec=None,
+    data_temperature_c=None,
+    qa_filter_window_eda_sec=None,
+    qa_eda_floor=0.05,
+    qa_eda_ceiling=60,
+    qa_eda_max_slope_us_per_sec=10,
+    qa_temperature_c_min=30,
+    qa_temperature_c_max=40,
+    qa_radius_to_spread_invalid_datum_sec=5,
+):
+    data_eda_us = np.asarray(data_eda_us, dtype=float)
+    data_time_sec = [] if data_time_sec is None else list(data_time_sec)
+
+    if data_temperature_c is None or len(data_temperature_c) == 0:
+        qa_temperature_c_min = 0
+        qa_temperature_c_max = 1
+        data_temperature_c = 0.5 * np.ones(len(data_eda_us))
+    else:
+        data_temperature_c = np.asarray(data_temperature_c, dtype=float)
+        if qa_temperature_c_min >= qa_temperature_c_max:
+            raise ValueError("Temperature min must be less than temperature max")
+
+    if (
+        (len(data_time_sec) != 0 and len(data_eda_us) != len(data_time_sec))
+        or (len(data_temperature_c) != 0 and len(data_eda_us) != len(data_temperature_c))
+        or (
+            len(data_time_sec) != 0
+            and len(data_temperature_c) != 0
+            and len(data_time_sec) != len(data_temperature_c)
+        )
+    ):
+        raise ValueError(
+            "Input data must all be the same length. If you do not have temperature or time data, use []"
+        )
+
+    if qa_eda_floor >= qa_eda_ceiling:
+        raise ValueError("EDA floor must be less than EDA ceiling")
+
+    sampling_period_eda = (
+        float(data_time_sec[1] - data_time_sec[0]) if len(data_time_sec) > 1 else 1 / fs
+    )
+
+    if qa_filter_window_eda_sec:
+        window_size = qa_filter_window_eda_sec / sampling_period_eda
+        kernel = (1 / window_size) * np.ones(int(window_size))
+        data_eda_us_filtered = filtfilt(kernel, 1, data_eda_us)
+        data_temperature_c_filtered = filtfilt(kernel, 1, data_temperature_c)
+
+        if np.sum(~np.isnan(data_temperature_c_filtered)) == 0:
+            data_temperature_c_filtered = data_temperature_c
+    else:
+        data_eda_us_filtered = data_eda_us
+        data_temperature_c_filtered = data_temperature_c
+
+    data_q_eda_us_per_sec_filtered_qa = np.insert(
+        np.diff(data_eda_us_filtered) / sampling_period_eda,
+        0,
+        0,
+    )
+
+    eda_datum_invalid_123 = (
+        (data_eda_us_filtered < qa_eda_floor)
+        | (data_eda_us_filtered > qa_eda_ceiling)
+        | (np.abs(data_q_eda_us_per_sec_filtered_qa) > qa_eda_max_slope_us_per_sec)
+        | (data_temperature_c_filtered < qa_temperature_c_min)
+        | (data_temperature_c_filtered > qa_temperature_c_max)
+    )
+
+    spread_samples = int(qa_radius_to_spread_invalid_datum_sec / sampling_period_eda)
+    eda_datum_invalid = eda_datum_invalid_123.copy()
+
+    for index, is_invalid in enumerate(eda_datum_invalid_123):
+        if not is_invalid:
+            continue
+        eda_datum_invalid[index : index + spread_samples] = 1
+        eda_datum_invalid[max(0, index - spread_samples + 1) : index] = 1
+
+    return float(np.mean(~eda_datum_invalid))
+
+
+def reference_kleckner_quality_filter(data_eda_us, fs=4):
+    return reference_kleckner_quality(data_eda_us, fs=fs, qa_filter_window_eda_sec=2)
+
+
+def reference_maki_quality(data, fs=64, min_peak_distance=60 / 240, min_peak_height=0):
+    data = np.asarray(data, dtype=float)
+    min_peak_distance_samples = max(1, int(round(min_peak_distance * fs)))
+
+    def normalize_mean_peak_height(values):
+        centered = values - np.mean(values)
+        peak_indices, _ = find_peaks(
+            centered,
+            height=min_peak_height,
+            distance=min_peak_distance_samples,
+        )
+        peaks = centered[peak_indices]
+        if peaks.size == 0 or np.isclose(np.mean(peaks), 0):
+            raise ValueError("Unable to normalize signal: no valid peaks found.")
+        return centered / np.mean(peaks)
+
+    normalized_signal = normalize_mean_peak_height(data)
+    peak_indices, _ = find_peaks(
+        normalized_signal,
+        height=min_peak_height,
+        distance=min_peak_distance_samples,
+    )
+    peaks = normalized_signal[peak_indices]
+    if peaks.size <= 1:
+        return 0.0
+
+    return float(np.var(peaks, ddof=1))
+
+
+def same_value(value, expected):
+    return value == expected or (np.isnan(value) and np.isnan(expected))
+
+
+def bottcher_mismatches(sizes=CHECK_SIZES) -> list[str]:
+    """
+    Compare `bottcher_quality` with the reference at several sampling rates,
+    without timestamps and with fewer timestamps than samples.
+    """
+    mismatches = []
+    for fs in (4.0, 32.0, 64.0):
+        for size in sizes:
+            eda = synthetic_eda(size, fs)
+            for stamps in (None, np.arange(size * 2 // 3) / fs):
+                value = bottcher_quality(eda, stamps=stamps, fs=fs)
+                expected = reference_bottcher_quality(eda, stamps=stamps, fs=fs)
+                if not same_value(value, expected):
+                    mismatches.append(
+                        f"bottcher_quality at {size} samples, fs {fs:g}, "
+                        f"{'no' if stamps is None else len(stamps)} stamps: {value!r} != {expected!r}")
+    return mismatches
+
+
+KLECKNER_CHECK_PARAMS = (
+    {},
+    {"qa_filter_window_eda_sec": 2},
+    {"qa_eda_floor": 0.5, "qa_eda_ceiling": 2.3, "qa_eda_max_slope_us_per_sec": 15,
+     "qa_radius_to_spread_invalid_datum_sec": 2},
+    {"qa_filter_window_eda_sec": 1, "qa_eda_floor": 1.8, "qa_radius_to_spread_invalid_datum_sec": 0.5},
+)
+
+
+def kleckner_mismatches(sizes=CHECK_SIZES, densities=(0.0, 0.001, 0.05), fs=32.0) -> list[str]:
+    """
+    Compare `kleckner_quality` with the reference across artifact densities,
+    raw and filtered, at default and non-default thresholds.
+    """
+    mismatches = []
+    for density in densities:
+        for size in sizes:
+            eda = synthetic_eda(size, fs, artifact_density=density)
+            for params in KLECKNER_CHECK_PARAMS:
+                value = kleckner_quality(eda, fs=fs, **params)
+                expected = reference_kleckner_quality(eda, fs=fs, **params)
+                if not same_value(value, expected):
+                    mismatches.append(
+                        f"kleckner_quality at {size} samples, density {density:g}, {params}: "
+                        f"{value!r} != {expected!r}")
+    return mismatches
+
+
+def maki_mismatches(sizes=CHECK_SIZES, heights=(0.0, 0.3, 0.8), fs=64.0) -> list[str]:
+    """
+    Compare `maki_quality` with the reference at zero and nonzero minimum
+    peak heights and two peak distances.
+    """
+    mismatches = []
+    for height in heights:
+        for size in sizes:
+            ppg = synthetic_ppg(size, fs)
+            for distance in (60 / 240, 0.4):
+                value = maki_quality(ppg, fs=fs, min_peak_distance=distance, min_peak_height=height)
+                expected = reference_maki_quality(ppg, fs=fs, min_peak_distance=distance, min_peak_height=height)
+                if not same_value(value, expected):
+                    mismatches.append(
+                        f"maki_quality at {size} samples, height {height:g}, distance {distance:g}: "
+                        f"{value!r} != {expected!r}")
+    return mismatches
+
+
+def print_row(label, size, elapsed, reference_elapsed=None):
+    if reference_elapsed is None:
+        print(f"{label:>22} {size:>10} {elapsed:>13.4f} {'-':>12} {'-':>8}")
+    else:
+        print(f"{label:>22} {size:>10} {elapsed:>13.4f} {reference_elapsed:>12.4f} {reference_elapsed / elapsed:>7.1f}x")
+
+
+def bench_bottcher(sizes, fs, reference_limit):
+    for size in sizes:
+        eda = synthetic_eda(size, fs)
+        value, elapsed = timed(bottcher_quality, eda, fs=fs)
+
+        if size > reference_limit:
+            print_row("bottcher", size, elapsed)
+            continue
+
+        expected, reference_elapsed = timed(reference_bottcher_quality, eda, fs=fs)
+        if not same_value(value, expected):
+            raise SystemExit(f"bottcher_quality mismatch at {size} samples: {value!r} != {expected!r}")
+        print_row("bottcher", size, elapsed, reference_elapsed)
+
+
+def bench_kleckner(sizes, fs, reference_limit, densities):
+    for density in densities:
+        for size in sizes:
+            eda = synthetic_eda(size, fs, artifact_density=density)
+            for variant, window in (("raw", None), ("filter 2s", 2)):
+                label = f"kleckner {variant} {density:g}"
+                if window is not None and size <= 3 * int(window * fs):
+                    continue
+
+                value, elapsed = timed(kleckner_quality, eda, fs=fs, qa_filter_window_eda_sec=window)
+                if size > reference_limit:
+                    print_row(label, size, elapsed)
+                    continue
+
+                expected, reference_elapsed = timed(
+                    reference_kleckner_quality, eda, fs=fs, qa_filter_window_eda_sec=window)
+                if not same_value(value, expected):
+                    raise SystemExit(f"kleckner_quality ({variant}) mismatch at {size} samples, density {density}: {value!r} != {expected!r}")
+                print_row(label, size, elapsed, reference_elapsed)
+
+    size = min(max(sizes), reference_limit)
+    if size > 3 * int(2 * fs):
+        eda = synthetic_eda(size, fs)
+        window_size = 2 * fs
+        difference = np.max(np.abs(
+            running_mean_filtfilt(eda, window_size)
+            - filtfilt((1 / window_size) * np.ones(int(window_size)), 1, eda)
+        ))
+        print(f"running mean vs filtfilt max abs difference at {size} samples: {difference:.3e}")
+
+
+def bench_maki(sizes, fs, reference_limit, heights):
+    for height in heights:
+        for size in sizes:
+            ppg = synthetic_ppg(size, fs)
+            label = f"maki height {height:g}"
+            value, elapsed = timed(maki_quality, ppg, fs=fs, min_peak_height=height)
+            if size > reference_limit:
+                print_row(label, size, elapsed)
+                continue
+
+            expected, reference_elapsed = timed(reference_maki_quality, ppg, fs=fs, min_peak_height=height)
+            if not same_value(value, expected):
+                raise SystemExit(f"maki_quality mismatch at {size} samples, height {height:g}: {value!r} != {expected!r}")
+            print_row(label, size, elapsed, reference_elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--metric", choices=("all", "bottcher", "kleckner", "maki"), default="all")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**3, 10**4, 10**5, 10**6, 10**7])
+    parser.add_argument("--fs", type=float, default=32.0)
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.0, 0.001, 0.01, 0.1],
+                        help="Artifact densities used for the Kleckner cases.")
+    parser.add_argument("--heights", type=float, nargs="+", default=[0.0, 0.3, 0.8],
+                        help="Minimum peak heights used for the Maki cases.")
+    parser.add_argument("--ppg-fs", type=float, default=64.0)
+    parser.add_argument("--reference-limit", type=int, default=10**6,
+                        help="Largest size also timed with the loop-based reference.")
+    args = parser.parse_args()
+
+    print(f"{'metric':>22} {'samples':>10} {'vectorized s':>13} {'reference s':>12} {'speedup':>8}")
+    if args.metric in ("all", "bottcher"):
+        bench_bottcher(args.sizes, args.fs, args.reference_limit)
+    if args.metric in ("all", "kleckner"):
+        bench_kleckner(args.sizes, args.fs, args.reference_limit, args.densities)
+    if args.metric in ("all", "maki"):
+        bench_maki(args.sizes, args.ppg_fs, args.reference_limit, args.heights)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark for the resampling strategies.
+
+Run from `signalchemist/backend`:
+
+    python -m benchmarks.bench_resampling
+    python -m benchmarks.bench_resampling --hours 1 24 --input-fs 4 --target-fs 64
+
+Each technique upsamples a uniform recording and, except `polyphase`
+which would fall back, an irregularly sampled one. The legacy `interp1d`
+path is timed next to `1d` for reference, and every output is compared
+against the exact underlying signal away from the edges.
+"""
+import argparse
+import time
+
+import numpy as np
+import scipy.interpolate
+
+from app.processing import resample_signal, resampled_length
+
+
+def test_signal(t):
+    return np.sin(2 * np.pi * 0.05 * t) + 0.2 * np.sin(2 * np.pi * 0.4 * t)
+
+
+def uniform_recording(hours, sampling_rate):
+    t = np.arange(int(hours * 3600 * sampling_rate)) / sampling_rate
+    return np.column_stack((t, test_signal(t)))
+
+
+def irregular_recording(hours, sampling_rate, seed=0):
+    rng = np.random.default_rng(seed)
+    length = int(hours * 3600 * sampling_rate)
+    t = np.cumsum(rng.uniform(0.5, 1.5, length)) / sampling_rate
+    return np.column_stack((t, test_signal(t)))
+
+
+def legacy_linear(data, target_sampling_rate):
+    new_time = data[0, 0] + np.arange(resampled_length(data, target_sampling_rate)) / target_sampling_rate
+    return np.column_stack((new_time, scipy.interpolate.interp1d(data[:, 0], data[:, 1], kind="linear")(new_time)))
+
+
+def max_error(output, edge=1000):
+    inner = output[edge:-edge]
+    return np.max(np.abs(inner[:, 1] - test_signal(inner[:, 0]))) if len(inner) else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hours", type=float, nargs="+", default=[1, 8])
+    parser.add_argument("--input-fs", type=float, default=4.0)
+    parser.add_argument("--target-fs", type=float, default=64.0)
+    parser.add_argument("--spline-limit", type=int, default=250_000,
+                        help="Largest output also computed with the global smoothing spline.")
+    args = parser.parse_args()
+
+    print(f"{'input':>9} {'technique':>10} {'strategy':>17} {'samples out':>12} {'seconds':>9} {'max error':>10}")
+    for hours in args.hours:
+        for label, data in (("uniform", uniform_recording(hours, args.input_fs)),
+                            ("irregular", irregular_recording(hours, args.input_fs))):
+            started = time.perf_counter()
+            output = legacy_linear(data, args.target_fs)
+            elapsed = time.perf_counter() - started
+            print(f"{label:>9} {'interp1d':>10} {'legacy':>17} {len(output):>12} {elapsed:>9.3f} {max_error(output):>10.2e}")
+
+            for technique in ("1d", "cubic", "polyphase", "spline"):
+                if technique == "polyphase" and label == "irregular":
+                    continue
+                if technique == "spline" and resampled_length(data, args.target_fs) > args.spline_limit:
+                    continue
+                started = time.perf_counter()
+                output, info = resample_signal(data, technique, args.target_fs, return_info=True)
+                elapsed = time.perf_counter() - started
+                print(f"{label:>9} {technique:>10} {info['strategy']:>17} {len(output):>12} {elapsed:>9.3f} {max_error(output):>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Synthetic recordings and timers shared by the benchmarks.
+"""
+import time
+
+import numpy as np
+
+
+def synthetic_ppg(length: int, fs: float, seed: int = 0, spike_density: float = 0.0):
+    """
+    Pulse train whose rate wanders around 72 bpm, with a dicrotic notch,
+    slowly varying pulse heights, baseline wander and sensor noise.
+
+    `spike_density` is the fraction of samples hit by motion spikes of ±8.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(length) / fs
+    rate_hz = 1.2 + 0.15 * np.sin(2 * np.pi * t / 45) + 0.02 * rng.standard_normal(length).cumsum() / np.sqrt(fs * 60)
+    phase = 2 * np.pi * np.cumsum(rate_hz) / fs
+    height = 1 + 0.3 * np.sin(2 * np.pi * t / 30)
+    pulse = height * (np.exp(4 * (np.cos(phase) - 1)) + 0.3 * np.exp(6 * (np.cos(phase - 2.2) - 1)))
+    values = pulse + 0.2 * np.sin(2 * np.pi * t / 20) + 0.03 * rng.standard_normal(length)
+    if spike_density:
+        spikes = rng.random(length) < spike_density
+        values[spikes] += rng.choice([-8.0, 8.0], spikes.sum())
+    return values
+
+
+def synthetic_eda(length: int, fs: float, seed: int = 0, artifact_density: float = 0.001):
+    """
+    Slow tonic drift plus phasic bumps, dropouts and flat segments.
+
+    `artifact_density` is the fraction of samples replaced by dropouts to zero.
+    """
+    rng = np.random.default_rng(seed)
+    if length == 0:
+        return np.empty(0)
+    t = np.arange(length) / fs
+    eda = 2 + 0.5 * np.sin(2 * np.pi * t / 300) + 0.05 * rng.standard_normal(length)
+    kernel = np.hanning(int(4 * fs) + 1)
+    bumps = np.convolve((rng.random(length) < 0.002).astype(float), kernel)
+    eda += bumps[kernel.size // 2 : kernel.size // 2 + length]
+    eda[rng.random(length) < artifact_density] = 0.0
+    flat_start = length // 3
+    eda[flat_start : flat_start + int(10 * fs)] = 1.5
+    return eda
+
+
+def timed(func, *args, **kwargs):
+    """
+    `func(*args, **kwargs)` and its wall time in seconds.
+    """
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def timed_repeats(func, repeats: int):
+    """
+    The last result of calling `func()` `repeats` times and the total time.
+    """
+    started = time.perf_counter()
+    for _ in range(repeats):
+        result = func()
+    return result, time.perf_counter() - started
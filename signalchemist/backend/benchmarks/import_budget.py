@@ -0,0 +1,95 @@
+"""
+Import-time budget check for the API module.
+
+Run from `signalchemist/backend`:
+
+    python -m benchmarks.import_budget
+    python -m benchmarks.import_budget --budget 0.8 --runs 7
+
+Imports `app.main` in fresh interpreters and fails when the median import
+time exceeds `--budget` seconds, or when any of the lazily loaded backends
+(NeuroKit, pandas, the SciPy subpackages) was imported at startup. The
+time of a `WARM_UP=true` startup, which pre-imports them, is reported for
+reference. `benchmarks.suite` runs the same check as part of its gate.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from app.backends import HEAVY_BACKENDS
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "loaded": [name for name in %r if name in sys.modules]}))
+""" % (HEAVY_BACKENDS,)
+
+WARM_PROBE = """
+import json, time
+started = time.perf_counter()
+import app.main
+from app.backends import warm_up
+warm_up()
+print(json.dumps({"seconds": time.perf_counter() - started}))
+"""
+
+
+def run_probe(code: str, env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def probe_env() -> dict:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))}
+    env.pop("WARM_UP", None)
+    return env
+
+
+def import_budget_failures(budget: float = 1.0, runs: int = 5, env: dict = None) -> list[str]:
+    """
+    Time `import app.main` in `runs` fresh interpreters and return the
+    budget violations: a median over `budget` seconds, or heavy backends
+    loaded at startup.
+    """
+    env = env or probe_env()
+    probes = [run_probe(PROBE, env) for _ in range(runs)]
+    timings = [probe["seconds"] for probe in probes]
+    median = statistics.median(timings)
+    loaded = sorted({name for probe in probes for name in probe["loaded"]})
+
+    print(f"import app.main: median {median:.3f} s, min {min(timings):.3f} s, max {max(timings):.3f} s over {runs} runs")
+
+    failures = []
+    if median > budget:
+        failures.append(f"median import time {median:.3f} s exceeds the {budget:.3f} s budget")
+    if loaded:
+        failures.append(f"backends imported at startup: {', '.join(loaded)}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=1.0, help="Maximum median import time in seconds.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-warm-up", action="store_true")
+    args = parser.parse_args()
+
+    env = probe_env()
+    failures = import_budget_failures(args.budget, args.runs, env)
+    if not args.skip_warm_up:
+        print(f"import app.main + warm-up: {run_probe(WARM_PROBE, env)['seconds']:.3f} s")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("within budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Load test for the `/stream` WebSocket endpoint.
+
+Run from `signalchemist/backend` (needs `uvicorn[standard]`, which brings
+the `websockets` client):
+
+    python -m benchmarks.load_stream
+    python -m benchmarks.load_stream --streams 500 --duration 30 --batch-seconds 0.25
+
+Starts the API with uvicorn on a local port and opens `--streams`
+concurrent connections. Each one sends a synthetic PPG at `--fs` in real
+time, one batch every `--batch-seconds`, with filtering, peak detection
+and heart rate enabled, and measures the round trip of every batch.
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+import numpy as np
+import uvicorn
+import websockets
+
+from app.main import app
+from benchmarks.common import synthetic_ppg
+
+STREAM_CONFIG = {
+    "filter": {"method": "butterworth", "order": 2, "lowcut": 0.5, "highcut": 5},
+    "peaks": {"min_distance_seconds": 0.3},
+    "heart_rate": True,
+}
+
+
+async def run_stream(url, stream_id, args, latencies, counters, start_at):
+    batch_samples = max(1, int(round(args.batch_seconds * args.fs)))
+    batches = int(args.duration / args.batch_seconds)
+    length = batches * batch_samples
+    data = np.column_stack((np.arange(length) / args.fs, synthetic_ppg(length, args.fs, stream_id))).astype("<f8")
+
+    async with websockets.connect(url, max_size=None) as websocket:
+        await websocket.send(json.dumps({"sampling_rate": args.fs, **STREAM_CONFIG}))
+        if json.loads(await websocket.recv())["type"] != "ready":
+            counters["errors"] += 1
+            return
+
+        await asyncio.sleep(max(0.0, start_at - time.perf_counter()) + stream_id % 50 * args.batch_seconds / 50)
+        next_send = time.perf_counter()
+        for batch in range(batches):
+            payload = data[batch * batch_samples:(batch + 1) * batch_samples].tobytes()
+            sent_at = time.perf_counter()
+            await websocket.send(payload)
+            update = json.loads(await websocket.recv())
+            latencies.append(time.perf_counter() - sent_at)
+            if update["type"] != "update":
+                counters["errors"] += 1
+            counters["samples"] += len(update["filtered"])
+            counters["peaks"] += len(update.get("peaks", []))
+
+            next_send += args.batch_seconds
+            await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+
+
+async def run_load(args):
+    url = f"ws://127.0.0.1:{args.port}/stream"
+    latencies = []
+    counters = {"samples": 0, "peaks": 0, "errors": 0}
+    start_at = time.perf_counter() + 1.0
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_stream(url, stream_id, args, latencies, counters, start_at) for stream_id in range(args.streams)),
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - started
+    failures = [result for result in results if isinstance(result, Exception)]
+    return latencies, counters, failures, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--streams", type=int, default=300)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of signal sent per stream.")
+    parser.add_argument("--fs", type=float, default=64.0)
+    parser.add_argument("--batch-seconds", type=float, default=0.25)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning", ws_max_queue=64))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    try:
+        latencies, counters, failures, elapsed = asyncio.run(run_load(args))
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    latencies = np.array(latencies) * 1000
+    print(f"streams: {args.streams}  failed connections: {len(failures)}  error messages: {counters['errors']}")
+    if failures:
+        print(f"first failure: {failures[0]!r}")
+    print(f"batches: {len(latencies)}  samples: {counters['samples']}  peaks: {counters['peaks']}  wall time: {elapsed:.1f} s")
+    print(f"throughput: {counters['samples'] / elapsed:,.0f} samples/s")
+    if len(latencies):
+        print("round trip ms: " + "  ".join(
+            f"p{q}={np.percentile(latencies, q):.1f}" for q in (50, 90, 99)) + f"  max={latencies.max():.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Benchmark suite for every backend operation, with baseline regression checks.
+
+Run from `signalchemist/backend`:
+
+    python -m benchmarks.suite --output bench.json
+    python -m benchmarks.suite --sizes 1000 100000 --cases filter peaks --repeat 5
+    python -m benchmarks.suite --output after.json --baseline bench.json --threshold 1.25
+
+Every case runs on a synthetic EDA or PPG recording at each size, from 10^3
+to 10^7 samples by default. The `http_*` cases post a JSON signal to the
+real handler in-process through the ASGI test client with the result cache
+disabled, so they include form parsing, JSON decoding and JSON encoding of
+the response. Slow cases (NeuroKit, the global smoothing spline, JSON over
+HTTP) stop at a smaller size unless `--no-limits` is given.
+
+`--output` writes the timings and library versions as JSON. `--baseline`
+compares against an earlier output and exits with status 1 when any case
+is more than `--threshold` times slower than its baseline median; cases
+faster than `--min-seconds` in both runs are ignored as timer noise.
+
+The repository has no test harness, so correctness checks run first as
+part of the same gate: the optimized quality metrics and the EmotiBit
+heart rate engine must match their previous implementations exactly, and
+`import app.main` must stay within `--import-budget` seconds without
+loading the heavy backends. Any failure exits with status 1 before the
+timings. `--no-checks` skips them.
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from importlib.metadata import PackageNotFoundError, version
+
+import numpy as np
+
+from app.hr import compute_emotibit_heart_rate, compute_neurokit_heart_rate
+from app.metrics import bottcher_quality, kleckner_quality, kleckner_quality_filter, maki_quality
+from app.outliers import IQR, hampel
+from app.processing import (
+    ANALYSES,
+    analyze_signal,
+    apply_builtin_filter,
+    apply_normalization,
+    detect_peak_indices,
+    resample_signal,
+)
+from app.spectrum import compute_spectrum
+from benchmarks.bench_hr import emotibit_mismatches
+from benchmarks.bench_quality import bottcher_mismatches, kleckner_mismatches, maki_mismatches
+from benchmarks.common import synthetic_eda, synthetic_ppg
+from benchmarks.import_budget import import_budget_failures
+
+DEFAULT_SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]
+LIBRARIES = ("numpy", "scipy", "pandas", "neurokit2", "fastapi")
+FILTER_CONFIG = {"method": "butterworth", "order": 2, "lowcut": 0.5, "highcut": 5}
+
+
+@dataclass
+class Case:
+    name: str
+    signal_type: str
+    run: object
+    max_size: int | None = None
+
+
+def http_case(client, endpoint: str, signal_type: str, form: dict):
+    def run(data, fs):
+        fields = {
+            key: value(fs) if callable(value) else value
+            for key, value in form.items()
+        }
+        # Sent as a JSON file part, since text fields are capped at 1 MB.
+        response = client.post(
+            endpoint,
+            data={"use_cache": "false", **fields},
+            files={"signal": ("signal.json", json.dumps(data.tolist()), "application/json")},
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"{endpoint} returned {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    return Case(f"http_{endpoint.strip('/')}", signal_type, run, max_size=10**5)
+
+
+def values(data):
+    return data[:, 1]
+
+
+def build_cases(client):
+    cases = [
+        Case("filter_butterworth", "PPG", lambda data, fs: apply_builtin_filter(values(data), fs, FILTER_CONFIG)),
+        Case("filter_gaussian", "PPG", lambda data, fs: apply_builtin_filter(values(data), fs, {"method": "gaussian", "sigma": 2})),
+        Case("normalization_zscore", "EDA", lambda data, fs: apply_normalization(values(data), "zscore")),
+        Case("normalization_minmax", "EDA", lambda data, fs: apply_normalization(values(data), "minmax")),
+        Case("outliers_iqr", "EDA", lambda data, fs: IQR(values(data))),
+        Case("outliers_hampel", "EDA", lambda data, fs: hampel(values(data), fs)),
+        Case("resampling_1d", "EDA", lambda data, fs: resample_signal(data, "1d", 2 * fs)),
+        Case("resampling_spline", "EDA", lambda data, fs: resample_signal(data, "spline", 2 * fs), max_size=10**4),
+        Case("resampling_cubic", "EDA", lambda data, fs: resample_signal(data, "cubic", 2 * fs)),
+        Case("resampling_polyphase", "EDA", lambda data, fs: resample_signal(data, "polyphase", 2 * fs)),
+        Case("peaks_scipy", "PPG", lambda data, fs: detect_peak_indices(values(data), fs, "scipy", min_distance_seconds=0.3)),
+        Case("peaks_neurokit", "PPG", lambda data, fs: detect_peak_indices(values(data), fs, "neurokit", "PPG"), max_size=10**6),
+        Case("hr_emotibit", "PPG", lambda data, fs: compute_emotibit_heart_rate(data, fs), max_size=10**6),
+        Case("hr_neurokit", "PPG", lambda data, fs: compute_neurokit_heart_rate(data, fs), max_size=10**6),
+        Case("analyze_ppg", "PPG", lambda data, fs: analyze_signal(data, fs, "PPG", ANALYSES), max_size=10**6),
+        Case("metric_bottcher", "EDA", lambda data, fs: bottcher_quality(values(data), fs=fs)),
+        Case("metric_kleckner", "EDA", lambda data, fs: kleckner_quality(values(data), fs=fs)),
+        Case("metric_kleckner_filter", "EDA", lambda data, fs: kleckner_quality_filter(values(data), fs=fs)),
+        Case("spectrum_welch", "PPG", lambda data, fs: compute_spectrum(values(data), fs)),
+        Case("spectrum_stft", "PPG", lambda data, fs: compute_spectrum(values(data), fs, "stft")),
+        Case("metric_maki", "PPG", lambda data, fs: maki_quality(values(data), fs=fs)),
+    ]
+    if client is not None:
+        cases += [
+            http_case(client, "/filtering", "PPG", {"sampling_rate": lambda fs: fs, "filter_config": json.dumps(FILTER_CONFIG)}),
+            http_case(client, "/normalization", "EDA", {"normalization_method": "zscore"}),
+            http_case(client, "/outliers", "EDA", {"outlier_technique": "hampel", "sampling_rate": lambda fs: fs}),
+            http_case(client, "/resampling", "EDA", {"interpolation_technique": "1d", "target_sampling_rate": lambda fs: 2 * fs}),
+            http_case(client, "/peaks", "PPG", {"sampling_rate": lambda fs: fs, "min_distance_seconds": 0.3}),
+            http_case(client, "/hr", "PPG", {"sampling_rate": lambda fs: fs, "signal_type": "PPG"}),
+            http_case(client, "/spectrum", "PPG", {"sampling_rate": lambda fs: fs}),
+            http_case(client, "/analyze", "PPG", {"sampling_rate": lambda fs: fs, "signal_type": "PPG"}),
+            http_case(client, "/metrics", "EDA", {"sampling_rate": lambda fs: fs, "signal_type": "EDA"}),
+        ]
+    return cases
+
+
+def make_signal(signal_type: str, size: int, args):
+    fs = args.eda_fs if signal_type == "EDA" else args.ppg_fs
+    signal = synthetic_eda(size, fs) if signal_type == "EDA" else synthetic_ppg(size, fs)
+    return np.column_stack((np.arange(size) / fs, signal)), fs
+
+
+def run_checks(args) -> list[str]:
+    """
+    Correctness checks gating the suite. Returns the failures.
+    """
+    checks = [
+        ("bottcher equivalence", bottcher_mismatches),
+        ("kleckner equivalence", kleckner_mismatches),
+        ("maki equivalence", maki_mismatches),
+        ("emotibit equivalence", emotibit_mismatches),
+        ("import budget", lambda: import_budget_failures(args.import_budget)),
+    ]
+    failures = []
+    for name, check in checks:
+        problems = check()
+        print(f"check {name}: {'ok' if not problems else f'{len(problems)} failures'}")
+        failures += problems
+    return failures
+
+
+def time_case(case: Case, data, fs: float, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        case.run(data, fs)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def environment() -> dict:
+    libraries = {}
+    for name in LIBRARIES:
+        try:
+            libraries[name] = version(name)
+        except PackageNotFoundError:
+            libraries[name] = None
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "libraries": libraries,
+    }
+
+
+def run_suite(cases, args) -> list[dict]:
+    results = []
+    print(f"{'case':>24} {'samples':>10} {'median s':>10} {'min s':>10}")
+    for signal_type in ("EDA", "PPG"):
+        for size in args.sizes:
+            selected = [
+                case for case in cases
+                if case.signal_type == signal_type
+                and (args.no_limits or case.max_size is None or size <= case.max_size)
+            ]
+            if not selected:
+                continue
+            data, fs = make_signal(signal_type, size, args)
+            for case in selected:
+                timings = time_case(case, data, fs, args.repeat)
+                result = {
+                    "case": case.name,
+                    "size": size,
+                    "signal_type": signal_type,
+                    "sampling_rate": fs,
+                    "median_s": statistics.median(timings),
+                    "min_s": min(timings),
+                    "timings_s": timings,
+                }
+                results.append(result)
+                print(f"{case.name:>24} {size:>10} {result['median_s']:>10.4f} {result['min_s']:>10.4f}")
+    return results
+
+
+def compare(results, baseline, threshold: float, min_seconds: float) -> list[dict]:
+    """
+    Cases more than `threshold` times slower than in `baseline`.
+    """
+    previous = {(result["case"], result["size"]): result for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["case"], result["size"]))
+        if before is None:
+            continue
+        if max(result["median_s"], before["median_s"]) < min_seconds:
+            continue
+        ratio = result["median_s"] / max(before["median_s"], 1e-12)
+        if ratio > threshold:
+            regressions.append({**result, "baseline_median_s": before["median_s"], "ratio": ratio})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--cases", nargs="+", default=None,
+                        help="Only run cases whose name contains one of these substrings.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--eda-fs", type=float, default=4.0)
+    parser.add_argument("--ppg-fs", type=float, default=64.0)
+    parser.add_argument("--no-limits", action="store_true",
+                        help="Run the slow cases at every size too.")
+    parser.add_argument("--no-http", action="store_true", help="Skip the in-process HTTP handler cases.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against.")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Slowdown ratio against the baseline reported as a regression.")
+    parser.add_argument("--min-seconds", type=float, default=0.005,
+                        help="Ignore cases faster than this in both runs.")
+    parser.add_argument("--import-budget", type=float, default=1.0,
+                        help="Maximum median import time of app.main in seconds.")
+    parser.add_argument("--no-checks", action="store_true", help="Skip the correctness checks.")
+    args = parser.parse_args()
+
+    if not args.no_checks:
+        failures = run_checks(args)
+        for failure in failures:
+            print(f"FAIL {failure}")
+        if failures:
+            raise SystemExit(1)
+
+    client = None
+    if not args.no_http:
+        from fastapi.testclient import TestClient
+
+        from app.main import app
+
+        client = TestClient(app)
+
+    cases = build_cases(client)
+    if args.cases:
+        cases = [case for case in cases if any(pattern in case.name for pattern in args.cases)]
+
+    try:
+        results = run_suite(cases, args)
+    finally:
+        if client is not None:
+            client.close()
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": environment(),
+        "settings": {"repeat": args.repeat, "eda_fs": args.eda_fs, "ppg_fs": args.ppg_fs},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"wrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        print(f"compared against {args.baseline} ({baseline.get('created', 'unknown date')}), threshold {args.threshold:g}x")
+        for regression in regressions:
+            print(f"REGRESSION {regression['case']} at {regression['size']} samples: "
+                  f"{regression['baseline_median_s']:.4f} s -> {regression['median_s']:.4f} s ({regression['ratio']:.2f}x)")
+        if regressions:
+            raise SystemExit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
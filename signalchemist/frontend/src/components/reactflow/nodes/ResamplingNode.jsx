@@ -240,6 +240,8 @@ function ResamplingNode({ id, data }) {
           >
             <option value="spline">Spline</option>
             <option value="1d">Interp1d</option>
+            <option value="cubic">Cubic (chunked)</option>
+            <option value="polyphase">Polyphase</option>
           </select>
       </NodeSection>
 
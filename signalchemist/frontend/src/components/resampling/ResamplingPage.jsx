@@ -132,6 +132,8 @@ const ResamplingPage = () => {
                 >
                   <option value="spline">Spline</option>
                   <option value="1d">Interp1d</option>
+                  <option value="cubic">Cubic (chunked)</option>
+                  <option value="polyphase">Polyphase</option>
                 </select>
               </div>
 
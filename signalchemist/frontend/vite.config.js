@@ -31,6 +31,7 @@ export default defineConfig(({ mode }) => {
         "/api": {
           target: `http://backend:${backendPort}`,
           changeOrigin: true,
+          ws: true,
           rewrite: (requestPath) => requestPath.replace(/^\/api/, ""),
         },
       },